@@ -1,5 +1,11 @@
-lcll r2 20
-lcll r1 10
+# r3 = r1 + r2 com r1 = 10 e r2 = 20. Em lw a constante inclui os bits de rc
+# (15:11): "lw r1 r0 A" lê exatamente A com A em 2048..4095 (4096..6143 para r2).
+lw r1 r0 A
+lw r2 r0 B
 add r1 r2 r3
 halt
 
+address 2048
+A: .word 10
+address 4096
+B: .word 20
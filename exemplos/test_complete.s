@@ -1,13 +1,26 @@
 # Teste completo UFLA-RISC
+#
+# Em lclh/lcll/lw o registrador destino (rc) ocupa os bits 15:11 da constante,
+# então lcll não carrega valores pequenos em r1..r31. As constantes ficam em
+# dados (.word) a partir do endereço 49152 = 24 << 11: nessa faixa
+# "lw r24 r0 ROTULO" lê exatamente ROTULO. O valor é copiado de r24 (rascunho)
+# para o registrador do teste com add.
+# Semântica sequencial (modos functional/translated); para o pipeline, monte
+# com --schedule.
+#
+# Resultado esperado:
+#   r1=10 r2=3 r3=13 r4=-7 (0xFFFFFFF9) r5=2 r6=11 r7=9 r8=104 r9=1 r10=1
+#   r11=104 r12=5 r13=1234 r14=1234 r15=0 r16=0 r17=999 r18=42 r19=1 r20=2
+#   r21=0 r22=222 r23=0 r31=777
+
 # enderecamento inicial
 address 0000000000000000
 
-# 1) Constantes: montar r1 = 10, r2 = 3
-lclh r1 0
-lcll r1 10
-
-lclh r2 0
-lcll r2 3
+# 1) Constantes: r1 = 10, r2 = 3
+lw  r24 r0 K10
+add r24 r0 r1
+lw  r24 r0 K3
+add r24 r0 r2
 
 # 2) Operações aritméticas e lógicas
 # r3 = r1 + r2  (ADD)
@@ -25,7 +38,7 @@ or r1 r2 r6
 # r7 = r1 ^ r2  (XOR)
 xor r1 r2 r7
 
-# 3) Shifts (usar r3 and r2 as valores)
+# 3) Shifts (r3 deslocado por r2)
 # r8 = r3 << (r2)
 lsl r3 r2 r8
 
@@ -39,84 +52,90 @@ asr r3 r2 r10
 asl r3 r2 r11
 
 # 4) Memória: store and load
-# preparar endereço em r12 = 5 e valor em r13 = 1234
-lclh r12 0
-lcll r12 5
-
-lclh r13 0
-lcll r13 1234
+# endereço em r12 = 5 e valor em r13 = 1234
+lw  r24 r0 K5
+add r24 r0 r12
+lw  r24 r0 K1234
+add r24 r0 r13
 
-# store r13 into memory at address r12: memoria[r12] = r13
-store r12 r13
+# memoria[BUF + r12] = r13
+store r12 r13 BUF
 
-# load from memory[r12] into r14
-load r14 r12
+# r14 = memoria[BUF + r12] (via r24: BUF está na faixa de r24)
+load r24 r12 BUF
+add  r24 r0 r14
 
 # 5) Branches & jumps
-# set r15 = 0, r16 = 0 ; beq r15 r16 -> should jump to LABEL_EQ
-lclh r15 0
-lcll r15 0
-
-lclh r16 0
-lcll r16 0
+# r15 = r16 = 0 ; beq r15 r16 -> desvia para LABEL_EQ
+zero r15
+zero r16
 
 # this BEQ should be taken (r15==r16)
 beq r15 r16 LABEL_EQ
 
 # if branch not taken (should not execute)
-lclh r17 0
-lcll r17 77
+lw  r24 r0 K77
+add r24 r0 r17
 
-# LABEL_EQ:
 LABEL_EQ:
 # inside label we set r17 = 999
-lclh r17 0
-lcll r17 999
+lw  r24 r0 K999
+add r24 r0 r17
 
 # 6) Subroutine: jal / jr
-# call subroutine SUBR which will set r18 = 42 and return
+# SUBR faz r18 = 42 e volta com jr r31
 jal SUBR
 
-# after return, r31 contains return address; we can test jr by jumping to it (optional)
-# SUBR:
-SUBR:
-# set r18 = 42
-lclh r18 0
-lcll r18 42
-# return: jr r31
-jr r31
-
 # 7) Test BNE: set r19=1, r20=2 -> bne should jump to LABEL_BNE
-lclh r19 0
-lcll r19 1
-lclh r20 0
-lcll r20 2
+lw  r24 r0 K1
+add r24 r0 r19
+lw  r24 r0 K2
+add r24 r0 r20
 
 bne r19 r20 LABEL_BNE
 
 # fallthrough (if not jumped, set r21 = 111)
-lclh r21 0
-lcll r21 111
+lw  r24 r0 K111
+add r24 r0 r21
 
 LABEL_BNE:
 # set r22 = 222
-lclh r22 0
-lcll r22 222
+lw  r24 r0 K222
+add r24 r0 r22
 
 # 8) jump unconditional (j) to END
 j END
 
 # unreachable code - should be skipped
-lclh r23 0
-lcll r23 9999
+lw  r24 r0 K1999
+add r24 r0 r23
 
 END:
 # final register touch to mark end
-lclh r31 0
-lcll r31 777
+lw  r24 r0 K777
+add r24 r0 r31
+halt
+
+SUBR:
+lw  r24 r0 K42
+add r24 r0 r18
+jr r31
 
-# NOTE: assembler may not support a 'halt' mnemonic. If it doesn't, append the HALT line
-# manually to the generated binary file:
-# 11111111111111111111111111111111
+# Dados: constantes e buffer na faixa de r24 (49152..51199)
+address 49152
+K1:    .word 1
+K2:    .word 2
+K3:    .word 3
+K5:    .word 5
+K10:   .word 10
+K42:   .word 42
+K77:   .word 77
+K111:  .word 111
+K222:  .word 222
+K777:  .word 777
+K999:  .word 999
+K1234: .word 1234
+K1999: .word 1999
+BUF:   .space 8
 
 # EOF
@@ -1,147 +1,363 @@
 # -----------------------------------------------
-#  Assembler para UFLA-RISC — versão corrigida
-#  COMPATÍVEL COM A CPU QUE VOCÊ IMPLEMENTOU
+#  Montador de dois passos para UFLA-RISC
+#  Opcodes e campos iguais aos decodificados pela CPU
+#  (src/simulador/execute.py e src/simulador/instruction.py)
 # -----------------------------------------------
+#
+# Sintaxe (uma instrução por linha; vírgulas opcionais; comentários com # ou ;):
+#   ROTULO:                       define um rótulo (pode preceder uma instrução)
+#   add  ra rb rc                 rc = ra op rb (sub, and, or, xor, asl, asr, lsl, lsr)
+#   zero rc
+#   lclh rc c / lcll rc c         constantes de 16 bits (ver codificação abaixo)
+#   lw   rc ra [c]                rc = mem[ra + c]           (alias: load)
+#   sw   ra rb [off]              mem[ra + off] = rb         (alias: store)
+#   beq  ra rb ALVO / bne ...     alvo de 16 bits
+#   j ALVO / jal ALVO / jr ra     j: 26 bits; jal: 24 bits (link em r31)
+#   nop / halt
+# Diretivas:
+#   address ENDERECO              muda o endereço de montagem; uma sequência de
+#                                 0/1 com 8+ dígitos é binária (como no formato
+#                                 texto do loader), senão decimal/0x/0b
+#   .word v1 v2 ...               palavras de dados (números ou rótulos)
+#   .space n                      n palavras zeradas
+#
+# Codificação: rc ocupa os bits 15:11, que também são os 5 bits altos da
+# constante de 16 bits de lclh/lcll/lw. A constante escrita no fonte precisa
+# ter esses bits iguais a rc (entre rc*2048 e rc*2048 + 2047); fora disso o
+# montador dá erro em vez de gerar uma instrução que a CPU executaria com outra
+# constante. A CPU usa a constante c inteira: lclh coloca c nos 16 bits altos,
+# lcll carrega (c << 8) | c e lw acessa ra + c. Valores arbitrários são
+# carregados de dados (.word) com lw e um rótulo nessa faixa, como em
+# exemplos/test_complete.s. sw não tem rc e aceita deslocamentos de 16 bits.
 
 import sys
 
-# Estrutura das instruções
-INSTR_R = {"add":0, "sub":1, "and":2, "or":3, "xor":4,
-           "lsl":5, "lsr":6, "asr":7, "asl":8}
+from src.simulador.execute import OPCODES
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.memory import MEMORY_SIZE_WORDS, write_block
 
-INSTR_I = {"addi":9, "subi":10, "andi":11, "ori":12,
-           "xori":13}
+HALT_WORD = 0xFFFFFFFF
+NOP_WORD = 0
 
-INSTR_MEM = {"lw":14, "sw":15}
+ALIASES = {"load": "lw", "store": "sw"}
 
-INSTR_BRANCH = {"beq":16, "bne":17}
+# Mnemônico -> formato dos operandos
+#   R: ra rb rc        C: rc          K: rc c16       L: rc ra [c16]
+#   S: ra rb [off16]   B: ra rb alvo16   J: alvo26    JAL: alvo24   A: ra
+#   N: sem operandos (nop/halt)
+FORMATS = {
+    "add": "R", "sub": "R", "xor": "R", "or": "R", "and": "R",
+    "asl": "R", "asr": "R", "lsl": "R", "lsr": "R",
+    "zero": "C",
+    "lclh": "K", "lcll": "K",
+    "lw": "L", "sw": "S",
+    "beq": "B", "bne": "B",
+    "j": "J", "jal": "JAL", "jr": "A",
+    "nop": "N", "halt": "N",
+}
 
-INSTR_JUMP = {"j":18, "jal":19, "jr":20}
 
-INSTR_LCL = {"lclh":21, "lcll":22}
+class AssemblerError(Exception):
+    pass
 
-HALT_OPCODE = 255
 
+class Statement:
+    """Linha de código-fonte já separada em partes (resultado do primeiro passo)."""
+    __slots__ = ("kind", "name", "operands", "line_no", "address")
 
-def reg_number(r):
-    if not r.startswith("r"):
-        raise ValueError(f"Registrador inválido: {r}")
-    return int(r[1:])
-
-
-def assemble_R(op, ra, rb, rc):
-    opcode = INSTR_R[op]
-    ra = reg_number(ra)
-    rb = reg_number(rb)
-    rc = reg_number(rc)
-    return (opcode << 24) | (ra << 19) | (rb << 14) | (rc << 9)
-
-
-def assemble_I(op, ra, rb, imm):
-    opcode = INSTR_I[op]
-    ra = reg_number(ra)
-    rb = reg_number(rb)
-    imm = int(imm) & 0x1FF  # 9 bits
-    return (opcode << 24) | (ra << 19) | (rb << 14) | imm
-
-
-def assemble_MEM(op, ra, rb, offset):
-    opcode = INSTR_MEM[op]
-    ra = reg_number(ra)
-    rb = reg_number(rb)
-    offset = int(offset) & 0x3FFF  # 14 bits
-    return (opcode << 24) | (ra << 19) | (rb << 14) | offset
-
-
-def assemble_BRANCH(op, ra, rb, offset):
-    opcode = INSTR_BRANCH[op]
-    ra = reg_number(ra)
-    rb = reg_number(rb)
-    offset = int(offset) & 0x3FFF
-    return (opcode << 24) | (ra << 19) | (rb << 14) | offset
-
-
-def assemble_J(op, offset):
-    opcode = INSTR_JUMP[op]
-    offset = int(offset) & 0xFFFFFF
-    return (opcode << 24) | offset
-
+    def __init__(self, kind, name, operands, line_no):
+        self.kind = kind            # "instr", "word", "space", "address" ou "label"
+        self.name = name            # mnemônico, nome do rótulo ou da diretiva
+        self.operands = operands    # lista de strings
+        self.line_no = line_no
+        self.address = None         # preenchido pelo layout
 
-def assemble_JR(op, ra):
-    opcode = INSTR_JUMP[op]
-    ra = reg_number(ra)
-    return (opcode << 24) | (ra << 19)
+    def size(self):
+        if self.kind == "instr":
+            return 1
+        if self.kind == "word":
+            return len(self.operands)
+        if self.kind == "space":
+            n = parse_number(self.operands[0])
+            if n < 0:
+                raise ValueError(f"Tamanho de '.space' negativo: {n}")
+            return n
+        return 0
 
+    def __repr__(self):
+        return f"Statement({self.kind!r}, {self.name!r}, {self.operands!r}, linha {self.line_no})"
 
-def assemble_LCLH_LCLL(op, ra, imm):
-    opcode = INSTR_LCL[op]
-    ra = reg_number(ra)
-    imm = int(imm) & 0x7FFFF
-    return (opcode << 24) | (ra << 19) | imm
 
+class Program:
+    """Resultado da montagem."""
+    __slots__ = ("segments", "symbols", "source_map", "entry", "next_free", "schedule")
 
-def assemble_line(line):
-    parts = line.replace(",", " ").split()
-    if not parts:
-        return None
+    def __init__(self, segments, symbols, source_map, entry, next_free, schedule=None):
+        self.segments = segments      # lista de (inicio, [palavras])
+        self.symbols = symbols        # rótulo -> endereço
+        self.source_map = source_map  # endereço -> linha do fonte
+        self.entry = entry
+        self.next_free = next_free
+        self.schedule = schedule      # relatório do escalonador (schedule=True)
 
-    op = parts[0].lower()
+    def words(self):
+        """Total de palavras montadas."""
+        return sum(len(w) for _, w in self.segments)
 
-    # HALT
-    if op == "halt":
-        return (HALT_OPCODE << 24)
 
-    # R-type
-    if op in INSTR_R:
-        return assemble_R(op, parts[1], parts[2], parts[3])
+def parse_number(tok):
+    try:
+        return int(tok, 0)
+    except ValueError:
+        raise ValueError(f"Numero invalido: '{tok}'")
 
-    # Immediate arithmetic
-    if op in INSTR_I:
-        return assemble_I(op, parts[1], parts[2], parts[3])
 
-    # memory
-    if op in INSTR_MEM:
-        return assemble_MEM(op, parts[1], parts[2], parts[3])
+def parse_address(tok):
+    if len(tok) >= 8 and all(c in "01" for c in tok):
+        return int(tok, 2)
+    return parse_number(tok)
 
-    # branches
-    if op in INSTR_BRANCH:
-        return assemble_BRANCH(op, parts[1], parts[2], parts[3])
 
-    # jumps
-    if op in ("j", "jal"):
-        return assemble_J(op, parts[1])
-
-    if op == "jr":
-        return assemble_JR(op, parts[1])
-
-    # LCLH / LCLL
-    if op in INSTR_LCL:
-        return assemble_LCLH_LCLL(op, parts[1], parts[2])
-
-    raise ValueError(f"Instrução desconhecida: {op}")
-
-
-def assemble_file(input_path, output_path):
-    result = []
-    with open(input_path, "r") as f:
-        for line in f:
-            clean = line.strip()
-            if not clean or clean.startswith("#"):
+def reg_number(r):
+    if len(r) < 2 or r[0] not in "rR" or not r[1:].isdigit():
+        raise ValueError(f"Registrador inválido: {r}")
+    n = int(r[1:])
+    if n > 31:
+        raise ValueError(f"Registrador inválido: {r}")
+    return n
+
+
+def _strip_comment(line):
+    for mark in ("#", ";"):
+        cut = line.find(mark)
+        if cut >= 0:
+            line = line[:cut]
+    return line.strip()
+
+
+# ------------------------------------------------------------------
+# Primeiro passo: texto -> instruções/diretivas
+# ------------------------------------------------------------------
+def parse_source(text):
+    """Separa o fonte em Statements (rótulos, diretivas e instruções)."""
+    statements = []
+    for line_no, raw in enumerate(text.splitlines(), 1):
+        line = _strip_comment(raw)
+        while line:
+            head, sep, rest = line.partition(":")
+            if sep and head.strip() and " " not in head.strip():
+                statements.append(Statement("label", head.strip(), [], line_no))
+                line = rest.strip()
                 continue
-            word = assemble_line(clean)
-            if word is not None:
-                result.append(word)
-
+            break
+        if not line:
+            continue
+        parts = line.replace(",", " ").split()
+        name = parts[0].lower()
+        operands = parts[1:]
+        if name == "address":
+            kind = "address"
+        elif name in (".word", "word"):
+            kind = "word"
+        elif name in (".space", "space"):
+            kind = "space"
+        else:
+            kind = "instr"
+            name = ALIASES.get(name, name)
+            if name not in FORMATS:
+                raise AssemblerError(f"Erro na linha {line_no}: Instrução desconhecida: {parts[0]}")
+        if kind in ("address", "space") and len(operands) != 1:
+            raise AssemblerError(f"Erro na linha {line_no}: '{name}' espera 1 operando")
+        statements.append(Statement(kind, name, operands, line_no))
+    return statements
+
+
+def layout(statements, start=0, limit=MEMORY_SIZE_WORDS):
+    """Atribui endereços e monta a tabela de símbolos. Retorna symbols."""
+    symbols = {}
+    address = start
+    for st in statements:
+        try:
+            if st.kind == "address":
+                address = parse_address(st.operands[0])
+                if not (0 <= address < limit):
+                    raise ValueError(f"Endereco 'address' fora dos limites (0..{limit-1}): {address}")
+            st.address = address
+            if st.kind == "label":
+                if st.name in symbols:
+                    raise ValueError(f"Rotulo duplicado: {st.name}")
+                symbols[st.name] = address
+            address += st.size()
+        except ValueError as e:
+            raise AssemblerError(f"Erro na linha {st.line_no}: {e}")
+    return symbols
+
+
+# ------------------------------------------------------------------
+# Segundo passo: codificação
+# ------------------------------------------------------------------
+def _value(tok, symbols):
+    if tok in symbols:
+        return symbols[tok]
+    if tok[0].isdigit() or tok[0] in "+-":
+        return parse_number(tok)
+    raise ValueError(f"Rotulo indefinido: {tok}")
+
+
+def _field(value, bits, what):
+    if not (0 <= value < (1 << bits)):
+        raise ValueError(f"{what} fora do intervalo (0..{(1 << bits) - 1}): {value}")
+    return value
+
+
+def _const16(value, rc, what):
+    """Constante de lclh/lcll/lw: os bits 15:11 são os do campo rc."""
+    _field(value, 16, what)
+    if value >> 11 != rc:
+        low = rc << 11
+        raise ValueError(f"{what} {value} não pode ser codificada com r{rc}: rc ocupa os bits "
+                         f"15:11 e a CPU usaria {low | (value & 0x7FF)} "
+                         f"(com r{rc}, use {low}..{low | 0x7FF})")
+    return value
+
+
+def encode_statement(st, symbols):
+    """Codifica uma instrução (Statement 'instr') em uma palavra de 32 bits."""
+    name, ops = st.name, st.operands
+    fmt = FORMATS[name]
+    expected = {"R": (3,), "C": (1,), "K": (2,), "L": (2, 3), "S": (2, 3), "B": (3,),
+                "J": (1,), "JAL": (1,), "A": (1,), "N": (0,)}[fmt]
+    if len(ops) not in expected:
+        raise ValueError(f"'{name}' espera {' ou '.join(map(str, expected))} operando(s), recebeu {len(ops)}")
+    if name == "halt":
+        return HALT_WORD
+    if name == "nop":
+        return NOP_WORD
+    opcode = OPCODES[name]
+    if fmt == "R":
+        return encode_fields(opcode, reg_number(ops[0]), reg_number(ops[1]), reg_number(ops[2]))
+    if fmt == "C":
+        return encode_fields(opcode, rc=reg_number(ops[0]))
+    if fmt == "K":
+        rc = reg_number(ops[0])
+        const = _const16(_value(ops[1], symbols), rc, "Constante")
+        return encode_fields(opcode, rc=rc, const16=const)
+    if fmt == "L":
+        rc = reg_number(ops[0])
+        off = _const16(_value(ops[2], symbols) if len(ops) == 3 else 0, rc, "Deslocamento do lw")
+        return encode_fields(opcode, ra=reg_number(ops[1]), rc=rc, const16=off)
+    if fmt == "S":
+        off = _field(_value(ops[2], symbols), 16, "Deslocamento do sw (16 bits)") if len(ops) == 3 else 0
+        return encode_fields(opcode, ra=reg_number(ops[0]), rb=reg_number(ops[1]), const16=off)
+    if fmt == "B":
+        target = _field(_value(ops[2], symbols), 16, "Alvo do desvio (16 bits)")
+        return encode_fields(opcode, reg_number(ops[0]), reg_number(ops[1]), const16=target)
+    if fmt == "J":
+        return encode_jump(opcode, _field(_value(ops[0], symbols), 26, "Alvo do salto (26 bits)"))
+    if fmt == "JAL":
+        return encode_jump(opcode, _field(_value(ops[0], symbols), 24, "Alvo do jal (24 bits)"))
+    return encode_fields(opcode, ra=reg_number(ops[0]))  # A: jr
+
+
+def encode(statements, symbols, limit=MEMORY_SIZE_WORDS):
+    """Segundo passo: gera os segmentos (inicio, palavras) e o mapa endereço -> linha."""
+    segments = []
+    source_map = {}
+    current = None
+    for st in statements:
+        if st.kind in ("label", "address"):
+            continue
+        try:
+            if st.kind == "instr":
+                words = [encode_statement(st, symbols)]
+            elif st.kind == "word":
+                words = [_value(tok, symbols) & 0xFFFFFFFF for tok in st.operands]
+            else:
+                words = [0] * st.size()
+        except ValueError as e:
+            raise AssemblerError(f"Erro na linha {st.line_no}: {e}")
+        if not words:
+            continue
+        if st.address + len(words) > limit:
+            raise AssemblerError(f"Erro na linha {st.line_no}: programa ultrapassa a memoria ({limit} palavras)")
+        if current is None or current[0] + len(current[1]) != st.address:
+            current = (st.address, [])
+            segments.append(current)
+        current[1].extend(words)
+        for i in range(len(words)):
+            source_map[st.address + i] = st.line_no
+    return segments, source_map
+
+
+def assemble(text, start=0, limit=MEMORY_SIZE_WORDS, schedule=False):
+    """
+    Monta o código-fonte (string). Retorna um Program.
+    schedule=True: o fonte tem semântica sequencial e o escalonador de hazards
+    (src/interpretador/scheduler.py) insere/reordena NOPs e delay slots para o
+    pipeline; o relatório fica em Program.schedule.
+    """
+    statements = parse_source(text)
+    report = None
+    if schedule:
+        from src.interpretador.scheduler import schedule_report
+        statements, report = schedule_report(statements)
+    symbols = layout(statements, start, limit)
+    segments, source_map = encode(statements, symbols, limit)
+    if "start" in symbols:
+        entry = symbols["start"]
+    else:
+        entry = segments[0][0] if segments else start
+    next_free = segments[-1][0] + len(segments[-1][1]) if segments else start
+    return Program(segments, symbols, source_map, entry, next_free, report)
+
+
+def assemble_into(text, memory, start=0, schedule=False):
+    """Monta e escreve direto na memória (sem passar pelo formato texto). Retorna o Program."""
+    program = assemble(text, start, len(memory), schedule)
+    for seg_start, words in program.segments:
+        write_block(memory, seg_start, words)
+    return program
+
+
+def assemble_file_into(input_path, memory, start=0, schedule=False):
+    with open(input_path, "r", encoding="utf-8") as f:
+        return assemble_into(f.read(), memory, start, schedule)
+
+
+def write_text(program, output_path):
+    """Grava no formato texto do loader (uma diretiva address por segmento)."""
     with open(output_path, "w") as f:
-        f.write("address 0000000000000000\n")
-        for w in result:
-            f.write(f"{w:032b}\n")
+        for seg_start, words in program.segments:
+            f.write(f"address {seg_start:016b}\n")
+            for w in words:
+                f.write(f"{w:032b}\n")
+
+
+def assemble_file(input_path, output_path, schedule=False):
+    """Monta um arquivo .s em texto binário (.txt) ou imagem binária (.img)."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        program = assemble(f.read(), schedule=schedule)
+    if output_path.endswith(".img"):
+        from src.simulador.image import write_image
+        write_image(output_path, program.segments, entry=program.entry, next_free=program.next_free)
+    else:
+        write_text(program, output_path)
+    return program
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Uso: python -m src.interpretador.assembler <input.s> <output.txt>")
+    args = [a for a in sys.argv[1:] if a != "--schedule"]
+    if len(args) != 2:
+        print("Uso: python -m src.interpretador.assembler [--schedule] <input.s> <output.txt|output.img>")
         sys.exit(1)
 
-    assemble_file(sys.argv[1], sys.argv[2])
-    print(f"Arquivo binário gerado em: {sys.argv[2]}")
+    try:
+        program = assemble_file(args[0], args[1], schedule="--schedule" in sys.argv)
+    except AssemblerError as e:
+        print(e)
+        sys.exit(1)
+    print(f"Arquivo binário gerado em: {args[1]}")
+    if program.schedule:
+        r = program.schedule
+        print(f"Escalonamento: {r['scheduled_nops']} NOPs (sem reordenar: {r['naive_nops']}), "
+              f"{r['cycles_saved']} ciclos economizados por passagem")
@@ -0,0 +1,244 @@
+# -----------------------------------------------
+#  Escalonador de hazards (passo opcional do montador)
+# -----------------------------------------------
+#
+# O pipeline da CPU não tem detecção de hazards nem forwarding:
+#   - uma instrução lê ra/rb no ID, 1 ciclo após o IF, e o resultado de uma
+#     instrução anterior só é escrito no WB, 4 ciclos após o IF dela (o WB roda
+#     antes do ID no mesmo ciclo). O consumidor precisa estar a pelo menos 3
+#     posições do produtor (2 instruções entre eles);
+#   - LCLH lê rc no EX (1 ciclo depois): basta distância 2;
+#   - desvios são resolvidos no EX: a instrução seguinte (delay slot) já foi
+#     buscada e sempre executa.
+#
+# O fonte é escrito com semântica sequencial (a do modo "functional"). Este passo
+# remove os NOPs existentes e, em cada bloco básico, monta o grafo de
+# dependências e reordena instruções independentes (list scheduling) para
+# preencher as distâncias, inserindo NOP só quando nada mais pode ser emitido.
+# Após cada instrução de controle é inserido um NOP de delay slot, de modo que o
+# programa tem o mesmo resultado nos modos pipeline, functional e translated.
+#
+# Dependências preservadas: RAW (com a latência acima), WAR e WAW (ordem), ordem
+# entre acessos à memória quando há escrita, e a última instrução que altera cada
+# flag (N/Z, C, V) em um bloco continua sendo a última (as flags na saída do bloco
+# não mudam).
+
+from src.interpretador.assembler import FORMATS, Statement, reg_number
+
+RAW_DISTANCE = 3
+LCLH_RC_DISTANCE = 2
+
+CONTROL_FORMATS = ("B", "J", "JAL", "A")
+
+# Flags alteradas por instrução (N/Z juntas, C e V separadas)
+FLAGS_SET = {
+    "add": ("nz", "c", "v"), "sub": ("nz", "c", "v"),
+    "asl": ("nz", "c"), "lsl": ("nz", "c"),
+    "zero": ("nz",), "xor": ("nz",), "or": ("nz",), "and": ("nz",),
+    "asr": ("nz",), "lsr": ("nz",), "lclh": ("nz",), "lcll": ("nz",), "lw": ("nz",),
+}
+
+
+class Node:
+    """Instrução dentro de um bloco, com seus conjuntos de leitura e escrita."""
+    __slots__ = ("stmt", "index", "reads", "writes", "late_reads", "mem", "flags",
+                 "control", "succs", "preds", "priority")
+
+    def __init__(self, stmt, index):
+        self.stmt = stmt
+        self.index = index
+        fmt = FORMATS[stmt.name]
+        ops = stmt.operands
+        try:
+            regs = [reg_number(op) for op in ops if op[:1] in "rR" and op[1:].isdigit()]
+        except ValueError:
+            regs = []
+        self.reads = set()
+        self.writes = set()
+        self.late_reads = set()  # lidos no EX (rc do LCLH)
+        self.mem = None          # "load", "store" ou None
+        if fmt == "R" and len(regs) == 3:
+            self.reads = {regs[0], regs[1]}
+            self.writes = {regs[2]}
+        elif fmt in ("C", "K") and regs:
+            self.writes = {regs[0]}
+            if stmt.name == "lclh":
+                self.late_reads = {regs[0]}
+        elif fmt == "L" and len(regs) == 2:
+            self.writes = {regs[0]}
+            self.reads = {regs[1]}
+            self.mem = "load"
+        elif fmt == "S" and len(regs) == 2:
+            self.reads = set(regs)
+            self.mem = "store"
+        elif fmt == "B" and len(regs) == 2:
+            self.reads = set(regs)
+        elif fmt == "A" and regs:
+            self.reads = {regs[0]}
+        elif fmt == "JAL":
+            self.writes = {31}
+        self.reads.discard(0)
+        self.late_reads.discard(0)
+        self.writes.discard(0)
+        self.flags = FLAGS_SET.get(stmt.name, ())
+        self.control = fmt in CONTROL_FORMATS
+        self.succs = []   # (node, latência)
+        self.preds = []
+        self.priority = 0
+
+    def ready_after(self, producer_slot, reg):
+        """Primeira posição em que esta instrução pode ler reg escrito em producer_slot."""
+        if reg in self.reads:
+            return producer_slot + RAW_DISTANCE
+        if reg in self.late_reads:
+            return producer_slot + LCLH_RC_DISTANCE
+        return None
+
+
+def _edge(a, b, latency):
+    a.succs.append((b, latency))
+    b.preds.append((a, latency))
+
+
+def build_graph(nodes):
+    """Arestas de dependência entre as instruções de um bloco (em ordem original)."""
+    last_setter = {}
+    for n in nodes:
+        for flag in n.flags:
+            last_setter[flag] = n
+    for j, b in enumerate(nodes):
+        for a in nodes[:j]:
+            latency = 0
+            for reg in a.writes:
+                ready = b.ready_after(0, reg)
+                if ready is not None:
+                    latency = max(latency, ready)
+            if a.writes & b.writes or a.reads & b.writes or a.late_reads & b.writes:
+                latency = max(latency, 1)
+            if a.mem and b.mem and "store" in (a.mem, b.mem):
+                latency = max(latency, 1)
+            if any(last_setter[f] is b for f in a.flags):
+                latency = max(latency, 1)
+            if b.control:
+                latency = max(latency, 1)
+            if latency:
+                _edge(a, b, latency)
+    # Prioridade: maior caminho (em latência) até o fim do bloco
+    for n in reversed(nodes):
+        n.priority = max((lat + s.priority for s, lat in n.succs), default=0)
+
+
+def _earliest(node, pending):
+    """Posição mínima imposta por escritas pendentes de blocos anteriores."""
+    earliest = 0
+    for reg, slot in pending.items():
+        ready = node.ready_after(slot, reg)
+        if ready is not None and ready > earliest:
+            earliest = ready
+    return earliest
+
+
+def schedule_block(nodes, pending, start, reorder=True):
+    """
+    Escalona um bloco a partir da posição absoluta start.
+    pending: registrador -> posição da última escrita (atualizado no lugar).
+    Retorna a lista de Statements (None = NOP) na nova ordem.
+    """
+    build_graph(nodes)
+    placed = {}
+    order = []
+    remaining = list(nodes)
+    slot = start
+    while remaining:
+        candidates = remaining if reorder else remaining[:1]
+        best = None
+        for n in candidates:
+            if any(p not in placed for p, _ in n.preds):
+                continue
+            if n.control and len(remaining) > 1:
+                continue
+            earliest = max([_earliest(n, pending)] + [placed[p] + lat for p, lat in n.preds])
+            if earliest <= slot and (best is None or n.priority > best.priority):
+                best = n
+        if best is None:
+            order.append(None)  # nada pode ser emitido: NOP
+        else:
+            order.append(best.stmt)
+            placed[best] = slot
+            remaining.remove(best)
+            for reg in best.writes:
+                pending[reg] = slot
+        slot += 1
+    return order
+
+
+def _blocks(statements):
+    """Divide em trechos: ("block", [instruções]) ou ("other", stmt). NOPs são descartados."""
+    block = []
+    for st in statements:
+        if st.kind == "instr" and st.name == "nop":
+            continue  # preenchimento manual: o escalonador decide
+        if st.kind == "instr" and st.name != "halt":
+            block.append(st)
+            if FORMATS[st.name] in CONTROL_FORMATS:
+                yield "block", block
+                block = []
+            continue
+        if block:
+            yield "block", block
+            block = []
+        yield "other", st
+    if block:
+        yield "block", block
+
+
+def schedule(statements, reorder=True):
+    """
+    Aplica o escalonamento a uma lista de Statements (saída de parse_source).
+    Retorna (statements escalonados, número de NOPs inseridos).
+    """
+    out = []
+    pending = {}
+    slot = 0
+    nops = 0
+    for kind, item in _blocks(statements):
+        if kind == "other":
+            if item.kind == "label":
+                # Um JAL pode desviar para cá: r31 só é escrito 2 posições depois
+                pending[31] = max(pending.get(31, slot - RAW_DISTANCE), slot - 2)
+            elif item.kind != "instr":
+                # address / dados: a contagem de posições recomeça
+                pending = {}
+                slot = 0
+            out.append(item)
+            if item.kind == "instr":  # halt
+                slot += 1
+            continue
+        nodes = [Node(st, i) for i, st in enumerate(item)]
+        order = schedule_block(nodes, pending, slot, reorder)
+        line_no = item[0].line_no
+        for st in order:
+            if st is None:
+                nops += 1
+                out.append(Statement("instr", "nop", [], line_no))
+            else:
+                out.append(st)
+                line_no = st.line_no
+        slot += len(order)
+        if nodes[-1].control:
+            # delay slot: a instrução seguinte sempre executa no pipeline
+            nops += 1
+            out.append(Statement("instr", "nop", [], line_no))
+            slot += 1
+    return out, nops
+
+
+def schedule_report(statements):
+    """NOPs necessários com e sem reordenação e os ciclos economizados."""
+    _, naive = schedule(statements, reorder=False)
+    scheduled_statements, scheduled = schedule(statements, reorder=True)
+    return scheduled_statements, {
+        "naive_nops": naive,
+        "scheduled_nops": scheduled,
+        "cycles_saved": naive - scheduled,
+    }
@@ -0,0 +1,347 @@
+# src/simulador/batch.py
+# Simulação em lote (lockstep) de muitos programas independentes com NumPy.
+#
+# Cada "lane" é um programa com seu próprio banco de registradores, PC, flags e
+# memória, guardados como arrays NumPy. A cada passo todas as lanes ativas
+# executam uma instrução: a decodificação usa os mesmos shifts/máscaras de
+# instruction.py, vetorizados, e cada opcode presente no passo é aplicado às
+# lanes correspondentes com máscaras. Lanes que executam HALT (ou acessam fora
+# da memória) são retiradas. A semântica é a do modo funcional (CPU.run(mode=
+# "functional")): o estado final de cada lane é o mesmo de rodar o programa
+# sozinho nesse modo.
+#
+# NumPy é dependência opcional: só é necessária para usar este módulo.
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+from src.simulador import execute as ex
+from src.simulador.execute import EXEC_TABLE, LOAD, STORE, CONTROL
+from src.simulador.cpu import Latch
+from src.simulador.flags import LazyFlags
+from src.simulador.instruction import (
+    get_opcode, get_ra, get_rb, get_rc,
+    get_const16_high, get_const16_low, get_jump_address, HALT_INSTRUCTION, WORD_MASK as MASK
+)
+from src.simulador.memory import read_block
+from src.simulador.registers import NUM_REGISTERS
+
+# Opcodes com implementação vetorizada (enquanto o handler da tabela for o original)
+_VECTORIZED = {
+    1: ex.op_add, 2: ex.op_sub, 3: ex.op_zero, 4: ex.op_xor, 5: ex.op_or,
+    7: ex.op_and, 16: ex.op_asl, 17: ex.op_asr, 18: ex.op_lsl, 19: ex.op_lsr,
+    20: ex.op_lclh, 21: ex.op_lcll, 22: ex.op_mem_address, 23: ex.op_mem_address,
+    24: ex.op_jal, 25: ex.op_jr, 26: ex.op_beq, 27: ex.op_bne, 28: ex.op_j,
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("src.simulador.batch requer NumPy (pip install numpy)")
+
+
+def _decode(ir, pc):
+    """Instrução decodificada (Latch) para os handlers não vetorizados."""
+    dec = Latch()
+    dec.ir = ir
+    dec.opcode = get_opcode(ir)
+    dec.ra = get_ra(ir)
+    dec.rb = get_rb(ir)
+    dec.rc = get_rc(ir)
+    dec.const_high = get_const16_high(ir)
+    dec.const_low = get_const16_low(ir)
+    dec.jump_addr = get_jump_address(ir)
+    dec.pc = pc
+    dec.valid = True
+    return dec
+
+
+class _LaneView(LazyFlags):
+    """Interface mínima de CPU sobre uma lane, para chamar handlers escalares."""
+
+    def __init__(self, batch, lane, pc):
+        self.registers = [int(v) for v in batch.registers[lane]]
+        self.memory = batch.memory[lane]
+        self.mem_size = batch.mem_size
+        self.pc = pc
+        self.halted = False
+        self.flag_neg = int(batch.flag_neg[lane])
+        self.flag_zero = int(batch.flag_zero[lane])
+        self.flag_carry = int(batch.flag_carry[lane])
+        self.flag_overflow = int(batch.flag_overflow[lane])
+
+    def reg(self, idx):
+        return self.registers[idx & 0x1F]
+
+    def jump(self, dest):
+        if 0 <= dest < self.mem_size:
+            self.pc = dest
+        else:
+            self.halted = True
+
+
+class BatchCPU:
+    """N programas executados em lockstep, uma instrução por lane a cada passo."""
+
+    def __init__(self, memories, registers=None, mem_size=None):
+        """
+        - memories: sequência de memórias (create_memory(), listas ou PagedMemory)
+        - registers: registradores iniciais por lane (opcional)
+        - mem_size: palavras de memória por lane (padrão: tamanho da primeira memória)
+        """
+        _require_numpy()
+        n = len(memories)
+        if mem_size is None:
+            mem_size = len(memories[0]) if n else 0
+        self.lanes = n
+        self.mem_size = mem_size
+        self.memory = np.zeros((n, mem_size), dtype=np.uint32)
+        for lane, mem in enumerate(memories):
+            count = min(len(mem), mem_size)
+            self.memory[lane, :count] = np.frombuffer(read_block(mem, 0, count), dtype=np.uint32)
+        # int64 para que somas e shifts não transbordem antes da máscara de 32 bits
+        self.registers = np.zeros((n, NUM_REGISTERS), dtype=np.int64)
+        if registers is not None:
+            for lane, regs in enumerate(registers):
+                self.registers[lane, :len(regs)] = [r & MASK for r in regs]
+        self.pc = np.zeros(n, dtype=np.int64)
+        self.halted = np.zeros(n, dtype=bool)
+        self.instret = np.zeros(n, dtype=np.int64)
+        self.flag_neg = np.zeros(n, dtype=np.uint8)
+        self.flag_zero = np.zeros(n, dtype=np.uint8)
+        self.flag_carry = np.zeros(n, dtype=np.uint8)
+        self.flag_overflow = np.zeros(n, dtype=np.uint8)
+        self.steps = 0
+        self._active = np.arange(n)  # lanes ainda em execução
+
+    @property
+    def active(self):
+        return self._active.size
+
+    def lane_state(self, lane):
+        """Estado arquitetural de uma lane no mesmo formato dos atributos da CPU."""
+        return {
+            "registers": [int(v) for v in self.registers[lane]],
+            "pc": int(self.pc[lane]),
+            "halted": bool(self.halted[lane]),
+            "instret": int(self.instret[lane]),
+            "flag_neg": int(self.flag_neg[lane]),
+            "flag_zero": int(self.flag_zero[lane]),
+            "flag_carry": int(self.flag_carry[lane]),
+            "flag_overflow": int(self.flag_overflow[lane]),
+        }
+
+    def run(self, max_steps=None):
+        """Avança até todas as lanes pararem (ou max_steps passos). Retorna os passos dados."""
+        n = 0
+        while self._active.size and n != max_steps:
+            self.step()
+            n += 1
+        return n
+
+    def step(self):
+        """Executa uma instrução em cada lane ativa."""
+        lanes = self._active
+        if lanes.size == 0:
+            return
+        self.steps += 1
+        size = self.mem_size
+        pc = self.pc[lanes]
+
+        # PC fora da memória: a lane para sem executar
+        outside = pc >= size
+        if outside.any():
+            self.halted[lanes[outside]] = True
+            keep = ~outside
+            lanes, pc = lanes[keep], pc[keep]
+            if lanes.size == 0:
+                self._retire()
+                return
+
+        ir = self.memory[lanes, pc].astype(np.int64)
+        self.instret[lanes] += 1
+        next_pc = pc + 1
+        stop = ir == HALT_INSTRUCTION
+
+        # Decodificação vetorizada (mesmos campos de instruction.py)
+        opcode = (ir >> 26) & 0x3F
+        ra = (ir >> 21) & 0x1F
+        rb = (ir >> 16) & 0x1F
+        rc = (ir >> 11) & 0x1F
+        const16 = ir & 0xFFFF
+        jump_addr = ir & 0x03FFFFFF
+
+        regs = self.registers
+        a = regs[lanes, ra]
+        b = regs[lanes, rb]
+        count = lanes.size
+        result = np.zeros(count, dtype=np.int64)
+        dest = rc.copy()
+        write = np.zeros(count, dtype=bool)     # escreve result em dest
+        set_nz = np.zeros(count, dtype=bool)    # N/Z a partir de result
+        carry = np.full(count, -1, dtype=np.int64)     # -1 = não altera
+        overflow = np.full(count, -1, dtype=np.int64)
+
+        for code in np.unique(opcode[~stop]):
+            code = int(code)
+            op = EXEC_TABLE[code]
+            if op is None:  # NOP
+                continue
+            m = (opcode == code) & ~stop
+            if _VECTORIZED.get(code) is not op.handler:
+                self._scalar(op, m, lanes, pc, ir, a, b, result, dest, write,
+                             set_nz, carry, overflow, next_pc, stop)
+                continue
+            am, bm = a[m], b[m]
+
+            # 1. ALU
+            if code == 1:  # ADD
+                t = am + bm
+                res = t & MASK
+                carry[m] = t > MASK
+                sa, sb, sr = (am >> 31) & 1, (bm >> 31) & 1, (res >> 31) & 1
+                overflow[m] = (sa == sb) & (sa != sr)
+            elif code == 2:  # SUB
+                res = (am - bm) & MASK
+                carry[m] = am >= bm
+                sa, sb, sr = (am >> 31) & 1, (bm >> 31) & 1, (res >> 31) & 1
+                overflow[m] = (sa != sb) & (sa != sr)
+            elif code == 3:  # ZERO
+                res = np.zeros_like(am)
+            elif code == 4:  # XOR
+                res = (am ^ bm) & MASK
+            elif code == 5:  # OR
+                res = (am | bm) & MASK
+            elif code == 7:  # AND
+                res = (am & bm) & MASK
+
+            # 2. Shifts
+            elif code in (16, 18):  # ASL / LSL
+                wide = am << (bm & 31)
+                res = wide & MASK
+                carry[m] = (wide >> 32) & 1
+            elif code == 17:  # ASR
+                signed = np.where(am & 0x80000000, am - (1 << 32), am)
+                res = (signed >> (bm & 31)) & MASK
+            elif code == 19:  # LSR
+                res = (am >> (bm & 31)) & MASK
+
+            # 3. CONSTS
+            elif code == 20:  # LCLH
+                res = ((const16[m] & 0xFFFF) << 16) | (regs[lanes[m], rc[m]] & 0xFFFF)
+            elif code == 21:  # LCLL
+                c = const16[m]
+                res = ((c << 8) | c) & MASK
+
+            # 4. LOAD / STORE
+            elif code == 22 or code == 23:
+                self._memory_access(code == 22, m, lanes, am + (const16[m] & 0xFFFF), bm,
+                                    result, write, set_nz, stop)
+                continue
+
+            # 5. Branches / Jumps
+            else:
+                if code == 24:    # JAL
+                    target = jump_addr[m] & 0xFFFFFF
+                    taken = np.ones(target.size, dtype=bool)
+                elif code == 25:  # JR
+                    target = am
+                    taken = np.ones(target.size, dtype=bool)
+                elif code == 26:  # BEQ (alvo de 16 bits)
+                    target = const16[m]
+                    taken = am == bm
+                elif code == 27:  # BNE
+                    target = const16[m]
+                    taken = am != bm
+                else:             # J
+                    target = jump_addr[m]
+                    taken = np.ones(target.size, dtype=bool)
+                ok = (target >= 0) & (target < size)
+                idx = np.flatnonzero(m)
+                jump = taken & ok
+                next_pc[idx[jump]] = target[jump]
+                stop[idx[taken & ~ok]] = True  # desvio para fora da memória
+                if code == 24:
+                    link = idx[jump]
+                    result[link] = pc[link] + 1
+                    dest[link] = 31
+                    write[link] = True
+                continue
+
+            result[m] = res
+            write[m] = True
+            set_nz[m] = True
+
+        # Escrita nos registradores (R0 não pode ser escrito)
+        w = write & (dest != 0)
+        regs[lanes[w], dest[w]] = result[w] & MASK
+
+        # Flags
+        if set_nz.any():
+            res = result[set_nz] & MASK
+            self.flag_zero[lanes[set_nz]] = res == 0
+            self.flag_neg[lanes[set_nz]] = (res >> 31) & 1
+        c = carry >= 0
+        if c.any():
+            self.flag_carry[lanes[c]] = carry[c]
+        v = overflow >= 0
+        if v.any():
+            self.flag_overflow[lanes[v]] = overflow[v]
+
+        self.pc[lanes] = next_pc
+        if stop.any():
+            self.halted[lanes[stop]] = True
+        self._retire()
+
+    def _memory_access(self, is_load, m, lanes, address, store_value, result, write, set_nz, stop):
+        idx = np.flatnonzero(m)
+        ok = (address >= 0) & (address < self.mem_size)
+        stop[idx[~ok]] = True
+        idx, address, store_value = idx[ok], address[ok], store_value[ok]
+        if is_load:
+            result[idx] = self.memory[lanes[idx], address]
+            write[idx] = True
+            set_nz[idx] = True
+        else:
+            self.memory[lanes[idx], address] = store_value & MASK
+
+    def _scalar(self, op, m, lanes, pc, ir, a, b, result, dest, write, set_nz,
+                carry, overflow, next_pc, stop):
+        """Executa um opcode sem versão vetorizada chamando o handler lane a lane."""
+        for i in np.flatnonzero(m):
+            lane = int(lanes[i])
+            view = _LaneView(self, lane, int(pc[i]) + 1)
+            dec = _decode(int(ir[i]), int(pc[i]))
+            value = op.handler(view, dec, int(a[i]), int(b[i]))
+            # Handlers escrevem flags diretamente: aplica o que mudou
+            self.flag_neg[lane] = view.flag_neg
+            self.flag_zero[lane] = view.flag_zero
+            self.flag_carry[lane] = view.flag_carry
+            self.flag_overflow[lane] = view.flag_overflow
+            kind = op.kind
+            if kind == LOAD or kind == STORE:
+                if not (0 <= value < self.mem_size):
+                    stop[i] = True
+                elif kind == LOAD:
+                    result[i] = view.update_flags(int(self.memory[lane, value]))
+                    write[i] = True
+                    set_nz[i] = True
+                else:
+                    self.memory[lane, value] = int(b[i]) & MASK
+            elif kind == CONTROL:
+                if view.halted:
+                    stop[i] = True
+                    continue
+                next_pc[i] = view.pc
+                if value is not None:
+                    result[i] = value & MASK
+                    dest[i] = dec.rc if op.dest is None else op.dest
+                    write[i] = True
+            elif value is not None:
+                result[i] = value & MASK
+                write[i] = True
+
+    def _retire(self):
+        lanes = self._active
+        self._active = lanes[~self.halted[lanes]]
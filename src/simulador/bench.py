@@ -0,0 +1,128 @@
+# src/simulador/bench.py
+# Mede a vazão do simulador (ciclos por segundo) em um laço sintético.
+import sys
+import time
+from src.simulador.cpu import HAZARD_MODES
+from src.simulador.predictor import PREDICTORS
+from src.simulador.cache import Cache
+from src.simulador.sampling import detailed, run_sampled
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.testutil import load_program
+
+
+# Laço infinito com ALU, shifts, LW/SW e desvio incondicional de volta ao início
+LOOP = [
+    encode_fields(1, 1, 2, 3),         # ADD r3 = r1 + r2
+    encode_fields(2, 3, 1, 4),         # SUB r4 = r3 - r1
+    encode_fields(4, 1, 2, 5),         # XOR r5 = r1 ^ r2
+    encode_fields(18, 1, 6, 7),        # LSL r7 = r1 << r6
+    encode_fields(22, 0, 0, 8, 100),   # LW  r8 = MEM[r0 + ((8 << 11) | 100)]
+    encode_fields(23, 0, 3, 0, 101),   # SW  MEM[r0 + 101] = r3
+    encode_fields(7, 4, 5, 9),         # AND r9 = r4 & r5
+    encode_jump(28, 0),                # J 0
+    0,                                 # NOP
+]
+
+
+def make_cpu(hazard="none", predictor=None, icache=None, dcache=None):
+    return load_program(LOOP, registers={1: 10, 2: 20, 6: 3}, hazard=hazard,
+                        predictor=predictor, icache=icache, dcache=dcache)
+
+
+def bench_pipeline(cycles):
+    cpu = make_cpu()
+    start = time.perf_counter()
+    for _ in range(cycles):
+        cpu.step()
+    return cycles / (time.perf_counter() - start)
+
+
+def bench_mode(mode, cycles):
+    cpu = make_cpu()
+    start = time.perf_counter()
+    cpu.run(max_cycles=cycles, mode=mode)
+    return cycles / (time.perf_counter() - start)
+
+
+def bench_hazards(cycles):
+    """CPI, travamentos e descartes de cada modo da unidade de hazards no LOOP."""
+    results = {}
+    for hazard in HAZARD_MODES:
+        cpu = make_cpu(hazard)
+        start = time.perf_counter()
+        cpu.run(max_cycles=cycles, mode="pipeline")
+        stats = cpu.hazard_stats()
+        stats["rate"] = cycles / (time.perf_counter() - start)
+        results[hazard] = stats
+    return results
+
+
+def bench_predictors(cycles, hazard="full"):
+    """Previsões erradas e parcela do CPI devida a desvios para cada preditor."""
+    results = {}
+    for name in PREDICTORS:
+        cpu = make_cpu(hazard, name)
+        cpu.run(max_cycles=cycles, mode="pipeline")
+        stats = cpu.hazard_stats()
+        stats["accuracy"] = cpu.predictor.stats()["accuracy"]
+        results[name] = stats
+    return results
+
+
+def bench_caches(cycles, hazard="full"):
+    """Vazão sem e com I-cache/D-cache (custo do modelo de caches)."""
+    results = {}
+    for label, with_caches in (("sem caches", False), ("com caches", True)):
+        caches = {}
+        if with_caches:
+            caches = {"icache": Cache(size=256, line_size=4, assoc=2, name="I"),
+                      "dcache": Cache(size=256, line_size=4, assoc=4, name="D")}
+        cpu = make_cpu(hazard, "2bit", **caches)
+        start = time.perf_counter()
+        cpu.run(max_cycles=cycles, mode="pipeline")
+        stats = cpu.hazard_stats()
+        stats["rate"] = cycles / (time.perf_counter() - start)
+        results[label] = stats
+    return results
+
+
+def bench_sampling(instructions, hazard="full"):
+    """Simulação completa x por amostragem (1% das instruções em detalhe)."""
+    def fresh():
+        return make_cpu(hazard, "2bit", icache=Cache(size=256, name="I"),
+                        dcache=Cache(size=256, name="D"))
+
+    cpu = fresh()
+    start = time.perf_counter()
+    cycles, _ = detailed(cpu, instructions)
+    full = time.perf_counter() - start
+    cpu = fresh()
+    start = time.perf_counter()
+    res = run_sampled(cpu, period=10000, warmup=100, window=100, max_instructions=instructions)
+    sampled = time.perf_counter() - start
+    return {"cycles": cycles, "estimated_cycles": res["estimated_cycles"],
+            "error": abs(res["estimated_cycles"] - cycles) / cycles,
+            "speedup": full / sampled}
+
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"pipeline (step): {bench_pipeline(cycles):,.0f} ciclos/s")
+    print(f"funcional (run): {bench_mode('functional', cycles):,.0f} instrucoes/s")
+    print(f"traduzido (run): {bench_mode('translated', cycles):,.0f} instrucoes/s")
+    for hazard, st in bench_hazards(cycles).items():
+        print(f"hazards={hazard:6}: CPI {st['cpi']:.3f}  travamentos {st['stalls']:,}  "
+              f"descartes {st['flushes']:,}  {st['rate']:,.0f} ciclos/s")
+    for name, st in bench_predictors(cycles).items():
+        print(f"preditor={name:9}: CPI {st['cpi']:.3f} (desvios {st['branch_cpi']:.3f})  "
+              f"acertos {st['accuracy']:.1%}")
+    for label, st in bench_caches(cycles).items():
+        print(f"{label}: CPI {st['cpi']:.3f} (memoria {st['memory_cpi']:.3f})  "
+              f"{st['rate']:,.0f} ciclos/s")
+    st = bench_sampling(cycles)
+    print(f"amostragem: {st['estimated_cycles']:,} ciclos estimados x {st['cycles']:,} "
+          f"(erro {st['error']:.2%})  {st['speedup']:.1f}x mais rapido")
+
+
+if __name__ == "__main__":
+    main()
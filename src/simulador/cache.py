@@ -0,0 +1,150 @@
+# src/simulador/cache.py
+# Modelo de cache associativa por conjunto (I-cache e D-cache) com latência.
+#
+# Só o tempo é modelado: os dados continuam em cpu.memory; a cache guarda tags,
+# bits de sujeira e a ordem de substituição em listas planas (conjunto * assoc +
+# via), sem objetos por linha. Endereços e tamanhos são em palavras.
+#   write_back=True:  write-allocate; SW marca a linha como suja e a remoção de
+#                     uma linha suja custa mais miss_penalty ciclos
+#   write_back=False: write-through sem write-allocate; toda escrita vai para a
+#                     memória por um buffer de escrita (sem travar o pipeline)
+# access() retorna os ciclos extras do acesso (0 em acerto).
+import random
+
+REPLACEMENT_POLICIES = ("lru", "fifo", "random")
+
+
+def _log2(value, what):
+    if value <= 0 or value & (value - 1):
+        raise ValueError(f"{what} precisa ser potência de 2: {value}")
+    return value.bit_length() - 1
+
+
+class Cache:
+    """Cache associativa por conjunto (tamanho e linha em palavras)."""
+
+    def __init__(self, size=1024, line_size=4, assoc=2, replacement="lru",
+                 write_back=True, miss_penalty=10, seed=0, name="cache"):
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Política de substituição desconhecida: {replacement!r} "
+                             f"(use {', '.join(REPLACEMENT_POLICIES)})")
+        _log2(size, "size")
+        self.line_bits = _log2(line_size, "line_size")
+        _log2(assoc, "assoc")
+        lines = size // line_size
+        if lines < assoc:
+            raise ValueError(f"Cache de {size} palavras não comporta {assoc} vias de {line_size} palavras")
+        self.num_sets = lines // assoc
+        self.set_mask = self.num_sets - 1
+        self.size = size
+        self.line_size = line_size
+        self.assoc = assoc
+        self.replacement = replacement
+        self.write_back = write_back
+        self.miss_penalty = miss_penalty
+        self.name = name
+        self._rng = random.Random(seed)
+
+        # Arrays planos: índice = conjunto * assoc + via
+        self.tags = [-1] * lines       # número da linha de memória (-1: inválida)
+        self.dirty = bytearray(lines)
+        self.stamps = [0] * lines      # último uso (LRU) ou instante de entrada (FIFO)
+        self._clock = 0
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.reads = 0
+        self.writes = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0    # linhas sujas escritas na memória (write-back)
+        self.mem_writes = 0    # palavras escritas na memória (write-through)
+        self.stall_cycles = 0
+
+    def access(self, addr, write=False):
+        """Acessa a palavra addr; retorna os ciclos extras (miss_penalty em falta)."""
+        line = addr >> self.line_bits
+        assoc = self.assoc
+        base = (line & self.set_mask) * assoc
+        tags = self.tags
+        self._clock += 1
+        if write:
+            self.writes += 1
+            if not self.write_back:
+                self.mem_writes += 1
+        else:
+            self.reads += 1
+        try:
+            i = tags.index(line, base, base + assoc)
+        except ValueError:
+            pass
+        else:
+            if self.replacement == "lru":
+                self.stamps[i] = self._clock
+            if write and self.write_back:
+                self.dirty[i] = 1
+            return 0
+
+        # Falta
+        self.misses += 1
+        if write and not self.write_back:
+            return 0  # sem write-allocate: a escrita segue direto para a memória
+        i = self._victim(base)
+        cycles = self.miss_penalty
+        if tags[i] != -1:
+            self.evictions += 1
+            if self.dirty[i]:
+                self.writebacks += 1
+                cycles += self.miss_penalty
+        tags[i] = line
+        self.dirty[i] = 1 if write else 0
+        self.stamps[i] = self._clock
+        self.stall_cycles += cycles
+        return cycles
+
+    def _victim(self, base):
+        """Via a substituir no conjunto que começa em base (inválida, se houver)."""
+        end = base + self.assoc
+        try:
+            return self.tags.index(-1, base, end)
+        except ValueError:
+            pass
+        if self.replacement == "random":
+            return base + self._rng.randrange(self.assoc)
+        stamps = self.stamps
+        victim = base
+        for i in range(base + 1, end):
+            if stamps[i] < stamps[victim]:
+                victim = i
+        return victim
+
+    def flush(self):
+        """Invalida todas as linhas; retorna quantas linhas sujas seriam escritas."""
+        dirty = sum(self.dirty)
+        self.writebacks += dirty
+        self.tags = [-1] * len(self.tags)
+        self.dirty = bytearray(len(self.tags))
+        return dirty
+
+    def stats(self):
+        accesses = self.reads + self.writes
+        hits = accesses - self.misses
+        return {
+            "name": self.name,
+            "accesses": accesses,
+            "reads": self.reads,
+            "writes": self.writes,
+            "hits": hits,
+            "misses": self.misses,
+            "hit_rate": hits / accesses if accesses else 0.0,
+            "evictions": self.evictions,
+            "writebacks": self.writebacks,
+            "mem_writes": self.mem_writes,
+            "stall_cycles": self.stall_cycles,
+        }
+
+    def __repr__(self):
+        return (f"Cache({self.name!r}, size={self.size}, line_size={self.line_size}, "
+                f"assoc={self.assoc}, {self.replacement}, "
+                f"{'write-back' if self.write_back else 'write-through'})")
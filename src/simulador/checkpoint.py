@@ -0,0 +1,270 @@
+# src/simulador/checkpoint.py
+# Checkpoint e restauração do estado completo da CPU (CPU.checkpoint()/restore()).
+#
+# Um Checkpoint guarda o estado da CPU (registradores, flags, pc, contadores,
+# os quatro latches, preditor e caches) e a memória como delta: só as páginas
+# (PAGE_BITS) alteradas desde o checkpoint anterior da mesma CPU. O primeiro
+# checkpoint (base) guarda todas as páginas não nulas. Restaurar percorre a
+# cadeia base -> ... -> checkpoint; depois do restore, os próximos checkpoints
+# são deltas sobre o restaurado, o que permite ramificar vários experimentos a
+# partir de um mesmo estado.
+#
+# Páginas alteradas: PagedMemory já marca páginas sujas (clear_dirty()); para
+# array/memoryview a CPU guarda uma cópia da memória do último checkpoint e
+# compara página a página.
+#
+# Arquivo: sequência de registros (um por checkpoint, ancestrais antes dos
+# descendentes), cada um com cabeçalho, estado (pickle + zlib) e páginas (zlib).
+# O estado usa pickle: carregue só checkpoints gravados por você.
+import os
+import pickle
+import struct
+import zlib
+from array import array
+
+from src.simulador.memory import PAGE_BITS, WORD_BYTES, WORD_TYPECODE, PagedMemory
+
+MAGIC = b"URCP"
+VERSION = 1
+RECORD = struct.Struct("<4sBx8s8sQIII")  # magic, versão, id, id do pai, mem_size, palavras/página, páginas, bytes do estado
+PAGE = struct.Struct("<QI")              # número da página, bytes comprimidos
+NO_PARENT = bytes(8)
+
+# Atributos escalares da CPU salvos no checkpoint
+CPU_FIELDS = (
+    "pc", "halted", "flag_neg", "flag_zero", "flag_carry", "flag_overflow",
+    "ir", "cycle", "instret", "halt_pending", "decode_hits", "decode_misses",
+    "stalls", "load_use_stalls", "flushes", "fetch_stop", "mispredicts",
+    "_pred_if", "_pred_ex", "icache_stalls", "dcache_stalls", "_if_wait", "_mem_wait",
+    "stop_reason",
+)
+LATCHES = ("IF_ID", "ID_EX", "EX_MEM", "MEM_WB")
+
+
+class Checkpoint:
+    """Estado da CPU e delta de memória em relação ao checkpoint pai."""
+
+    def __init__(self, ident, parent, state, pages, mem_size, page_bits=PAGE_BITS):
+        self.ident = ident          # 8 bytes aleatórios
+        self.parent = parent        # Checkpoint anterior (None na base)
+        self.state = state          # estado da CPU serializado (pickle)
+        self.pages = pages          # número da página -> bytes
+        self.mem_size = mem_size
+        self.page_bits = page_bits
+
+    @property
+    def cycle(self):
+        return pickle.loads(self.state)["fields"]["cycle"]
+
+    def chain(self):
+        """Checkpoints da base até este."""
+        out = []
+        cp = self
+        while cp is not None:
+            out.append(cp)
+            cp = cp.parent
+        out.reverse()
+        return out
+
+    def resolved_pages(self):
+        """Conteúdo de todas as páginas não nulas neste checkpoint."""
+        pages = {}
+        for cp in self.chain():
+            pages.update(cp.pages)
+        return pages
+
+    def nbytes(self):
+        """Bytes guardados por este checkpoint (estado + páginas do delta)."""
+        return len(self.state) + sum(len(p) for p in self.pages.values())
+
+    def __repr__(self):
+        kind = "base" if self.parent is None else "delta"
+        return f"Checkpoint({self.ident.hex()}, {kind}, {len(self.pages)} paginas)"
+
+
+def _memory_bytes(memory):
+    """Cópia da memória (array, memoryview ou lista) em bytes."""
+    if isinstance(memory, list):
+        return array(WORD_TYPECODE, memory).tobytes()
+    return memoryview(memory).cast("B").tobytes()
+
+
+def _write_memory(memory, raw):
+    if isinstance(memory, list):
+        memory[:] = array(WORD_TYPECODE, raw).tolist()
+    else:
+        memoryview(memory).cast("B")[:] = raw
+
+
+def _page_ranges(mem_size, page_bits):
+    page_bytes = (1 << page_bits) * WORD_BYTES
+    total = mem_size * WORD_BYTES
+    for number, start in enumerate(range(0, total, page_bytes)):
+        yield number, start, min(start + page_bytes, total)
+
+
+def capture(cpu):
+    """Cria um Checkpoint da CPU (delta sobre o último checkpoint/restore dela)."""
+    memory = cpu.memory
+    parent = cpu._checkpoint_base
+    pages = {}
+    if isinstance(memory, PagedMemory):
+        if memory.page_bits != PAGE_BITS:
+            raise ValueError(f"PagedMemory com page_bits={memory.page_bits}; checkpoints usam {PAGE_BITS}")
+        numbers = memory.allocated_pages() if parent is None else sorted(memory.clear_dirty())
+        if parent is None:
+            memory.clear_dirty()
+        for number in numbers:
+            page = memory.pages.get(number)
+            if page is not None:
+                pages[number] = page.tobytes()
+    else:
+        # Comparação entre bytes (memcmp); entre memoryviews seria elemento a elemento
+        raw = _memory_bytes(memory)
+        reference = cpu._checkpoint_snapshot
+        if reference is None:
+            reference = bytes(len(raw))  # base: páginas não nulas
+        for number, start, end in _page_ranges(cpu.mem_size, PAGE_BITS):
+            data = raw[start:end]
+            if data != reference[start:end]:
+                pages[number] = data
+        cpu._checkpoint_snapshot = raw
+
+    state = {
+        "fields": {name: getattr(cpu, name) for name in CPU_FIELDS},
+        "hazard": cpu.hazard,
+        "registers": list(cpu.registers),
+        "latches": {name: getattr(cpu, name).as_dict() for name in LATCHES},
+        "predictor": cpu.predictor,
+        "icache": cpu.icache,
+        "dcache": cpu.dcache,
+    }
+    cp = Checkpoint(os.urandom(8), parent, pickle.dumps(state, pickle.HIGHEST_PROTOCOL),
+                    pages, cpu.mem_size)
+    cpu._checkpoint_base = cp
+    return cp
+
+
+def apply(cpu, cp, latch_factory):
+    """Restaura na CPU o estado do Checkpoint (inclusive a memória inteira)."""
+    if cp.mem_size != cpu.mem_size:
+        raise ValueError(f"Checkpoint de memória com {cp.mem_size} palavras; a CPU tem {cpu.mem_size}")
+    state = pickle.loads(cp.state)
+    if state["hazard"] != cpu.hazard:
+        raise ValueError(f"Checkpoint do modo de hazards {state['hazard']!r}; a CPU usa {cpu.hazard!r}")
+
+    for name, value in state["fields"].items():
+        setattr(cpu, name, value)
+    cpu.registers[:] = state["registers"]
+    for name, fields in state["latches"].items():
+        if name == "IF_ID":
+            # IF_ID aponta para entradas do cache de decodificação: latch novo
+            latch = latch_factory()
+            cpu.IF_ID = latch
+        else:
+            # ID_EX/EX_MEM/MEM_WB são reaproveitados: quem guardou referências
+            # a eles (ex.: o gancho do trace) continua vendo o pipeline
+            latch = getattr(cpu, name)
+            latch.clear()
+        for field, value in fields.items():
+            setattr(latch, field, value)
+    cpu.redirect = False
+    cpu.predictor = state["predictor"]
+    cpu.icache = state["icache"]
+    cpu.dcache = state["dcache"]
+
+    memory = cpu.memory
+    pages = cp.resolved_pages()
+    if isinstance(memory, PagedMemory):
+        memory.pages = {n: array(WORD_TYPECODE, data) for n, data in pages.items()}
+        memory.dirty = set()
+    else:
+        raw = bytearray(cp.mem_size * WORD_BYTES)
+        page_bytes = (1 << cp.page_bits) * WORD_BYTES
+        for number, data in pages.items():
+            start = number * page_bytes
+            raw[start:start + len(data)] = data
+        _write_memory(memory, raw)
+        cpu._checkpoint_snapshot = bytes(raw)
+    # A memória mudou por fora do MEM: decodificações e blocos traduzidos caem
+    cpu.invalidate_decode()
+    cpu._checkpoint_base = cp
+
+
+def _encode(cp, level):
+    parent = cp.parent.ident if cp.parent is not None else NO_PARENT
+    state = zlib.compress(cp.state, level)
+    out = [RECORD.pack(MAGIC, VERSION, cp.ident, parent, cp.mem_size, 1 << cp.page_bits,
+                       len(cp.pages), len(state)), state]
+    for number in sorted(cp.pages):
+        data = zlib.compress(cp.pages[number], level)
+        out.append(PAGE.pack(number, len(data)))
+        out.append(data)
+    return b"".join(out)
+
+
+def _read_records(f, decode=True):
+    """Itera (id, id do pai, mem_size, page_bits, estado, páginas) dos registros do arquivo."""
+    while True:
+        header = f.read(RECORD.size)
+        if not header:
+            return
+        if len(header) < RECORD.size:
+            raise ValueError("Arquivo de checkpoint truncado")
+        magic, version, ident, parent, mem_size, page_words, n_pages, state_len = RECORD.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Arquivo de checkpoint inválido")
+        state = f.read(state_len)
+        pages = {}
+        for _ in range(n_pages):
+            number, size = PAGE.unpack(f.read(PAGE.size))
+            data = f.read(size)
+            if decode:
+                pages[number] = zlib.decompress(data)
+        if decode:
+            state = zlib.decompress(state)
+        yield ident, parent, mem_size, page_words.bit_length() - 1, state, pages
+
+
+def save_checkpoint(cp, path, level=6):
+    """Acrescenta o checkpoint (e os ancestrais que faltarem) ao arquivo."""
+    saved = set()
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            saved = {rec[0] for rec in _read_records(f, decode=False)}
+    with open(path, "ab") as f:
+        for item in cp.chain():
+            if item.ident not in saved:
+                f.write(_encode(item, level))
+                saved.add(item.ident)
+
+
+def load_checkpoints(path):
+    """Todos os checkpoints do arquivo, na ordem em que foram gravados."""
+    by_ident = {}
+    out = []
+    with open(path, "rb") as f:
+        for ident, parent, mem_size, page_bits, state, pages in _read_records(f):
+            if ident in by_ident:
+                continue
+            if parent != NO_PARENT and parent not in by_ident:
+                raise ValueError(f"Checkpoint {ident.hex()} sem o pai {parent.hex()} no arquivo")
+            cp = Checkpoint(ident, by_ident.get(parent), state, pages, mem_size, page_bits)
+            by_ident[ident] = cp
+            out.append(cp)
+    return out
+
+
+def load_checkpoint(path, ident=None):
+    """Último checkpoint do arquivo (ou o de id ident, em bytes ou hex)."""
+    checkpoints = load_checkpoints(path)
+    if not checkpoints:
+        raise ValueError(f"Nenhum checkpoint em {path}")
+    if ident is None:
+        return checkpoints[-1]
+    if isinstance(ident, str):
+        ident = bytes.fromhex(ident)
+    for cp in checkpoints:
+        if cp.ident == ident:
+            return cp
+    raise KeyError(ident.hex())
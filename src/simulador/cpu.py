@@ -1,44 +1,128 @@
 # src/simulador/cpu.py
 # Pipeline 5 estágios: IF - ID - EX - MEM - WB
-# Sem hazard detection nem forwarding. Simples e determinístico.
+# Modo padrão ("none"): sem hazard detection nem forwarding, com um delay slot
+# após desvios. Simples e determinístico. Os modos da unidade de hazards
+# ("stall", "ex_mem", "full") estão descritos em HAZARD_MODES.
 from src.simulador.registers import create_registers, write_reg, read_reg
+from src.simulador.memory import allocated_ranges
 from src.simulador.instruction import (
     get_opcode, get_ra, get_rb, get_rc,
-    get_const16_high, get_const16_low, get_jump_address
+    get_const16_high, get_const16_low, get_jump_address, HALT_INSTRUCTION
 )
-from src.simulador.memory import MEMORY_SIZE_WORDS
+from src.simulador.execute import EXEC_TABLE, LOAD, STORE, CONTROL
+from src.simulador.translator import Translator
+from src.simulador.predictor import Predictor, make_predictor
+from src.simulador.cache import Cache
+from src.simulador.profiler import Profiler
+from src.simulador.flags import LazyFlags, FLAGS_CLEAR
+from src.simulador.fusion import Fusion
+from src.simulador.loops import LoopDetector, LOOP_CHECK_INTERVAL
+from src.simulador import checkpoint as ckpt
+from src.simulador import stream as streaming
 
-HALT_INSTRUCTION = 0xFFFFFFFF
+# Unidade de hazards (CPU(memory, hazard=...)):
+#   "none":   modelo original (o programa precisa de NOPs; delay slot após desvios)
+#   "stall":  dependências RAW travam o ID até o produtor passar pelo WB
+#   "ex_mem": encaminha o resultado de EX/MEM (instrução 1 à frente); MEM/WB trava
+#   "full":   encaminha EX/MEM e MEM/WB; só trava em load-use (LW 1 à frente)
+# Nos modos com unidade de hazards, o IF consulta um preditor de desvios
+# (src/simulador/predictor.py; padrão: não tomado) e o desvio é resolvido no EX:
+# previsão errada descarta a instrução em IF_ID (sem delay slot). O HALT só para a
+# CPU ao chegar no WB; o resultado é o mesmo do modo funcional.
+# Também só nesses modos, caches opcionais (src/simulador/cache.py) ficam entre
+# IF/MEM e a memória: falta na I-cache gera bolhas no IF; falta na D-cache trava
+# MEM e os estágios anteriores. A memória atende uma falta de cada vez.
+HAZARD_MODES = ("none", "stall", "ex_mem", "full")
+
+# Ciclos perdidos por previsão errada (desvio resolvido no EX, 1 busca descartada)
+MISPREDICT_PENALTY = 1
+
+# Campos de um registrador de pipeline (layout fixo, sem dicionários por ciclo)
+LATCH_FIELDS = (
+    "valid", "ir", "opcode", "ra", "rb", "rc", "const_high", "const_low",
+    "jump_addr", "pc", "reg_ra_val", "reg_rb_val", "exec_rc", "exec_result",
+    "address", "store_value", "kind",
+)
+
+class Latch:
+    """Registrador de pipeline com __slots__.
+
+    Os latches ID_EX, EX_MEM e MEM_WB são pré-alocados e sobrescritos a cada
+    ciclo. Como os estágios são avaliados em ordem reversa (WB -> IF), cada
+    latch já foi consumido pelo estágio seguinte antes de ser reescrito, o que
+    dispensa um segundo buffer. get()/[] mantêm a inspeção no estilo dicionário
+    usada por test_cpu.py (show_stage).
+    """
+    # fused: superinstrução do modo funcional (src/simulador/fusion.py), só nas
+    # entradas do cache de pré-decodificação; fora de LATCH_FIELDS/as_dict
+    __slots__ = LATCH_FIELDS + ("fused",)
+
+    def __init__(self):
+        self.fused = None
+        self.clear()
+
+    def clear(self):
+        self.valid = False
+        self.ir = 0
+        self.opcode = 0
+        self.ra = 0
+        self.rb = 0
+        self.rc = 0
+        self.const_high = 0
+        self.const_low = 0
+        self.jump_addr = 0
+        self.pc = 0
+        self.reg_ra_val = 0
+        self.reg_rb_val = 0
+        self.exec_rc = 0
+        self.exec_result = None
+        self.address = 0
+        self.store_value = 0
+        self.kind = None
+
+    def get(self, key, default=None):
+        if key in LATCH_FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key):
+        if key not in LATCH_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in LATCH_FIELDS}
+
+    def __repr__(self):
+        if not self.valid:
+            return "Latch(bolha)"
+        return f"Latch(pc={self.pc}, ir=0x{self.ir:08X}, opcode={self.opcode})"
 
 def bubble():
     """Cria uma instrução bolha (NOP) para o pipeline."""
-    return {
-        "ir": 0,
-        "opcode": 0,
-        "ra": 0,
-        "rb": 0,
-        "rc": 0,
-        "const_high": 0,
-        "const_low": 0,
-        "jump_addr": 0,
-        "valid": False
-    }
-
-class CPU:
-    def __init__(self, memory):
+    return Latch()
+
+class CPU(LazyFlags):
+    def __init__(self, memory, hazard="none", predictor=None, icache=None, dcache=None):
         self.memory = memory
+        # Limite de endereços definido pela própria memória (lista, array ou PagedMemory)
+        self.mem_size = len(memory)
         self.registers = create_registers()
         self.pc = 0
         self.halted = False
+        # Motivo da parada quando não foi o programa: "loop" (enable_loop_detection())
+        self.stop_reason = None
 
-        # flags do processador
-        self.flag_neg = 0
-        self.flag_zero = 0
-        self.flag_carry = 0
-        self.flag_overflow = 0
+        # flags do processador (N, Z, C, V): calculadas só quando lidas
+        # (flag_neg/flag_zero/flag_carry/flag_overflow, src/simulador/flags.py)
+        self._nz = 1  # N = 0, Z = 0
+        self._c = self._v = FLAGS_CLEAR
 
-        # Registradores de Pipeline (iniciam como bolhas)
-        self.IF_ID = bubble()
+        # Registradores de Pipeline (iniciam como bolhas).
+        # IF_ID aponta para a entrada do cache de pré-decodificação; os demais
+        # são reutilizados a cada ciclo.
+        self._bubble = bubble()  # bolha compartilhada (nunca é escrita)
+        self.IF_ID = self._bubble
         self.ID_EX = bubble()
         self.EX_MEM = bubble()
         self.MEM_WB = bubble()
@@ -46,296 +130,266 @@ class CPU:
         # Metadados de debug
         self.ir = 0
         self.cycle = 0
+        self.instret = 0  # instruções concluídas (WB no pipeline, execução no modo funcional)
+        self.halt_pending = False  # HALT já buscado; instruções anteriores ainda no pipeline
 
-    # Funções auxiliares
-    def update_flags(self, value):
-        """Atualiza as flags Z e N com base no valor de 32 bits."""
-        val = value & 0xFFFFFFFF
-        self.flag_zero = 1 if val == 0 else 0
-        self.flag_neg = 1 if ((val >> 31) & 1) else 0
-        return val
+        # Cache de pré-decodificação: endereço -> instrução já decodificada.
+        # Invalidada pelo SW (código auto-modificável) ou por invalidate_decode().
+        self.decode_cache = {}
+        self.decode_hits = 0
+        self.decode_misses = 0
+
+        # Tradutor de blocos básicos (criado no primeiro run(mode="translated"))
+        self.translator = None
+
+        # Unidade de hazards
+        if hazard not in HAZARD_MODES:
+            raise ValueError(f"Modo de hazards desconhecido: {hazard!r} (use {', '.join(HAZARD_MODES)})")
+        self.hazard = hazard
+        self.stalls = 0            # ciclos com o ID travado (inclui load-use)
+        self.load_use_stalls = 0
+        self.flushes = 0           # instruções descartadas por previsões erradas
+        self.redirect = False      # previsão errada no EX deste ciclo: descarta IF_ID
+        self.fetch_stop = False    # HALT ou PC inválido buscado: não busca mais
+        if hazard != "none":
+            self.step = self._step_hazard
 
+        # Preditor de desvios (nome de PREDICTORS ou instância de Predictor)
+        if predictor is not None and hazard == "none":
+            raise ValueError("O preditor de desvios requer um modo de hazards diferente de 'none'")
+        if predictor is None:
+            predictor = "not_taken"
+        if not isinstance(predictor, Predictor):
+            predictor = make_predictor(predictor)
+        self.predictor = predictor
+        self.mispredicts = 0
+        self._pred_if = 0          # próximo PC previsto para a instrução em IF_ID
+        self._pred_ex = 0          # idem para a instrução em ID_EX
+
+        # Caches de instruções e de dados (instâncias de Cache ou None)
+        for cache in (icache, dcache):
+            if cache is not None:
+                if hazard == "none":
+                    raise ValueError("As caches requerem um modo de hazards diferente de 'none'")
+                if not isinstance(cache, Cache):
+                    raise TypeError(f"Esperado um Cache, recebido {type(cache).__name__}")
+        self.icache = icache
+        self.dcache = dcache
+        self.icache_stalls = 0     # bolhas inseridas pelo IF em faltas da I-cache
+        self.dcache_stalls = 0     # ciclos com MEM travado em faltas da D-cache
+        self._if_wait = 0          # ciclos restantes da falta em atendimento no IF
+        self._mem_wait = 0         # idem no MEM
+
+        # Profiler (enable_profiling()) e trace (enable_tracing()); desligados,
+        # não há custo nos estágios
+        self.profiler = None
+        self.tracer = None
+
+        # Superinstruções do modo funcional (enable_fusion())
+        self.fusion = None
+
+        # Detecção de laços infinitos no run() (enable_loop_detection())
+        self.loop_detector = None
+
+        # Checkpoints (checkpoint()/restore()): último checkpoint desta CPU e cópia
+        # da memória naquele momento, para salvar só as páginas alteradas
+        self._checkpoint_base = None
+        self._checkpoint_snapshot = None
+
+    # Funções auxiliares
     def reg(self, idx):
         """Lê um registrador, aplicando máscara no índice."""
         return read_reg(self.registers, idx & 0x1F)
 
+    def jump(self, dest):
+        """Desvia o PC para dest (usado pelos handlers de controle); fora da memória -> HALT."""
+        self.redirect = True
+        if 0 <= dest < self.mem_size:
+            self.pc = dest
+        else:
+            self.halted = True
+
     def decode_ir(self, ir):
         """Decodifica uma instrução (IR) em seus campos."""
-        return {
-            "ir": ir,
-            "opcode": get_opcode(ir),
-            "ra": get_ra(ir),
-            "rb": get_rb(ir),
-            "rc": get_rc(ir),
-            "const_high": get_const16_high(ir),
-            "const_low": get_const16_low(ir),
-            "jump_addr": get_jump_address(ir),
-            "valid": True
-        }
+        dec = Latch()
+        dec.ir = ir
+        dec.opcode = get_opcode(ir)
+        dec.ra = get_ra(ir)
+        dec.rb = get_rb(ir)
+        dec.rc = get_rc(ir)
+        dec.const_high = get_const16_high(ir)
+        dec.const_low = get_const16_low(ir)
+        dec.jump_addr = get_jump_address(ir)
+        dec.valid = True
+        return dec
+
+    def predecode(self, start=0, end=None):
+        """Pré-decodifica as palavras não nulas de [start, end) (ex.: logo após o carregamento).
+        Em PagedMemory só as páginas alocadas são percorridas."""
+        cache = self.decode_cache
+        memory = self.memory
+        for lo, hi in allocated_ranges(memory, start, end):
+            for addr in range(lo, hi):
+                ir = memory[addr]
+                if ir != 0 and addr not in cache:
+                    dec = self.decode_ir(ir)
+                    dec.pc = addr
+                    cache[addr] = dec
+
+    def invalidate_decode(self, addr=None):
+        """Descarta a decodificação de um endereço (ou de toda a memória, se addr for None).
+        Deve ser chamado quando a memória for alterada fora do estágio MEM."""
+        tr = self.translator
+        if addr is None:
+            self.decode_cache.clear()
+            if tr is not None:
+                tr.invalidate_all()
+        else:
+            self.decode_cache.pop(addr, None)
+            if tr is not None:
+                tr.invalidate(addr)
 
     # Estágio IF (Instruction Fetch)
     def IF(self):
-        if not (0 <= self.pc < MEMORY_SIZE_WORDS):
+        pc = self.pc
+        if not (0 <= pc < self.mem_size):
             self.halted = True
             return
-        ir = self.memory[self.pc]
+        # O latch em cache é compartilhado: os estágios seguintes apenas o leem
+        dec = self.decode_cache.get(pc)
+        if dec is None:
+            self.decode_misses += 1
+            dec = self.decode_ir(self.memory[pc])
+            dec.pc = pc
+            self.decode_cache[pc] = dec
+        else:
+            self.decode_hits += 1
+        ir = dec.ir
         self.ir = ir
-        self.IF_ID = self.decode_ir(ir)
-        self.IF_ID["pc"] = self.pc
-        self.pc += 1
-        
+        self.IF_ID = dec
+        self.pc = pc + 1
+
         # Detecção de HALT antecipada
         if ir == HALT_INSTRUCTION:
              self.halted = True
+             self.halt_pending = True
 
     # Estágio ID (Instruction Decode)
     def ID(self):
-        if not self.IF_ID.get("valid", False):
-            self.ID_EX = bubble()
+        src = self.IF_ID
+        dec = self.ID_EX
+        if not src.valid:
+            dec.valid = False
             return
-        
-        # Cria o registrador de pipeline ID_EX
-        dec = {
-            "ir": self.IF_ID["ir"],
-            "opcode": self.IF_ID["opcode"],
-            "ra": self.IF_ID["ra"],
-            "rb": self.IF_ID["rb"],
-            "rc": self.IF_ID["rc"],
-            "const_high": self.IF_ID["const_high"],
-            "const_low": self.IF_ID["const_low"],
-            "jump_addr": self.IF_ID["jump_addr"],
-            "pc": self.IF_ID.get("pc", 0),
-            "valid": True
-        }
-        
+
+        # Preenche o registrador de pipeline ID_EX
+        dec.ir = src.ir
+        dec.opcode = src.opcode
+        dec.ra = src.ra
+        dec.rb = src.rb
+        dec.rc = src.rc
+        dec.const_high = src.const_high
+        dec.const_low = src.const_low
+        dec.jump_addr = src.jump_addr
+        dec.pc = src.pc
+        dec.valid = True
+
         # Leitura do Arquivo de Registradores
-        dec["reg_ra_val"] = self.reg(dec["ra"])
-        dec["reg_rb_val"] = self.reg(dec["rb"])
-        self.ID_EX = dec
+        regs = self.registers
+        dec.reg_ra_val = regs[src.ra]
+        dec.reg_rb_val = regs[src.rb]
 
     # Estágio EX (Execute)
     def EX(self):
-        if not self.ID_EX.get("valid", False):
-            self.EX_MEM = bubble()
+        dec = self.ID_EX
+        out = self.EX_MEM
+        if not dec.valid:
+            out.valid = False
             return
 
-        opcode = self.ID_EX["opcode"]
-        a_val = self.ID_EX.get("reg_ra_val", 0)
-        b_val = self.ID_EX.get("reg_rb_val", 0)
-        rc = self.ID_EX["rc"]
-        const_high = self.ID_EX["const_high"]
-        const_low = self.ID_EX["const_low"]
-        jump_addr = self.ID_EX["jump_addr"]
-        pc_of_inst = self.ID_EX.get("pc", 0)
-
-        exec_result = None
-        exec_rc = rc # O registrador destino é, por padrão, RC
-        
-        # Lógica de Execução
-        
-        # 1. ALU (ADD, SUB, ZERO, XOR, OR, AND)
-        if opcode == 1:  # ADD
-            res = (a_val + b_val) & 0xFFFFFFFF
-            self.flag_carry = 1 if (a_val + b_val) > 0xFFFFFFFF else 0
-            sa, sb, sr = (a_val >> 31) & 1, (b_val >> 31) & 1, (res >> 31) & 1
-            self.flag_overflow = 1 if (sa == sb and sa != sr) else 0
-            exec_result = self.update_flags(res)
-        elif opcode == 2:  # SUB
-            res = (a_val - b_val) & 0xFFFFFFFF
-            self.flag_carry = 1 if a_val >= b_val else 0
-            sa, sb, sr = (a_val >> 31) & 1, (b_val >> 31) & 1, (res >> 31) & 1
-            self.flag_overflow = 1 if (sa != sb and sa != sr) else 0
-            exec_result = self.update_flags(res)
-        elif opcode == 3:  # ZERO
-            exec_result = self.update_flags(0)
-            self.flag_zero = 1
-        elif opcode == 4:  # XOR
-            res = (a_val ^ b_val) & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-        elif opcode == 5:  # OR
-            res = (a_val | b_val) & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-        elif opcode == 7:  # AND
-            res = (a_val & b_val) & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-
-        # 2. Shifts
-        elif opcode == 16:  # ASL
-            shift = b_val & 31
-            wide = (a_val << shift) & 0xFFFFFFFFFFFFFFFF
-            res = wide & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-            self.flag_carry = 1 if (wide >> 32) & 1 else 0
-        elif opcode == 17:  # ASR (Shift Aritmético para a Direita)
-            shift = b_val & 31
-            if a_val & 0x80000000:
-                # Simula o comportamento de signed shift
-                signed = a_val - (1 << 32)
-                res = (signed >> shift) & 0xFFFFFFFF
-            else:
-                res = (a_val >> shift) & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-        elif opcode == 18:  # LSL
-            shift = b_val & 31
-            wide = (a_val << shift) & 0xFFFFFFFFFFFFFFFF
-            res = wide & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-            self.flag_carry = 1 if (wide >> 32) & 1 else 0
-        elif opcode == 19:  # LSR
-            shift = b_val & 31
-            res = (a_val >> shift) & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-
-        # 3. CONSTS
-        elif opcode == 20:  # LCLH (Load Constant High)
-            # LCLH: Carrega nos 16 bits altos
-            high = (const_high & 0xFFFF) << 16
-            low = self.reg(rc) & 0xFFFF # Mantém os 16 bits baixos
-            res = (high | low) & 0xFFFFFFFF
-            exec_result = self.update_flags(res)
-        
-        elif opcode == 21:  # LCLL (Load Constant Low)
-            # LCLL: Carrega nos 16 bits baixos e zera os altos
-            constant_16_val = (const_high << 8) | const_low # Usando high e low para formar os 16 bits
-            res = constant_16_val
-            exec_result = self.update_flags(res)
-
-        # 4. LOAD / STORE
-        elif opcode == 22:  # LW (Load Word - rc = MEM[ra + imm16])
-            addr = (a_val + (const_low & 0xFFFF))
-            # Prepara o registrador de pipeline para a fase MEM
-            self.EX_MEM = {
-                "ir": self.ID_EX["ir"],
-                "valid": True,
-                "opcode": opcode,
-                "rc": rc,
-                "address": addr, # Endereço calculado
-                "exec_rc": rc,
-                "exec_result": None # Resultado da memória será preenchido em MEM
-            }
-            return
-            
-        elif opcode == 23:  # SW (Store Word - MEM[ra+imm16] = rb_value)
-            addr = (a_val + (const_low & 0xFFFF))
-            store_value = b_val
-            # Prepara o registrador de pipeline para a fase MEM
-            self.EX_MEM = {
-                "ir": self.ID_EX["ir"],
-                "valid": True,
-                "opcode": opcode,
-                "rc": rc,
-                "address": addr, # Endereço calculado
-                "store_value": store_value # Valor a ser armazenado
-            }
-            return
+        out.ir = dec.ir
+        out.valid = True
+        out.opcode = dec.opcode
+        out.pc = dec.pc
 
-        # 5. Branches / Jumps
-        elif opcode == 24:  # JAL (Jump and Link)
-            ret = pc_of_inst + 1 # Endereço de retorno (PC+1 da instrução atual)
-            exec_result = ret
-            exec_rc = 31 # Destino é R31 (Link Register)
-            jump_addr_val = self.ID_EX["jump_addr"]
-            dest = jump_addr_val & 0xFFFFFF
-            
-            # Atualiza o PC para o salto (Controle)
-            if 0 <= dest < MEMORY_SIZE_WORDS:
-                self.pc = dest
-            else:
-                self.halted = True
-        elif opcode == 25:  # JR (Jump Register)
-            dest = a_val
-            # Atualiza o PC para o salto (Controle)
-            if 0 <= dest < MEMORY_SIZE_WORDS:
-                self.pc = dest
-            else:
-                self.halted = True
-        elif opcode == 26:  # BEQ (Branch on Equal)
-            jump_addr_val = self.ID_EX["jump_addr"]
-            if a_val == b_val:
-                dest = jump_addr_val
-                # Atualiza o PC para o salto (Controle)
-                if 0 <= dest < MEMORY_SIZE_WORDS:
-                    self.pc = dest
-                else:
-                    self.halted = True
-        elif opcode == 27:  # BNE (Branch on Not Equal)
-            jump_addr_val = self.ID_EX["jump_addr"]
-            if a_val != b_val:
-                dest = jump_addr_val
-                # Atualiza o PC para o salto (Controle)
-                if 0 <= dest < MEMORY_SIZE_WORDS:
-                    self.pc = dest
-                else:
-                    self.halted = True
-        elif opcode == 28:  # J (Jump incondicional)
-            jump_addr_val = self.ID_EX["jump_addr"]
-            dest = jump_addr_val
-            # Atualiza o PC para o salto (Controle)
-            if 0 <= dest < MEMORY_SIZE_WORDS:
-                self.pc = dest
-            else:
-                self.halted = True
+        # Despacho pela tabela de opcodes (src/simulador/execute.py)
+        op = EXEC_TABLE[dec.opcode]
+        if op is None:  # NOP, HALT ou opcode não implementado
+            out.kind = None
+            out.exec_result = None
+            return
 
-        # Padrão: Escrita no EX/MEM para todas as instruções que não sejam LW/SW
-        # (ALU, CONST, JAL)
-        self.EX_MEM = {
-            "ir": self.ID_EX["ir"],
-            "valid": True,
-            "opcode": opcode,
-            "exec_result": exec_result, # Resultado da ALU/CONST/PC+1
-            "exec_rc": exec_rc # Registrador destino
-        }
+        kind = op.kind
+        out.kind = kind
+        value = op.handler(self, dec, dec.reg_ra_val, dec.reg_rb_val)
+        if kind == LOAD or kind == STORE:
+            # Endereço calculado; o acesso à memória é feito em MEM
+            out.address = value
+            out.store_value = dec.reg_rb_val
+            out.exec_result = None
+            out.exec_rc = dec.rc
+        else:
+            out.exec_result = value # Resultado da ALU/CONST/PC+1
+            out.exec_rc = dec.rc if op.dest is None else op.dest # Registrador destino
 
     # Estágio MEM (Memory Access)
     def MEM(self):
-        if not self.EX_MEM.get("valid", False):
-            self.MEM_WB = bubble()
+        src = self.EX_MEM
+        memwb = self.MEM_WB
+        if not src.valid:
+            memwb.valid = False
             return
 
-        opcode = self.EX_MEM.get("opcode")
-        memwb = {
-            "ir": self.EX_MEM.get("ir"),
-            "opcode": opcode,
-            "valid": True,
-            "exec_rc": self.EX_MEM.get("exec_rc"),
-            "exec_result": self.EX_MEM.get("exec_result") # Resultado de EX (para ALU/CONST/JAL)
-        }
+        kind = src.kind
 
-        if opcode == 22:  # LW (Leitura da Memória)
-            addr = self.EX_MEM.get("address", 0)
-            if not (0 <= addr < MEMORY_SIZE_WORDS):
+        if kind == LOAD:  # LW (Leitura da Memória)
+            addr = src.address
+            if not (0 <= addr < self.mem_size):
                 self.halted = True
                 return
             value = self.memory[addr] & 0xFFFFFFFF
             # O resultado para o WB é o valor lido da memória
-            memwb["exec_result"] = self.update_flags(value) 
+            memwb.exec_result = self._nz = value  # define N/Z
             
-        elif opcode == 23:  # SW (Escrita na Memória)
-            addr = self.EX_MEM.get("address", 0)
-            if not (0 <= addr < MEMORY_SIZE_WORDS):
+        elif kind == STORE:  # SW (Escrita na Memória)
+            addr = src.address
+            if not (0 <= addr < self.mem_size):
                 self.halted = True
                 return
-            self.memory[addr] = self.EX_MEM.get("store_value", 0) & 0xFFFFFFFF
+            self.memory[addr] = src.store_value & 0xFFFFFFFF
+            # Código auto-modificável: a decodificação antiga deixa de valer
+            self.decode_cache.pop(addr, None)
+            tr = self.translator
+            if tr is not None and addr in tr.covered:
+                tr.invalidate(addr)
             # SW não escreve em registradores (resultado é None)
-            memwb["exec_result"] = None
-        
-        self.MEM_WB = memwb
+            memwb.exec_result = None
+        else:
+            memwb.exec_result = src.exec_result # Resultado de EX (para ALU/CONST/JAL)
+
+        memwb.ir = src.ir
+        memwb.opcode = src.opcode
+        memwb.pc = src.pc
+        memwb.exec_rc = src.exec_rc
+        memwb.valid = True
 
     # Estágio WB (Write Back)
     def WB(self):
-        if not self.MEM_WB.get("valid", False):
+        src = self.MEM_WB
+        if not src.valid:
             return
+        self.instret += 1
         
         # Só escreve no registrador se o resultado de execução não for None
-        if self.MEM_WB.get("exec_result") is not None:
-            dest = self.MEM_WB.get("exec_rc") & 0x1F
+        result = src.exec_result
+        if result is not None:
+            dest = src.exec_rc & 0x1F
             # R0 (índice 0) não pode ser escrito.
             if dest != 0:
-                write_reg(self.registers, dest, self.MEM_WB.get("exec_result"))
+                write_reg(self.registers, dest, result)
                 
         # Detecção final de HALT (caso a instrução HALT tenha passado pelo pipeline)
-        ir = self.MEM_WB.get("ir")
-        if ir == HALT_INSTRUCTION:
+        if src.ir == HALT_INSTRUCTION:
             self.halted = True
 
     # step: avança um ciclo de clock (WB -> MEM -> EX -> ID -> IF)
@@ -350,7 +404,689 @@ class CPU:
         self.ID()
         self.IF()
 
+    # step com unidade de hazards (hazard != "none"); substitui self.step
+    def _step_hazard(self):
+        if self.halted:
+            return
+        self.cycle += 1
+        self.WB()
+        if self.halted:  # HALT chegou ao WB (as instruções seguintes nem foram buscadas)
+            self.MEM_WB.valid = False
+            return
+        if self.dcache is not None and self._dcache_stall():
+            self.MEM_WB.valid = False  # WB recebe bolha; os demais estágios ficam parados
+            self.dcache_stalls += 1
+            return
+        self.MEM()
+        if self.halted:  # acesso fora da memória: as instruções seguintes não executam
+            return
+        self.redirect = False
+        fetch_pc = self.pc
+        self.EX()
+        out = self.EX_MEM
+        if out.valid and out.kind == CONTROL:
+            self._resolve_branch(out, fetch_pc)
+        if self.redirect:
+            # Previsão errada: a instrução buscada no caminho errado é descartada,
+            # assim como um HALT ou PC inválido que tenha parado a busca
+            if self.IF_ID.valid:
+                self.flushes += 1
+            self.IF_ID = self._bubble
+            self.fetch_stop = self.halted
+            self._if_wait = 0  # abandona a falta de I-cache do caminho errado
+            if self.halted:
+                # Desvio para fora da memória: conclui as instruções anteriores e para
+                self.halted = False
+                out.exec_result = None
+        if self._ID_hazard():
+            self.stalls += 1   # IF_ID é mantido e o PC não avança
+        elif self.fetch_stop:
+            self.IF_ID = self._bubble
+        else:
+            self._IF_hazard()
+        if self.fetch_stop and not self.any_pipeline_active():
+            self.halted = True
+
+    def _dcache_stall(self):
+        """Consulta a D-cache para o LW/SW em EX_MEM. Retorna True se o MEM trava."""
+        if self._mem_wait:
+            self._mem_wait -= 1
+            return self._mem_wait > 0  # no último ciclo da falta o acesso conclui
+        src = self.EX_MEM
+        if not src.valid:
+            return False
+        kind = src.kind
+        if (kind == LOAD or kind == STORE) and 0 <= src.address < self.mem_size:
+            self._mem_wait = self.dcache.access(src.address, kind == STORE)
+            return self._mem_wait > 0
+        return False
+
+    def _resolve_branch(self, out, fetch_pc):
+        """Compara o desvio resolvido no EX com a previsão feita no IF."""
+        taken = self.redirect
+        if self.halted:
+            actual = None  # alvo fora da memória
+        elif taken:
+            actual = self.pc
+        else:
+            actual = out.pc + 1
+        mispredicted = actual != self._pred_ex
+        if mispredicted:
+            self.mispredicts += 1
+            if actual is not None:
+                self.pc = actual
+        else:
+            self.pc = fetch_pc  # a busca seguiu o caminho certo
+        self.redirect = mispredicted
+        self.predictor.update(out.pc, out, taken, actual if taken else None,
+                              mispredicted, MISPREDICT_PENALTY if mispredicted else 0)
+
+    def _writer(self, latch, in_ex_mem):
+        """Registrador que a instrução no latch ainda vai escrever (ou None)."""
+        if not latch.valid:
+            return None
+        if in_ex_mem and latch.kind == LOAD:
+            return latch.exec_rc & 0x1F
+        if latch.exec_result is None:
+            return None
+        return latch.exec_rc & 0x1F
+
+    def _ID_hazard(self):
+        """ID com detecção de hazards e encaminhamento. Retorna True se travou."""
+        src = self.IF_ID
+        dec = self.ID_EX
+        if not src.valid:
+            dec.valid = False
+            return False
+        regs = self.registers
+        a_val = regs[src.ra]
+        b_val = regs[src.rb]
+        op = EXEC_TABLE[src.opcode]
+        if op is not None and op.reads:
+            ex = self.EX_MEM
+            wb = self.MEM_WB
+            ex_dest = self._writer(ex, True)
+            wb_dest = self._writer(wb, False)
+            mode = self.hazard
+            for field in op.reads:
+                reg = getattr(src, field)
+                if reg == 0:
+                    continue
+                if field == "rc":
+                    # LCLH lê rc no EX: o produtor em MEM/WB já terá escrito
+                    if reg == ex_dest:
+                        dec.valid = False
+                        return True
+                    continue
+                if reg == ex_dest:
+                    if mode == "stall" or ex.kind == LOAD:
+                        if ex.kind == LOAD:
+                            self.load_use_stalls += 1
+                        dec.valid = False
+                        return True
+                    value = ex.exec_result
+                elif reg == wb_dest:
+                    if mode != "full":
+                        dec.valid = False
+                        return True
+                    value = wb.exec_result
+                else:
+                    continue
+                if field == "ra":
+                    a_val = value
+                else:
+                    b_val = value
+
+        dec.ir = src.ir
+        dec.opcode = src.opcode
+        dec.ra = src.ra
+        dec.rb = src.rb
+        dec.rc = src.rc
+        dec.const_high = src.const_high
+        dec.const_low = src.const_low
+        dec.jump_addr = src.jump_addr
+        dec.pc = src.pc
+        dec.valid = True
+        dec.reg_ra_val = a_val
+        dec.reg_rb_val = b_val
+        self._pred_ex = self._pred_if
+        return False
+
+    def _IF_hazard(self):
+        """IF dos modos com unidade de hazards: HALT/PC inválido apenas param a busca."""
+        pc = self.pc
+        if not (0 <= pc < self.mem_size):
+            self.fetch_stop = True
+            self.IF_ID = self._bubble
+            return
+        if self.icache is not None:
+            if self._if_wait:
+                self._if_wait -= 1
+            else:
+                self._if_wait = self.icache.access(pc)
+            if self._if_wait:
+                self.icache_stalls += 1
+                self.IF_ID = self._bubble
+                return
+        dec = self.decode_cache.get(pc)
+        if dec is None:
+            self.decode_misses += 1
+            dec = self.decode_ir(self.memory[pc])
+            dec.pc = pc
+            self.decode_cache[pc] = dec
+        else:
+            self.decode_hits += 1
+        self.ir = dec.ir
+        self.IF_ID = dec
+        if dec.ir == HALT_INSTRUCTION:
+            self.fetch_stop = True
+        nxt = self.predictor.predict(pc, dec)
+        if not (0 <= nxt < self.mem_size):
+            nxt = pc + 1  # alvo previsto fora da memória: segue em sequência
+        self._pred_if = nxt
+        self.pc = nxt
+
+    def hazard_stats(self):
+        """Ciclos, instruções concluídas, travamentos, descartes, previsões, caches e CPI."""
+        branch_penalty = self.mispredicts * MISPREDICT_PENALTY
+        mem_stalls = self.icache_stalls + self.dcache_stalls
+        stats = {
+            "hazard": self.hazard,
+            "cycles": self.cycle,
+            "instret": self.instret,
+            "stalls": self.stalls,
+            "load_use_stalls": self.load_use_stalls,
+            "flushes": self.flushes,
+            "predictor": self.predictor.name,
+            "mispredicts": self.mispredicts,
+            "branch_penalty": branch_penalty,
+            "cpi": self.cycle / self.instret if self.instret else 0.0,
+            # parcela do CPI devida a previsões erradas
+            "branch_cpi": branch_penalty / self.instret if self.instret else 0.0,
+            "icache_stalls": self.icache_stalls,
+            "dcache_stalls": self.dcache_stalls,
+            # parcela do CPI devida a faltas nas caches
+            "memory_cpi": mem_stalls / self.instret if self.instret else 0.0,
+        }
+        if self.icache is not None:
+            stats["icache"] = self.icache.stats()
+        if self.dcache is not None:
+            stats["dcache"] = self.dcache.stats()
+        return stats
+
+    # Profiling e tracing: instalam versões instrumentadas de WB/step como
+    # atributos da instância (cada uma chama a anterior), de modo que o caminho
+    # normal não testa se estão ligados. Desligue na ordem inversa à que ligou.
+    def _restore_method(self, name, saved):
+        if getattr(saved, "__func__", None) is getattr(CPU, name):
+            self.__dict__.pop(name, None)  # volta ao método da classe
+        else:
+            setattr(self, name, saved)
+
+    def enable_profiling(self, profiler=None):
+        """Liga os contadores por PC e por opcode; retorna o Profiler."""
+        if profiler is None:
+            profiler = Profiler()
+        if self.profiler is None:
+            self._WB_unprofiled = self.WB
+            self.WB = self._WB_profiled
+            if self.hazard != "none":
+                self._step_inner = self.step
+                self.step = self._step_profiled
+        self.profiler = profiler
+        return profiler
+
+    def disable_profiling(self):
+        """Desliga o profiling e retorna o Profiler com os contadores acumulados."""
+        profiler = self.profiler
+        if profiler is not None:
+            self._restore_method("WB", self._WB_unprofiled)
+            if self.hazard != "none":
+                self._restore_method("step", self._step_inner)
+            self.profiler = None
+        return profiler
+
+    def _WB_profiled(self):
+        src = self.MEM_WB
+        if src.valid:
+            self.profiler.add("executed", src.pc, src.opcode)
+        self._WB_unprofiled()
+
+    def enable_tracing(self, recorder):
+        """Grava um registro por ciclo do pipeline no TraceRecorder; retorna o recorder."""
+        if self.tracer is not None:
+            self.disable_tracing()
+        # WB é o primeiro estágio avaliado em todo ciclo (step, _step_hazard e
+        # _drain): os latches ainda mostram o que cada estágio processa no ciclo
+        self._WB_untraced = self.WB
+        self.WB = recorder.hook(self, self._WB_untraced)
+        self.tracer = recorder
+        return recorder
+
+    def disable_tracing(self):
+        """Desliga o tracing (sem fechar o recorder) e o retorna."""
+        recorder = self.tracer
+        if recorder is not None:
+            self._restore_method("WB", self._WB_untraced)
+            recorder.unhook()
+            recorder.flush()  # cada bloco em disco cobre ciclos consecutivos
+            self.tracer = None
+        return recorder
+
+    def _step_profiled(self):
+        """step dos modos com unidade de hazards, atribuindo travamentos e faltas a PCs."""
+        prof = self.profiler
+        stalls = self.stalls
+        mispredicts = self.mispredicts
+        dcache_stalls = self.dcache_stalls
+        icache_stalls = self.icache_stalls
+        icache, dcache = self.icache, self.dcache
+        imiss = icache.misses if icache is not None else 0
+        dmiss = dcache.misses if dcache is not None else 0
+        mem = self.EX_MEM  # instrução que acessa a D-cache neste ciclo
+        mem_pc, mem_op = mem.pc, mem.opcode
+
+        self._step_inner()
+
+        if self.stalls != stalls:
+            src = self.IF_ID  # instrução mantida no ID
+            prof.add("stalls", src.pc, src.opcode, self.stalls - stalls)
+        if self.mispredicts != mispredicts:
+            br = self.EX_MEM
+            prof.add("branch_penalty", br.pc, br.opcode,
+                     (self.mispredicts - mispredicts) * MISPREDICT_PENALTY)
+        if self.dcache_stalls != dcache_stalls:
+            prof.add("cache_stalls", mem_pc, mem_op, self.dcache_stalls - dcache_stalls)
+        if dcache is not None and dcache.misses != dmiss:
+            prof.add("dcache_misses", mem_pc, mem_op, dcache.misses - dmiss)
+        if icache is not None and (self.icache_stalls != icache_stalls or icache.misses != imiss):
+            # A busca travada não avança o PC
+            pc = self.pc
+            op = (self.memory[pc] >> 26) if 0 <= pc < self.mem_size else 0
+            if self.icache_stalls != icache_stalls:
+                prof.add("cache_stalls", pc, op, self.icache_stalls - icache_stalls)
+            if icache.misses != imiss:
+                prof.add("icache_misses", pc, op, icache.misses - imiss)
+
+    def _run_functional_profiled(self, limit, stop_pc=-1):
+        """Modo funcional uma instrução por vez, contando execuções por PC."""
+        prof = self.profiler
+        cache = self.decode_cache
+        n = 0
+        while n != limit and not self.halted:
+            pc = self.pc
+            if pc == stop_pc and n:
+                break
+            if not self._run_functional(1):
+                break
+            dec = cache.get(pc)
+            prof.add("executed", pc, dec.opcode if dec is not None else 0)
+            n += 1
+        return n
+
+    # Superinstruções (src/simulador/fusion.py)
+    def enable_fusion(self, start=0, end=None):
+        """Funde pares de instruções de [start, end) para o modo funcional.
+        Pode ser chamado de novo depois de carregar ou alterar código."""
+        if self.fusion is None:
+            self.fusion = Fusion(self)
+        self.fusion.scan(start, end)
+        return self.fusion
+
+    def disable_fusion(self):
+        fusion = self.fusion
+        if fusion is not None:
+            fusion.clear()
+        self.fusion = None
+        return fusion
+
+    # Laços infinitos (src/simulador/loops.py)
+    def enable_loop_detection(self, interval=LOOP_CHECK_INTERVAL):
+        """Faz o run() parar laços sem mudança de estado (stop_reason = "loop")."""
+        self.loop_detector = LoopDetector(self, interval)
+        return self.loop_detector
+
+    def disable_loop_detection(self):
+        detector = self.loop_detector
+        self.loop_detector = None
+        return detector
+
+    # Checkpoints (src/simulador/checkpoint.py)
+    def checkpoint(self):
+        """Salva o estado completo; a memória entra como delta sobre o checkpoint anterior."""
+        return ckpt.capture(self)
+
+    def restore(self, checkpoint):
+        """Volta ao estado do checkpoint (da mesma CPU ou de outra com a mesma memória/modo)."""
+        ckpt.apply(self, checkpoint, bubble)
+
+    # Troca entre o modo funcional e o pipeline (simulação por amostragem)
+    def reset_pipeline(self):
+        """Esvazia os latches para o pipeline começar a buscar em self.pc.
+
+        Usado depois de avançar no modo funcional/translated, que só mantém o
+        estado arquitetural: os latches viram bolhas e o estado de busca, de
+        previsão e das faltas de cache em andamento é zerado. Preditor e caches
+        mantêm o que aprenderam.
+        """
+        self.IF_ID = self._bubble
+        # Esvaziados no lugar: o gancho do trace guarda referências a estes latches
+        self.ID_EX.clear()
+        self.EX_MEM.clear()
+        self.MEM_WB.clear()
+        self.halt_pending = False
+        self.fetch_stop = False
+        self.redirect = False
+        self._pred_if = self._pred_ex = 0
+        self._if_wait = self._mem_wait = 0
+
+    def drain(self, max_cycles=None):
+        """Conclui as instruções em andamento no pipeline sem buscar novas.
+
+        Depois de drain() o estado é só arquitetural e self.pc é o endereço da
+        próxima instrução, de modo que run(mode="functional") continua dali.
+        Com a unidade de hazards, um desvio com previsão errada busca uma única
+        instrução do caminho certo (o redirecionamento religa a busca), que
+        também é concluída. Retorna o número de ciclos.
+        """
+        limit = -1 if max_cycles is None else max_cycles
+        if self.hazard == "none":
+            return self._drain(limit)
+        if self.halted:
+            return 0
+        n = 0
+        stop = False  # o programa terminou: HALT no WB ou desvio para fora da memória
+        while n != limit and not self.halted and self.any_pipeline_active():
+            self.fetch_stop = True
+            wb = self.MEM_WB
+            halt = wb.valid and wb.ir == HALT_INSTRUCTION
+            self.step()
+            n += 1
+            if halt or (self.redirect and self.fetch_stop):
+                stop = True
+        if self.halted and not stop and not self.any_pipeline_active():
+            self.halted = False  # parou só porque a busca foi desligada aqui
+        self.fetch_stop = stop
+        return n
+
     # utilidade: verifica se o pipeline ainda tem instruções válidas
     def any_pipeline_active(self):
-        return (self.IF_ID.get("valid", False) or self.ID_EX.get("valid", False)
-                or self.EX_MEM.get("valid", False) or self.MEM_WB.get("valid", False))
\ No newline at end of file
+        return (self.IF_ID.valid or self.ID_EX.valid
+                or self.EX_MEM.valid or self.MEM_WB.valid)
+
+    # run: executa até HALT (ou até max_cycles) no modo escolhido
+    def run(self, max_cycles=None, mode="pipeline"):
+        """Executa o programa a partir do estado atual.
+
+        mode="pipeline": avança o modelo de 5 estágios ciclo a ciclo; ao buscar o
+        HALT, esvazia o pipeline para que as instruções anteriores sejam concluídas.
+        mode="functional": executa uma instrução por iteração direto da memória,
+        sem latches; max_cycles limita o número de instruções.
+        mode="translated": como o funcional, mas executa blocos básicos traduzidos
+        para funções Python compiladas (src/simulador/translator.py).
+        Para programas sem hazards (o pipeline não tem forwarding), o estado
+        arquitetural final (registradores, flags e memória) é o mesmo nos dois modos.
+        Com enable_loop_detection(), um laço que não muda o estado para a CPU
+        com stop_reason = "loop".
+        Retorna o número de ciclos (ou instruções) executados.
+        """
+        if self.loop_detector is not None:
+            return self.loop_detector.run(max_cycles, mode)
+        return self._run_mode(max_cycles, mode)
+
+    def _run_mode(self, max_cycles, mode):
+        if mode == "pipeline":
+            return self._run_pipeline(max_cycles)
+        if mode == "functional":
+            if self.profiler is not None:
+                return self._run_functional_profiled(-1 if max_cycles is None else max_cycles)
+            return self._run_functional(max_cycles)
+        if mode == "translated":
+            if self.profiler is not None:
+                raise ValueError("Profiling não é suportado no modo 'translated' (use 'functional')")
+            if self.translator is None:
+                self.translator = Translator(self)
+            return self.translator.run(-1 if max_cycles is None else max_cycles)
+        raise ValueError(f"Modo de execucao desconhecido: {mode!r}")
+
+    # Execução em fatias para quem controla a simulação de fora (GUIs, painéis)
+    def run_for(self, cycles, mode="pipeline"):
+        """Executa até `cycles` ciclos (instruções nos modos functional e
+        translated) ou até o HALT; chamadas seguidas continuam de onde a anterior
+        parou. Retorna quantos foram executados."""
+        if cycles < 0:
+            raise ValueError(f"Número de ciclos inválido: {cycles}")
+        return self.run(cycles, mode)
+
+    def run_until(self, pc=None, predicate=None, max_cycles=None, mode="pipeline"):
+        """Executa até a próxima ocorrência de pc e/ou até predicate(cpu) ser verdadeiro.
+
+        pc, nos modos functional e translated: para antes de executar a
+        instrução em pc (o translated usa o interpretador funcional aqui). No
+        pipeline: para no fim do ciclo em que ela passa do IF_ID para o ID_EX
+        (buscas do caminho errado, descartadas no IF_ID, não contam). O pc do
+        estado inicial não conta como ocorrência.
+        predicate é chamado depois de cada ciclo (ou instrução): prefira pc,
+        que roda no laço interno. Também para no HALT e em max_cycles (a
+        detecção de laços do run() não é usada). Retorna os ciclos (ou instruções).
+        """
+        if mode not in ("pipeline", "functional", "translated"):
+            raise ValueError(f"Modo de execucao desconhecido: {mode!r}")
+        if pc is None and predicate is None:
+            return self.run(max_cycles, mode)
+        limit = -1 if max_cycles is None else max_cycles
+        if predicate is None:
+            if mode == "pipeline":
+                return self._run_pipeline_until((pc,), limit)[0]
+            if self.profiler is not None:
+                return self._run_functional_profiled(limit, pc)
+            return self._run_functional(max_cycles, pc)
+
+        if mode == "translated":
+            mode = "functional"
+        n = 0
+        while n != limit and (not self.halted or self.halt_pending):
+            stalls = self.dcache_stalls
+            done = self._run_mode(1, mode)
+            if not done:
+                break
+            n += done
+            if pc is not None:
+                if mode == "pipeline":
+                    if self._entered_id_ex(stalls) == pc:
+                        break
+                elif self.pc == pc:
+                    break
+            if predicate(self):
+                break
+        return n
+
+    def _entered_id_ex(self, dcache_stalls):
+        """PC da instrução que entrou no ID_EX no último ciclo (ou None).
+
+        Só o IF_ID é descartado numa previsão errada: a instrução que chega ao
+        ID_EX vai ser concluída, a menos que a CPU pare antes (acesso ou desvio
+        para fora da memória neste ciclo, ou LW/SW fora da memória em EX_MEM
+        no próximo). dcache_stalls é o contador antes do ciclo; se mudou, o
+        ciclo foi uma falta de D-cache e os latches ficaram parados.
+        """
+        dec = self.ID_EX
+        if not dec.valid or self.dcache_stalls != dcache_stalls:
+            return None
+        if self.halted and not self.halt_pending:
+            return None
+        older = self.EX_MEM
+        if (older.valid and (older.kind == LOAD or older.kind == STORE)
+                and not (0 <= older.address < self.mem_size)):
+            return None
+        return dec.pc
+
+    def _run_pipeline_until(self, pcs, limit, events=()):
+        """_run_pipeline que para no ciclo em que uma instrução de pcs entra no
+        ID_EX ou em que events (lista preenchida pelos WB/MEM instrumentados de
+        um stream.Watch) deixa de estar vazia. Retorna (ciclos, True se uma
+        instrução de pcs entrou no ID_EX no último ciclo)."""
+        n = 0
+        skip = ((self.icache is not None or self.dcache is not None)
+                and self.profiler is None and self.tracer is None)
+        reached = False
+        while n != limit and not self.halted:
+            stalls = self.dcache_stalls
+            self.step()
+            n += 1
+            if pcs and self._entered_id_ex(stalls) in pcs:
+                reached = True
+                break
+            if events:
+                break
+            if skip and (self._if_wait > 1 or self._mem_wait > 1):
+                n += self._skip_idle(limit - n if limit >= 0 else -1)
+        # Depois do HALT (modo "none") as instruções já buscadas ainda entram no ID_EX
+        while self.halt_pending and not reached and not events and n != limit:
+            n += self._drain(1)
+            reached = bool(pcs) and self._entered_id_ex(self.dcache_stalls) in pcs
+        return n, reached
+
+    def stream(self, every=streaming.DEFAULT_EVERY, mode="pipeline", max_cycles=None,
+               registers=None, stores=None):
+        """Gerador de Snapshots a cada `every` ciclos e nos eventos pedidos
+        (escrita em registers, SW em stores=(inicio, fim)); ver src/simulador/stream.py."""
+        return streaming.stream(self, every, mode, max_cycles, registers, stores)
+
+    def _run_pipeline(self, max_cycles):
+        limit = -1 if max_cycles is None else max_cycles
+        n = 0
+        # Faltas de cache com o pipeline vazio são puladas de uma vez; profiling
+        # e tracing precisam ver cada ciclo
+        skip = ((self.icache is not None or self.dcache is not None)
+                and self.profiler is None and self.tracer is None)
+        while n != limit and not self.halted:
+            self.step()
+            n += 1
+            if skip and (self._if_wait > 1 or self._mem_wait > 1):
+                n += self._skip_idle(limit - n if limit >= 0 else -1)
+        if self.halt_pending:
+            n += self._drain(limit - n if limit >= 0 else -1)
+        return n
+
+    def _skip_idle(self, limit):
+        """Avança de uma vez os ciclos seguintes que só esperam uma falta de cache.
+
+        Com MEM travado pela D-cache, cada ciclo só desconta a espera (os
+        estágios anteriores ficam parados e o WB recebe bolhas). Na falta da
+        I-cache o mesmo vale se o pipeline só tem bolhas. Os contadores ficam
+        iguais aos da simulação ciclo a ciclo; o último ciclo da espera é
+        simulado normalmente. Retorna os ciclos pulados (no máximo limit).
+        """
+        if self._mem_wait > 1:
+            if self.MEM_WB.valid:
+                return 0
+            k = self._mem_wait - 1
+            if 0 <= limit < k:
+                k = limit
+            self._mem_wait -= k
+            self.dcache_stalls += k
+        elif (self._if_wait > 1 and not self._mem_wait and not self.fetch_stop
+                and not self.any_pipeline_active()):
+            k = self._if_wait - 1
+            if 0 <= limit < k:
+                k = limit
+            self._if_wait -= k
+            self.icache_stalls += k
+        else:
+            return 0
+        self.cycle += k
+        return k
+
+    def _drain(self, limit):
+        """Conclui as instruções anteriores ao HALT sem buscar novas."""
+        n = 0
+        while n != limit and self.any_pipeline_active():
+            self.cycle += 1
+            self.WB()
+            self.MEM()
+            self.EX()
+            self.ID()
+            self.IF_ID = self._bubble
+            n += 1
+        if not self.any_pipeline_active():
+            self.halt_pending = False
+        return n
+
+    def _run_functional(self, max_cycles, stop_pc=-1):
+        limit = -1 if max_cycles is None else max_cycles
+        memory = self.memory
+        regs = self.registers
+        cache = self.decode_cache
+        table = EXEC_TABLE
+        decode_ir = self.decode_ir
+        translator = self.translator
+        mem_size = self.mem_size
+        misses = 0
+        n = 0
+        dec = None
+        while n != limit and not self.halted:
+            pc = self.pc
+            if pc == stop_pc and n:  # marcador do fast-forward (src/simulador/sampling.py)
+                break
+            if not (0 <= pc < mem_size):
+                self.halted = True
+                break
+            dec = cache.get(pc)
+            if dec is None:
+                misses += 1
+                dec = decode_ir(memory[pc])
+                dec.pc = pc
+                cache[pc] = dec
+            n += 1
+            self.pc = pc + 1
+            fused = dec.fused
+            if (fused is not None and n != limit and stop_pc != pc + 1
+                    and cache.get(pc + 1) is fused.tail):
+                k = fused.run(self, regs, memory)
+                fused.hits += 1
+                n += k - 1
+                if k == 2:
+                    dec = fused.tail
+                continue
+            if dec.ir == HALT_INSTRUCTION:
+                self.halted = True
+                break
+            op = table[dec.opcode]
+            if op is None:  # NOP
+                continue
+
+            kind = op.kind
+            b_val = regs[dec.rb]
+            value = op.handler(self, dec, regs[dec.ra], b_val)
+            if kind == LOAD:
+                if not (0 <= value < mem_size):
+                    self.halted = True
+                    break
+                value = self._nz = memory[value] & 0xFFFFFFFF
+                dest = dec.rc
+            elif kind == STORE:
+                if not (0 <= value < mem_size):
+                    self.halted = True
+                    break
+                memory[value] = b_val & 0xFFFFFFFF
+                cache.pop(value, None)
+                if translator is not None and value in translator.covered:
+                    translator.invalidate(value)
+                continue
+            else:
+                if self.halted:  # desvio para fora da memória
+                    break
+                if value is None:
+                    continue
+                dest = dec.rc if op.dest is None else op.dest
+            dest &= 0x1F
+            if dest != 0:
+                regs[dest] = value & 0xFFFFFFFF
+
+        if dec is not None:
+            self.ir = dec.ir
+        self.decode_misses += misses
+        self.decode_hits += n - misses
+        self.instret += n
+        return n
@@ -0,0 +1,297 @@
+# src/simulador/debugger.py
+# Depurador sobre a CPU: breakpoints de PC, watchpoints de escrita em
+# registradores e de leitura/escrita na memória (endereços e faixas), todos
+# com condição opcional.
+#
+# Sem pontos de parada, Debugger.run() é o CPU.run() normal. No pipeline, a
+# execução fica no laço interno de run_until(): a instrução que entra no ID_EX
+# é comparada a um conjunto de PCs e, com watchpoints, WB/MEM instrumentados
+# por um stream.Watch (o mesmo dos eventos de CPU.stream(), instalado só
+# durante o run()) anotam os acessos e o laço para no ciclo em que algum
+# aparece. No modo functional, com um único breakpoint, o interpretador usa o
+# marcador de parada; com watchpoints, anda uma instrução por vez,
+# inspecionada antes de executar (também no translated).
+# As faixas de memória ficam em um RangeIndex: cada acesso custa uma busca
+# binária, independente do número de watchpoints.
+#
+# Onde a execução para:
+#   breakpoint em pc: functional -> antes de executar a instrução em pc;
+#                     pipeline   -> no fim do ciclo em que ela entra no ID_EX
+#                     (buscas do caminho errado são descartadas antes e não param)
+#   watchpoints:      depois da instrução (functional) ou no fim do ciclo do
+#                     WB/MEM que fez o acesso (pipeline)
+# Continuar (run() de novo) a partir de um breakpoint não para de novo no
+# mesmo ponto antes de executar algo.
+from bisect import bisect_right
+
+from src.simulador.stream import Watch
+
+ACCESS_MODES = ("r", "w", "rw")
+
+_LATCHES = ("IF_ID", "ID_EX", "EX_MEM", "MEM_WB")
+
+
+class Watchpoint:
+    """Ponto de parada.
+
+    kind "pc" (start = PC), "register" (start = índice) ou "memory" (faixa
+    [start, end) com access "r", "w" ou "rw"). condition(cpu, hit) decide se
+    a ocorrência para a execução; hits conta as paradas.
+    """
+    __slots__ = ("kind", "start", "end", "access", "condition", "hits")
+
+    def __init__(self, kind, start, end, access=None, condition=None):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.access = access
+        self.condition = condition
+        self.hits = 0
+
+    def __repr__(self):
+        if self.kind == "memory":
+            where = f"[{self.start}, {self.end}) {self.access}"
+        else:
+            where = str(self.start)
+        cond = " if ..." if self.condition is not None else ""
+        return f"Watchpoint({self.kind} {where}{cond}, hits={self.hits})"
+
+
+class Hit:
+    """Ocorrência que parou a execução.
+
+    kind: "pc", "register", "read" ou "write"; where: PC, registrador ou
+    endereço; value: valor escrito ou lido (None no breakpoint); pc: PC da
+    instrução; point: o Watchpoint.
+    """
+    __slots__ = ("kind", "where", "value", "pc", "point")
+
+    def __init__(self, kind, where, value, pc, point):
+        self.kind = kind
+        self.where = where
+        self.value = value
+        self.pc = pc
+        self.point = point
+
+    def __repr__(self):
+        value = "" if self.value is None else f", value={self.value}"
+        return f"Hit({self.kind}, where={self.where}{value}, pc={self.pc})"
+
+
+class RangeIndex:
+    """Faixas [inicio, fim) -> valores, consultadas por busca binária.
+
+    As faixas são quebradas em segmentos disjuntos na construção; find(addr)
+    retorna a tupla de valores cujas faixas contêm addr.
+    """
+
+    def __init__(self, items=()):
+        items = list(items)
+        bounds = sorted({s for s, e, _ in items} | {e for s, e, _ in items})
+        self.bounds = bounds
+        self.values = [tuple(v for s, e, v in items if s <= lo < e) for lo in bounds[:-1]]
+        self.lo = bounds[0] if bounds else 0
+        self.hi = bounds[-1] if bounds else 0
+
+    def __bool__(self):
+        return self.hi > self.lo
+
+    def __contains__(self, addr):
+        return bool(self.find(addr))
+
+    def find(self, addr):
+        if not (self.lo <= addr < self.hi):
+            return ()
+        return self.values[bisect_right(self.bounds, addr) - 1]
+
+
+class Debugger:
+    """Pontos de parada sobre uma CPU; run() executa até o próximo."""
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.points = []
+        self.hits = []        # ocorrências da última parada
+        self._index = None    # (pcs, registradores, leituras, escritas); refeito ao mudar os pontos
+
+    # Pontos de parada
+    def _add(self, point):
+        self.points.append(point)
+        self._index = None
+        return point
+
+    def break_at(self, pc, condition=None):
+        """Breakpoint no PC (condition(cpu, hit) opcional)."""
+        return self._add(Watchpoint("pc", pc, pc + 1, condition=condition))
+
+    def watch_register(self, reg, condition=None):
+        """Para quando o registrador é escrito (R0 nunca é)."""
+        if not (0 < reg < 32):
+            raise ValueError(f"Registrador inválido para watchpoint: {reg}")
+        return self._add(Watchpoint("register", reg, reg + 1, condition=condition))
+
+    def watch_memory(self, start, end=None, access="w", condition=None):
+        """Para em LW ("r"), SW ("w") ou ambos ("rw") no endereço start ou em [start, end)."""
+        if access not in ACCESS_MODES:
+            raise ValueError(f"Acesso inválido: {access!r} (use {', '.join(ACCESS_MODES)})")
+        if end is None:
+            end = start + 1
+        if end <= start:
+            raise ValueError(f"Faixa de endereços inválida: [{start}, {end})")
+        return self._add(Watchpoint("memory", start, end, access, condition))
+
+    def remove(self, point):
+        self.points.remove(point)
+        self._index = None
+
+    def clear(self):
+        self.points = []
+        self._index = None
+
+    def _build(self):
+        pcs, regs = {}, {}
+        reads, writes = [], []
+        for p in self.points:
+            if p.kind == "pc":
+                pcs.setdefault(p.start, []).append(p)
+            elif p.kind == "register":
+                regs.setdefault(p.start, []).append(p)
+            else:
+                if "r" in p.access:
+                    reads.append((p.start, p.end, p))
+                if "w" in p.access:
+                    writes.append((p.start, p.end, p))
+        self._index = (pcs, regs, RangeIndex(reads), RangeIndex(writes))
+        return self._index
+
+    def _accept(self, kind, where, value, pc, points, out):
+        cpu = self.cpu
+        for point in points:
+            hit = Hit(kind, where, value, pc, point)
+            if point.condition is None or point.condition(cpu, hit):
+                point.hits += 1
+                out.append(hit)
+
+    def _resolve(self, events, out):
+        """Transforma os acessos observados em ocorrências que passam na condição."""
+        _, regs, reads, writes = self._index
+        for kind, where, value, pc in events:
+            if kind == "register":
+                points = regs.get(where, ())
+            elif kind == "read":
+                points = reads.find(where)
+            else:
+                points = writes.find(where)
+            self._accept(kind, where, value, pc, points, out)
+
+    # Execução
+    def run(self, max_cycles=None, mode="pipeline"):
+        """Executa até um ponto de parada (com a condição satisfeita), o HALT ou
+        max_cycles. Retorna as ocorrências da parada (lista vazia se não houve)."""
+        cpu = self.cpu
+        self.hits = []
+        if not self.points:
+            cpu.run(max_cycles, mode)
+            return self.hits
+        if mode not in ("pipeline", "functional", "translated"):
+            raise ValueError(f"Modo de execucao desconhecido: {mode!r}")
+        index = self._index or self._build()
+        limit = -1 if max_cycles is None else max_cycles
+        watching = bool(index[1] or index[2] or index[3])
+        if mode == "pipeline":
+            if watching:
+                self._run_pipeline_watched(limit)
+            else:
+                self._run_pipeline(limit)
+        elif not watching and len(index[0]) == 1:
+            self._run_functional_break(limit)
+        else:
+            self._run_functional_watched(limit)
+        return self.hits
+
+    def _run_pipeline(self, limit, events=()):
+        cpu = self.cpu
+        pcs = self._index[0]
+        n = 0
+        while n != limit and (not cpu.halted or cpu.halt_pending):
+            done, reached = cpu._run_pipeline_until(pcs, limit - n if limit >= 0 else -1, events)
+            n += done
+            if events:
+                self._resolve(events, self.hits)
+                events.clear()
+            if reached:
+                pc = cpu.ID_EX.pc
+                self._accept("pc", pc, None, pc, pcs[pc], self.hits)
+            if self.hits or not done:
+                return
+
+    def _watch(self):
+        """Watch com os registradores e as faixas dos watchpoints."""
+        _, regs, reads, writes = self._index
+        return Watch(self.cpu, regs, reads or None, writes or None)
+
+    def _run_pipeline_watched(self, limit):
+        watch = self._watch()
+        watch.hook()
+        try:
+            self._run_pipeline(limit, watch.events)
+        finally:
+            watch.unhook()
+
+    def _run_functional_break(self, limit):
+        cpu = self.cpu
+        pcs = self._index[0]
+        (target,) = pcs
+        n = 0
+        while n != limit and not cpu.halted:
+            if cpu.profiler is not None:
+                done = cpu._run_functional_profiled(limit - n if limit >= 0 else -1, target)
+            else:
+                done = cpu._run_functional(limit - n if limit >= 0 else None, target)
+            n += done
+            if not done:
+                return
+            if cpu.pc == target and not cpu.halted:
+                self._accept("pc", target, None, target, pcs[target], self.hits)
+                if self.hits:
+                    return
+
+    def _run_functional_watched(self, limit):
+        cpu = self.cpu
+        pcs = self._index[0]
+        watch = self._watch()
+        events = watch.events
+        n = 0
+        while n != limit and not cpu.halted:
+            pc = cpu.pc
+            if n and pc in pcs:
+                self._accept("pc", pc, None, pc, pcs[pc], self.hits)
+                if self.hits:
+                    return
+            done = watch.step_functional(cpu._run_mode)
+            if not done:
+                return
+            n += done
+            if events:
+                self._resolve(events, self.hits)
+                events.clear()
+                if self.hits:
+                    return
+
+    # Inspeção
+    def show(self):
+        """Texto com os latches, os registradores e as flags (o que test_cpu.py imprime)."""
+        cpu = self.cpu
+        lines = [f"ciclo {cpu.cycle}  pc {cpu.pc}  instret {cpu.instret}"
+                 + ("  (parada)" if cpu.halted else "")]
+        for name in _LATCHES:
+            latch = getattr(cpu, name)
+            if latch.valid:
+                lines.append(f"{name:<7} pc={latch.pc:<6} ir={latch.ir:032b} opcode={latch.opcode}")
+            else:
+                lines.append(f"{name:<7} --- bolha ---")
+        regs = cpu.registers
+        for base in range(0, 32, 8):
+            lines.append(" ".join(f"r{i:<2}={regs[i]:<10}" for i in range(base, base + 8)).rstrip())
+        lines.append(f"N={cpu.flag_neg} Z={cpu.flag_zero} C={cpu.flag_carry} V={cpu.flag_overflow}")
+        return "\n".join(lines)
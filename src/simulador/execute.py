@@ -0,0 +1,191 @@
+# src/simulador/execute.py
+# Tabela de despacho do estágio EX: um handler por opcode.
+# A mesma tabela é usada pelo pipeline (CPU.EX) e pelos modos de execução rápidos.
+#
+# Assinatura dos handlers: handler(cpu, dec, a_val, b_val)
+#   - dec: instrução decodificada (Latch) com ir, rc, const_high, const_low, jump_addr, pc
+#   - a_val / b_val: valores lidos de ra / rb no estágio ID
+# O valor retornado depende da classe da instrução:
+#   - ALU, SHIFT, CONST: resultado a ser escrito no registrador destino
+#   - LOAD, STORE: endereço efetivo (o acesso é feito pelo estágio MEM)
+#   - CONTROL: valor de link (JAL) ou None; o desvio é feito com cpu.jump(dest)
+# Flags (src/simulador/flags.py): os handlers só registram o necessário para
+# calculá-las depois: cpu._nz = resultado (N/Z), cpu._c/cpu._v = (op, a, b).
+from src.simulador.flags import FLAG_ADD, FLAG_SUB, FLAG_SHL
+
+# Classes de instrução
+ALU = 0
+SHIFT = 1
+CONST = 2
+LOAD = 3
+STORE = 4
+CONTROL = 5
+
+NUM_OPCODES = 64  # opcode de 6 bits
+
+
+# Registradores lidos por padrão: ra e rb no estágio ID
+READS_AB = ("ra", "rb")
+
+
+class Operation:
+    """Entrada da tabela de despacho."""
+    __slots__ = ("opcode", "name", "kind", "handler", "dest", "reads")
+
+    def __init__(self, opcode, name, kind, handler, dest=None, reads=READS_AB):
+        self.opcode = opcode
+        self.name = name
+        self.kind = kind
+        self.handler = handler
+        self.dest = dest  # registrador destino fixo (ex.: R31 no JAL); None -> rc
+        # Campos de registrador usados pela instrução (unidade de hazards):
+        # "ra"/"rb" são lidos no ID; "rc" indica leitura de rc no EX (LCLH)
+        self.reads = reads
+
+    def __repr__(self):
+        return f"Operation({self.opcode}, {self.name!r})"
+
+
+# Índice = opcode; None = NOP (inclui HALT e opcodes não implementados)
+EXEC_TABLE = [None] * NUM_OPCODES
+
+# Mnemônico -> opcode (usado pelo montador, src/interpretador/assembler.py)
+OPCODES = {}
+
+
+def register_opcode(opcode, name, kind, handler, dest=None, reads=READS_AB):
+    """Registra (ou substitui) o handler de um opcode."""
+    if not (0 <= opcode < NUM_OPCODES):
+        raise ValueError(f"Opcode fora do intervalo (0..{NUM_OPCODES-1}): {opcode}")
+    op = Operation(opcode, name, kind, handler, dest, reads)
+    EXEC_TABLE[opcode] = op
+    OPCODES[name] = opcode
+    return op
+
+
+def lookup(opcode):
+    """Retorna a Operation de um opcode (ou None para NOP)."""
+    return EXEC_TABLE[opcode & 0x3F]
+
+
+# 1. ALU (ADD, SUB, ZERO, XOR, OR, AND)
+def op_add(cpu, dec, a_val, b_val):
+    cpu._c = cpu._v = (FLAG_ADD, a_val, b_val)
+    res = cpu._nz = (a_val + b_val) & 0xFFFFFFFF
+    return res
+
+def op_sub(cpu, dec, a_val, b_val):
+    cpu._c = cpu._v = (FLAG_SUB, a_val, b_val)
+    res = cpu._nz = (a_val - b_val) & 0xFFFFFFFF
+    return res
+
+def op_zero(cpu, dec, a_val, b_val):
+    cpu._nz = 0  # Z = 1, N = 0
+    return 0
+
+def op_xor(cpu, dec, a_val, b_val):
+    res = cpu._nz = (a_val ^ b_val) & 0xFFFFFFFF
+    return res
+
+def op_or(cpu, dec, a_val, b_val):
+    res = cpu._nz = (a_val | b_val) & 0xFFFFFFFF
+    return res
+
+def op_and(cpu, dec, a_val, b_val):
+    res = cpu._nz = (a_val & b_val) & 0xFFFFFFFF
+    return res
+
+
+# 2. Shifts
+def op_asl(cpu, dec, a_val, b_val):
+    shift = b_val & 31
+    cpu._c = (FLAG_SHL, a_val, shift)
+    res = cpu._nz = (a_val << shift) & 0xFFFFFFFF
+    return res
+
+def op_asr(cpu, dec, a_val, b_val):
+    shift = b_val & 31
+    if a_val & 0x80000000:
+        # Simula o comportamento de signed shift
+        signed = a_val - (1 << 32)
+        res = (signed >> shift) & 0xFFFFFFFF
+    else:
+        res = (a_val >> shift) & 0xFFFFFFFF
+    cpu._nz = res
+    return res
+
+def op_lsl(cpu, dec, a_val, b_val):
+    shift = b_val & 31
+    cpu._c = (FLAG_SHL, a_val, shift)
+    res = cpu._nz = (a_val << shift) & 0xFFFFFFFF
+    return res
+
+def op_lsr(cpu, dec, a_val, b_val):
+    shift = b_val & 31
+    res = cpu._nz = (a_val >> shift) & 0xFFFFFFFF
+    return res
+
+
+# 3. CONSTS
+def op_lclh(cpu, dec, a_val, b_val):
+    # LCLH: Carrega nos 16 bits altos e mantém os 16 bits baixos de rc
+    high = (dec.const_high & 0xFFFF) << 16
+    low = cpu.registers[dec.rc] & 0xFFFF
+    res = cpu._nz = (high | low) & 0xFFFFFFFF
+    return res
+
+def op_lcll(cpu, dec, a_val, b_val):
+    # LCLL: Carrega nos 16 bits baixos (usando high e low para formar a constante)
+    return cpu.update_flags((dec.const_high << 8) | dec.const_low)
+
+
+# 4. LOAD / STORE (endereço = ra + imm16)
+def op_mem_address(cpu, dec, a_val, b_val):
+    return a_val + (dec.const_low & 0xFFFF)
+
+
+# 5. Branches / Jumps
+def op_jal(cpu, dec, a_val, b_val):
+    cpu.jump(dec.jump_addr & 0xFFFFFF)
+    return dec.pc + 1 # Endereço de retorno (PC+1 da instrução atual)
+
+def op_jr(cpu, dec, a_val, b_val):
+    cpu.jump(a_val)
+    return None
+
+# BEQ/BNE: alvo de 16 bits (bits 15:0). O campo de 26 bits do J se sobrepõe a
+# ra/rb, o que tornava impossível comparar registradores diferentes de r0.
+def op_beq(cpu, dec, a_val, b_val):
+    if a_val == b_val:
+        cpu.jump(dec.const_low & 0xFFFF)
+    return None
+
+def op_bne(cpu, dec, a_val, b_val):
+    if a_val != b_val:
+        cpu.jump(dec.const_low & 0xFFFF)
+    return None
+
+def op_j(cpu, dec, a_val, b_val):
+    cpu.jump(dec.jump_addr)
+    return None
+
+
+register_opcode(1, "add", ALU, op_add)
+register_opcode(2, "sub", ALU, op_sub)
+register_opcode(3, "zero", ALU, op_zero, reads=())
+register_opcode(4, "xor", ALU, op_xor)
+register_opcode(5, "or", ALU, op_or)
+register_opcode(7, "and", ALU, op_and)
+register_opcode(16, "asl", SHIFT, op_asl)
+register_opcode(17, "asr", SHIFT, op_asr)
+register_opcode(18, "lsl", SHIFT, op_lsl)
+register_opcode(19, "lsr", SHIFT, op_lsr)
+register_opcode(20, "lclh", CONST, op_lclh, reads=("rc",))
+register_opcode(21, "lcll", CONST, op_lcll, reads=())
+register_opcode(22, "lw", LOAD, op_mem_address, reads=("ra",))
+register_opcode(23, "sw", STORE, op_mem_address)
+register_opcode(24, "jal", CONTROL, op_jal, dest=31, reads=())
+register_opcode(25, "jr", CONTROL, op_jr, reads=("ra",))
+register_opcode(26, "beq", CONTROL, op_beq)
+register_opcode(27, "bne", CONTROL, op_bne)
+register_opcode(28, "j", CONTROL, op_j, reads=())
@@ -0,0 +1,109 @@
+# src/simulador/flags.py
+# Flags de condição (N, Z, C, V) avaliadas sob demanda.
+#
+# Nenhuma instrução do ISA lê as flags, então o EX não as calcula: guarda só o
+# necessário para calculá-las quando forem lidas (testes, depuradores,
+# regressão ou futuras instruções condicionais).
+#   _nz: último resultado de 32 bits que define N e Z (N = bit 31, Z = valor 0)
+#   _c:  (operação, a, b) da última instrução que define C
+#   _v:  (operação, a, b) da última instrução que define V
+# flag_neg/flag_zero/flag_carry/flag_overflow são propriedades que materializam
+# os valores com as mesmas expressões de antes (resultados idênticos bit a bit);
+# atribuir a elas grava o valor explícito (FLAG_SET).
+
+from src.simulador.instruction import WORD_MASK as MASK
+
+# Operações registradas em _c/_v
+FLAG_SET = 0   # valor explícito em a
+FLAG_ADD = 1   # a + b
+FLAG_SUB = 2   # a - b
+FLAG_SHL = 3   # a << b (ASL/LSL; b já limitado a 0..31)
+
+FLAGS_CLEAR = (FLAG_SET, 0, 0)
+
+
+def carry_of(rec):
+    """Valor de C para o registro (operação, a, b)."""
+    op, a, b = rec
+    if op == FLAG_ADD:
+        return 1 if (a + b) > MASK else 0
+    if op == FLAG_SUB:
+        return 1 if a >= b else 0
+    if op == FLAG_SHL:
+        wide = (a << b) & 0xFFFFFFFFFFFFFFFF
+        return 1 if (wide >> 32) & 1 else 0
+    return a
+
+
+def overflow_of(rec):
+    """Valor de V para o registro (operação, a, b)."""
+    op, a, b = rec
+    if op == FLAG_ADD:
+        res = (a + b) & MASK
+        sa, sb, sr = (a >> 31) & 1, (b >> 31) & 1, (res >> 31) & 1
+        return 1 if (sa == sb and sa != sr) else 0
+    if op == FLAG_SUB:
+        res = (a - b) & MASK
+        sa, sb, sr = (a >> 31) & 1, (b >> 31) & 1, (res >> 31) & 1
+        return 1 if (sa != sb and sa != sr) else 0
+    return a
+
+
+class LazyFlags:
+    """Flags N/Z/C/V sob demanda (base da CPU e das visões de lane do batch)."""
+
+    # Estado inicial: todas as flags em 0 (_nz = 1 -> N = 0, Z = 0).
+    # N/Z explícitos (atribuídos separadamente) quando _nz é None
+    _nz = 1
+    _n = 0
+    _z = 0
+    _c = FLAGS_CLEAR
+    _v = FLAGS_CLEAR
+
+    def update_flags(self, value):
+        """Define N e Z a partir do valor de 32 bits (e o retorna mascarado)."""
+        val = value & MASK
+        self._nz = val
+        return val
+
+    @property
+    def flag_neg(self):
+        val = self._nz
+        if val is None:
+            return self._n
+        return 1 if ((val >> 31) & 1) else 0
+
+    @flag_neg.setter
+    def flag_neg(self, value):
+        self._z = self.flag_zero
+        self._n = value
+        self._nz = None
+
+    @property
+    def flag_zero(self):
+        val = self._nz
+        if val is None:
+            return self._z
+        return 1 if val == 0 else 0
+
+    @flag_zero.setter
+    def flag_zero(self, value):
+        self._n = self.flag_neg
+        self._z = value
+        self._nz = None
+
+    @property
+    def flag_carry(self):
+        return carry_of(self._c)
+
+    @flag_carry.setter
+    def flag_carry(self, value):
+        self._c = (FLAG_SET, value, 0)
+
+    @property
+    def flag_overflow(self):
+        return overflow_of(self._v)
+
+    @flag_overflow.setter
+    def flag_overflow(self, value):
+        self._v = (FLAG_SET, value, 0)
@@ -0,0 +1,216 @@
+# src/simulador/fusion.py
+# Superinstruções do modo funcional (CPU.enable_fusion()).
+#
+# Uma varredura sobre o código carregado reconhece pares de instruções
+# adjacentes frequentes e anexa à entrada da primeira no cache de
+# pré-decodificação (campo fused do Latch) uma função que executa as duas de
+# uma vez, sem passar de novo pelo laço do interpretador (busca, checagens de
+# PC e despacho):
+#   const32:    LCLH rc + LCLL rc (ou LCLL + LCLH) no mesmo rc -> constante de 32 bits
+#   alu_branch: ALU/shift/constante seguida de BEQ/BNE
+#   load_alu:   LW seguido de ALU/shift
+# Os resultados (registradores, flags, memória, PC) e a contagem de instruções
+# são os mesmos da execução separada. Só o modo functional usa as
+# superinstruções; o pipeline ignora o campo e o modo translated já compila
+# blocos inteiros. Um SW que altere a segunda instrução descarta a entrada dela
+# no cache; o interpretador confere a entrada antes de usar a superinstrução.
+from src.simulador import execute as ex
+from src.simulador.memory import allocated_ranges
+from src.simulador.execute import EXEC_TABLE, ALU, SHIFT, CONST
+from src.simulador.instruction import HALT_INSTRUCTION, WORD_MASK as MASK
+
+OP_LCLH = 20
+OP_LCLL = 21
+OP_LW = 22
+OP_BEQ = 26
+OP_BNE = 27
+
+PATTERNS = ("const32", "alu_branch", "load_alu")
+
+# Handlers originais: opcodes substituídos via register_opcode() não são fundidos
+_BUILTIN = {
+    1: ex.op_add, 2: ex.op_sub, 3: ex.op_zero, 4: ex.op_xor, 5: ex.op_or,
+    7: ex.op_and, 16: ex.op_asl, 17: ex.op_asr, 18: ex.op_lsl, 19: ex.op_lsr,
+    20: ex.op_lclh, 21: ex.op_lcll, 22: ex.op_mem_address,
+    26: ex.op_beq, 27: ex.op_bne,
+}
+
+
+def _builtin(opcode):
+    op = EXEC_TABLE[opcode]
+    return op is not None and _BUILTIN.get(opcode) is op.handler
+
+
+class Fused:
+    """Superinstrução: run(cpu, regs, memory) executa a partir de pc e retorna
+    quantas instruções concluiu (menos que count se a primeira parou a CPU)."""
+    __slots__ = ("name", "pc", "count", "tail", "run", "hits")
+
+    def __init__(self, name, pc, tail, run):
+        self.name = name
+        self.pc = pc
+        self.count = 2
+        self.tail = tail   # entrada da 2ª instrução no cache de pré-decodificação
+        self.run = run
+        self.hits = 0
+
+    def __repr__(self):
+        return f"Fused({self.name}, pc={self.pc}, hits={self.hits})"
+
+
+def _lcll_value(dec):
+    return ((dec.const_high << 8) | dec.const_low) & MASK
+
+
+def _const32(pc, first, second):
+    rc = first.rc
+    if first.opcode == OP_LCLH:
+        value = _lcll_value(second)  # o LCLL sobrescreve o registrador inteiro
+    else:
+        value = (((second.const_high & 0xFFFF) << 16) | (_lcll_value(first) & 0xFFFF)) & MASK
+    nxt = pc + 2
+
+    def run(cpu, regs, memory):
+        regs[rc] = cpu._nz = value
+        cpu.pc = nxt
+        return 2
+    return run
+
+
+def _alu_branch(pc, first, second):
+    h1 = EXEC_TABLE[first.opcode].handler
+    ra1, rb1, rc1 = first.ra, first.rb, first.rc & 0x1F
+    ra2, rb2 = second.ra, second.rb
+    taken_if_equal = second.opcode == OP_BEQ
+    target = second.const_low & 0xFFFF  # como em op_beq/op_bne + cpu.jump()
+    nxt = pc + 2
+
+    def run(cpu, regs, memory):
+        value = h1(cpu, first, regs[ra1], regs[rb1])
+        if rc1:
+            regs[rc1] = value & MASK
+        if (regs[ra2] == regs[rb2]) == taken_if_equal:
+            cpu.redirect = True
+            if target < cpu.mem_size:
+                cpu.pc = target
+            else:
+                cpu.pc = nxt
+                cpu.halted = True
+        else:
+            cpu.pc = nxt
+        return 2
+    return run
+
+
+def _load_alu(pc, first, second):
+    h1 = EXEC_TABLE[first.opcode].handler
+    h2 = EXEC_TABLE[second.opcode].handler
+    ra1, rb1, rc1 = first.ra, first.rb, first.rc & 0x1F
+    ra2, rb2, rc2 = second.ra, second.rb, second.rc & 0x1F
+    nxt = pc + 2
+
+    def run(cpu, regs, memory):
+        addr = h1(cpu, first, regs[ra1], regs[rb1])
+        if not (0 <= addr < cpu.mem_size):
+            cpu.halted = True
+            return 1
+        value = cpu._nz = memory[addr] & MASK
+        if rc1:
+            regs[rc1] = value
+        value = h2(cpu, second, regs[ra2], regs[rb2])
+        if rc2:
+            regs[rc2] = value & MASK
+        cpu.pc = nxt
+        return 2
+    return run
+
+
+def match(first, second):
+    """Nome do padrão formado pelas instruções decodificadas (ou None)."""
+    if first.ir == HALT_INSTRUCTION or second.ir == HALT_INSTRUCTION:
+        return None
+    op1, op2 = first.opcode, second.opcode
+    if not (_builtin(op1) and _builtin(op2)):
+        return None
+    kind1 = EXEC_TABLE[op1].kind
+    kind2 = EXEC_TABLE[op2].kind
+    if ({op1, op2} == {OP_LCLH, OP_LCLL} and first.rc == second.rc and first.rc != 0):
+        return "const32"
+    if kind1 in (ALU, SHIFT, CONST) and op2 in (OP_BEQ, OP_BNE):
+        return "alu_branch"
+    if op1 == OP_LW and kind2 in (ALU, SHIFT):
+        return "load_alu"
+    return None
+
+
+_BUILDERS = {"const32": _const32, "alu_branch": _alu_branch, "load_alu": _load_alu}
+
+
+class Fusion:
+    """Superinstruções instaladas no cache de pré-decodificação de uma CPU."""
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.sites = {}    # pc -> Fused
+
+    def _entry(self, pc):
+        cpu = self.cpu
+        dec = cpu.decode_cache.get(pc)
+        if dec is None:
+            dec = cpu.decode_ir(cpu.memory[pc])
+            dec.pc = pc
+            cpu.decode_cache[pc] = dec
+        return dec
+
+    def scan(self, start=0, end=None):
+        """Procura os padrões em [start, end) e instala as superinstruções.
+        Retorna quantas foram instaladas. Em PagedMemory só as páginas
+        alocadas são percorridas."""
+        cpu = self.cpu
+        memory = cpu.memory
+        found = 0
+        for lo, hi in allocated_ranges(memory, start, end):
+            # O par (hi - 1, hi) tem uma palavra nula ou fora de [start, end)
+            for pc in range(lo, hi - 1):
+                if memory[pc] == 0 or memory[pc + 1] == 0:
+                    continue
+                first = self._entry(pc)
+                second = self._entry(pc + 1)
+                name = match(first, second)
+                if name is None:
+                    continue
+                fused = Fused(name, pc, second, _BUILDERS[name](pc, first, second))
+                first.fused = fused
+                self.sites[pc] = fused
+                found += 1
+        return found
+
+    def clear(self):
+        """Remove as superinstruções das entradas do cache."""
+        for pc, fused in self.sites.items():
+            dec = self.cpu.decode_cache.get(pc)
+            if dec is not None and dec.fused is fused:
+                dec.fused = None
+        self.sites = {}
+
+    def stats(self):
+        """Por padrão: locais instalados e execuções (instruções economizadas no laço)."""
+        out = {name: {"sites": 0, "executed": 0} for name in PATTERNS}
+        for fused in self.sites.values():
+            out[fused.name]["sites"] += 1
+            out[fused.name]["executed"] += fused.hits
+        return out
+
+    def report(self, top=10):
+        """Relatório em texto: execuções por padrão e os locais mais usados."""
+        lines = [f"{'padrao':<11} {'locais':>7} {'execucoes':>10}"]
+        for name, st in self.stats().items():
+            lines.append(f"{name:<11} {st['sites']:>7} {st['executed']:>10}")
+        hot = sorted((f for f in self.sites.values() if f.hits),
+                     key=lambda f: (-f.hits, f.pc))[:top]
+        if hot:
+            lines.append("")
+            lines.append(f"{'PC':>6} {'padrao':<11} {'execucoes':>10}")
+            for f in hot:
+                lines.append(f"{f.pc:>6} {f.name:<11} {f.hits:>10}")
+        return "\n".join(lines)
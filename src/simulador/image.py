@@ -0,0 +1,227 @@
+# src/simulador/image.py
+# Formato binário de imagem de programa e cache de conversão texto -> binário.
+#
+# Layout (todos os campos little-endian):
+#   cabeçalho  HEADER: magic b"URIM", versão, nº de segmentos, entry point,
+#              próximo endereço livre, CRC32 do restante do arquivo, tamanho e
+#              mtime (ns) do arquivo-texto de origem (0 se não houver)
+#   segmentos  nseg x SEGMENT: (endereço inicial, nº de palavras)
+#   palavras   as palavras de todos os segmentos, em ordem, 4 bytes cada
+#
+# Cada diretiva 'address' do formato texto vira um segmento. A imagem é lida
+# com uma única leitura e cada segmento é escrito na memória com write_block.
+#
+# O cache de load_program() é opcional: só é usado com cache_dir=<diretório> ou
+# com a variável de ambiente SIMULADOR_IMAGE_CACHE apontando para um diretório.
+# Nesse caso o programa texto é convertido uma única vez e a imagem fica em
+# <cache_dir>/<nome>-<hash do caminho>.img; enquanto o tamanho e o mtime do
+# texto não mudarem, as cargas seguintes usam a imagem. Sem cache configurado
+# nada é gravado em disco.
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from src.simulador.memory import WORD_TYPECODE, WORD_BYTES, write_block
+from src.simulador.loader import LoaderError, load_binary_file
+
+IMAGE_MAGIC = b"URIM"
+IMAGE_VERSION = 1
+IMAGE_SUFFIX = ".img"
+ASM_SUFFIX = ".s"
+CACHE_ENV = "SIMULADOR_IMAGE_CACHE"
+
+HEADER = struct.Struct("<4sHHIIIQQ")
+SEGMENT = struct.Struct("<II")
+
+
+class _SegmentRecorder:
+    """
+    Falsa memória que registra os blocos escritos pelo loader de texto.
+    Blocos contíguos são unidos no mesmo segmento.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.segments = []  # lista de [inicio, array('I')]
+
+    def __len__(self):
+        return self.size
+
+    def __setitem__(self, addr, words):
+        start = addr.start
+        if self.segments:
+            last_start, last_words = self.segments[-1]
+            if last_start + len(last_words) == start:
+                last_words.extend(words)
+                return
+        self.segments.append([start, array(WORD_TYPECODE, words)])
+
+
+def text_to_segments(filepath, limit, default_start=0):
+    """
+    Lê um programa texto e retorna (segmentos, próximo endereço livre).
+    segmentos: lista de (inicio, array('I')) na ordem do arquivo.
+    """
+    recorder = _SegmentRecorder(limit)
+    next_free = load_binary_file(filepath, recorder, default_start)
+    return [tuple(s) for s in recorder.segments], next_free
+
+
+def _to_le_bytes(words):
+    if sys.byteorder == "big":
+        words = array(WORD_TYPECODE, words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def write_image(path, segments, entry=None, next_free=None, source_stat=None):
+    """
+    Grava a imagem binária em path (de forma atômica: arquivo temporário + rename).
+    - segments: lista de (inicio, palavras)
+    - entry: endereço de início (padrão: início do primeiro segmento)
+    - next_free: próximo endereço livre (padrão: fim do último segmento)
+    - source_stat: os.stat_result do texto de origem (usado pelo cache)
+    """
+    segments = [(start, array(WORD_TYPECODE, words)) for start, words in segments]
+    if entry is None:
+        entry = segments[0][0] if segments else 0
+    if next_free is None:
+        next_free = segments[-1][0] + len(segments[-1][1]) if segments else 0
+    table = b"".join(SEGMENT.pack(start, len(words)) for start, words in segments)
+    payload = table + b"".join(_to_le_bytes(words) for _, words in segments)
+    src_size = source_stat.st_size if source_stat else 0
+    src_mtime = source_stat.st_mtime_ns if source_stat else 0
+    header = HEADER.pack(IMAGE_MAGIC, IMAGE_VERSION, len(segments), entry, next_free,
+                         zlib.crc32(payload), src_size, src_mtime)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def read_image(path):
+    """
+    Lê e valida uma imagem. Retorna (info, segmentos), com info contendo
+    entry, next_free, source_size e source_mtime_ns.
+    Lança LoaderError se o arquivo estiver truncado ou corrompido.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise LoaderError(f"Imagem truncada: {path}")
+    magic, version, nseg, entry, next_free, crc, src_size, src_mtime = HEADER.unpack_from(data)
+    if magic != IMAGE_MAGIC or version != IMAGE_VERSION:
+        raise LoaderError(f"Imagem com formato desconhecido: {path}")
+    view = memoryview(data)[HEADER.size:]
+    if zlib.crc32(view) != crc:
+        raise LoaderError(f"Imagem corrompida (checksum invalido): {path}")
+    table_size = nseg * SEGMENT.size
+    offset = table_size
+    segments = []
+    for i in range(nseg):
+        start, count = SEGMENT.unpack_from(view, i * SEGMENT.size)
+        nbytes = count * WORD_BYTES
+        words = array(WORD_TYPECODE)
+        words.frombytes(view[offset:offset + nbytes])
+        if len(words) != count:
+            raise LoaderError(f"Imagem truncada: {path}")
+        if sys.byteorder == "big":
+            words.byteswap()
+        segments.append((start, words))
+        offset += nbytes
+    info = {"entry": entry, "next_free": next_free,
+            "source_size": src_size, "source_mtime_ns": src_mtime}
+    return info, segments
+
+
+def load_image(path, memory):
+    """Carrega uma imagem binária na memória. Retorna o próximo endereço livre."""
+    info, segments = read_image(path)
+    for start, words in segments:
+        try:
+            write_block(memory, start, words)
+        except IndexError as e:
+            raise LoaderError(f"Segmento da imagem fora da memoria: {e}")
+    return info["next_free"]
+
+
+def cache_path(filepath, cache_dir):
+    """
+    Caminho da imagem em cache para um programa texto. O nome leva um hash do
+    caminho absoluto para que programas homônimos em diretórios diferentes
+    não dividam a mesma entrada.
+    """
+    path = os.path.abspath(filepath)
+    tag = zlib.crc32(path.encode("utf-8", "surrogateescape"))
+    return os.path.join(cache_dir, f"{os.path.basename(path)}-{tag:08x}{IMAGE_SUFFIX}")
+
+
+def load_program(filepath, memory, default_start=0, cache_dir=None):
+    """
+    Carrega um programa (texto, imagem .img, fonte .s, '-' para stdin ou objeto arquivo) na memória.
+    Fontes .s são montados direto na memória (src/interpretador/assembler.py).
+    - cache_dir: diretório do cache de imagens (padrão: $SIMULADOR_IMAGE_CACHE;
+      sem nenhum dos dois, não há cache e nada é gravado)
+    Com cache, programas texto são convertidos uma vez e reaproveitados
+    enquanto o arquivo de origem não mudar. Se o cache não puder ser gravado
+    (diretório somente leitura, por exemplo) o programa é carregado normalmente.
+    Retorna: próximo endereço livre (como load_binary_file).
+    """
+    if not isinstance(filepath, str) or filepath == "-":
+        return load_binary_file(filepath, memory, default_start)  # stdin/pipe: sem cache
+    if filepath.endswith(IMAGE_SUFFIX):
+        return load_image(filepath, memory)
+    if filepath.endswith(ASM_SUFFIX):
+        from src.interpretador.assembler import assemble_file_into
+        return assemble_file_into(filepath, memory, default_start).next_free
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_ENV)
+    if not cache_dir or not os.path.exists(filepath):
+        return load_binary_file(filepath, memory, default_start)
+
+    stat = os.stat(filepath)
+    cached = cache_path(filepath, cache_dir)
+    if default_start == 0:
+        try:
+            info, segments = read_image(cached)
+            if info["source_size"] == stat.st_size and info["source_mtime_ns"] == stat.st_mtime_ns:
+                for start, words in segments:
+                    write_block(memory, start, words)
+                return info["next_free"]
+        except (OSError, LoaderError, IndexError):
+            pass  # sem cache, cache velho ou memória menor: reconverte do texto
+
+    segments, next_free = text_to_segments(filepath, len(memory), default_start)
+    for start, words in segments:
+        write_block(memory, start, words)
+    if default_start == 0:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            write_image(cached, segments, next_free=next_free, source_stat=stat)
+        except OSError:
+            pass
+    return next_free
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Converte programas texto para imagens binarias (.img)")
+    parser.add_argument("source", help="programa em texto ('0101...' e diretivas address)")
+    parser.add_argument("-o", "--output", help="imagem de saida (padrao: <source sem .txt>.img)")
+    parser.add_argument("--memory-words", type=int, default=None,
+                        help="tamanho da memoria alvo em palavras (padrao: MEMORY_SIZE_WORDS)")
+    args = parser.parse_args(argv)
+
+    from src.simulador.memory import MEMORY_SIZE_WORDS
+    output = args.output or os.path.splitext(args.source)[0] + IMAGE_SUFFIX
+    segments, next_free = text_to_segments(args.source, args.memory_words or MEMORY_SIZE_WORDS)
+    write_image(output, segments, next_free=next_free)
+    words = sum(len(w) for _, w in segments)
+    print(f"{output}: {len(segments)} segmento(s), {words} palavra(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,4 +30,28 @@ def get_const16_low(ir):
 # Endereço de Desvio de 26 bits (para J-Type)
 def get_jump_address(ir):
     # Bits 25:0 (26 bits)
-    return ir & 0x03FFFFFF
\ No newline at end of file
+    return ir & 0x03FFFFFF
+
+# Palavra de 32 bits e a instrução HALT (todos os bits em 1)
+WORD_MASK = 0xFFFFFFFF
+HALT_INSTRUCTION = 0xFFFFFFFF
+
+# CODIFICAÇÃO (inverso dos get_*; usada pelo montador)
+OPCODE_SHIFT = 26
+RA_SHIFT = 21
+RB_SHIFT = 16
+RC_SHIFT = 11
+REG_MASK = 0x1F
+CONST16_MASK = 0xFFFF
+JUMP_MASK = 0x03FFFFFF
+
+def encode_fields(opcode, ra=0, rb=0, rc=0, const16=0):
+    # Formato de registradores/constante: rc ocupa os bits 15:11, que também são
+    # os 5 bits altos da constante de 16 bits (os dois campos se sobrepõem)
+    return (((opcode & 0x3F) << OPCODE_SHIFT) | ((ra & REG_MASK) << RA_SHIFT)
+            | ((rb & REG_MASK) << RB_SHIFT) | ((rc & REG_MASK) << RC_SHIFT)
+            | (const16 & CONST16_MASK))
+
+def encode_jump(opcode, target):
+    # Formato de desvio (J/JAL): endereço de 26 bits nos bits 25:0
+    return ((opcode & 0x3F) << OPCODE_SHIFT) | (target & JUMP_MASK)
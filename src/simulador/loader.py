@@ -1,8 +1,13 @@
 # src/simulador/loader.py
 
+import io
 import os
+import re
+import sys
+from array import array
+from itertools import repeat
 from typing import List
-from src.simulador.memory import MEMORY_SIZE_WORDS
+from src.simulador.memory import MEMORY_SIZE_WORDS, WORD_TYPECODE, read_block, write_block
 
 
 class LoaderError(Exception):
@@ -20,11 +25,12 @@ def binstr_to_word(binstr: str) -> int:
         raise ValueError(f"Instrucao invalida: caracteres diferentes de 0/1 -> '{s}'")
     return int(s, 2)
 
-def parse_address_directive(line: str) -> int:
+def parse_address_directive(line: str, limit: int = MEMORY_SIZE_WORDS) -> int:
     """
     Recebe uma linha do tipo: 'address 0000000000010101'
     Retorna o endereco em decimal (int).
-    Valida que o endereco tem no maximo 16 bits (0..65535).
+    Valida que o endereco cabe na memoria (0..limit-1); com a memoria padrao,
+    no maximo 16 bits (0..65535).
     """
     parts = line.strip().split()
     if len(parts) != 2 or parts[0].lower() != "address":
@@ -32,56 +38,130 @@ def parse_address_directive(line: str) -> int:
     addr_bin = parts[1].strip()
     if any(c not in "01" for c in addr_bin):
         raise ValueError(f"Endereco 'address' contem caracteres invalidos: '{addr_bin}'")
-    if len(addr_bin) > 16:
-        raise ValueError(f"Endereco 'address' maior que 16 bits: {len(addr_bin)} bits")
+    max_bits = max(16, (limit - 1).bit_length())
+    if len(addr_bin) > max_bits:
+        raise ValueError(f"Endereco 'address' maior que {max_bits} bits: {len(addr_bin)} bits")
     addr = int(addr_bin, 2)
-    if not (0 <= addr < MEMORY_SIZE_WORDS):
-        raise ValueError(f"Endereco 'address' fora dos limites (0..{MEMORY_SIZE_WORDS-1}): {addr}")
+    if not (0 <= addr < limit):
+        raise ValueError(f"Endereco 'address' fora dos limites (0..{limit-1}): {addr}")
     return addr
 
-def load_binary_file(filepath: str, memory: List[int], default_start: int = 0) -> int:
-    """
-    Carrega um arquivo de instrucoes binario (texto) na memoria.
-    - filepath: caminho para o arquivo de texto
-    - memory: lista retornada por create_memory() (tamanho MEMORY_SIZE_WORDS)
-    - default_start: endereco inicial (se nao houver 'address')
-    Retorna: proximo endereco livre (int)
-    Lanca LoaderError em caso de erros irrecuperaveis.
-    """
-    if not os.path.exists(filepath):
-        raise LoaderError(f"Arquivo nao encontrado: {filepath}")
+# Leitura em blocos: cada bloco é validado e convertido de uma vez
+CHUNK_CHARS = 1 << 20
 
-    address = default_start
-    line_no = 0
+# Trecho (sem diretivas address) só com palavras de 32 bits, comentários e linhas vazias
+_FAST_BLOCK = re.compile(r"(?:[ \t]*(?:[01]{32}|#[^\n]*)?[ \t\r]*\n)*")
+_WORD_LINE = re.compile(r"^[ \t]*([01]{32})", re.M)
+_ADDRESS_LINE = re.compile(r"^[ \t]*address[^\n]*\n", re.M | re.I)
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        for raw_line in f:
-            line_no += 1
-            line = raw_line.strip()
-            if line == "" or line.startswith("#"):  # permite comentarios com #
-                continue
 
-            # Diretiva address
-            if line.lower().startswith("address"):
-                try:
-                    address = parse_address_directive(line)
-                except Exception as e:
-                    raise LoaderError(f"Erro na linha {line_no}: {e}")
-                continue
+class _TextLoader:
+    """Estado da carga: memória, endereço atual e linha do início do trecho."""
+    __slots__ = ("memory", "address", "line_no")
 
-            # Espera-se uma instrucao binaria de 32 bits
+    def __init__(self, memory, address):
+        self.memory = memory
+        self.address = address
+        self.line_no = 0  # linhas já consumidas
+
+    def feed(self, text):
+        """Processa um trecho terminado em '\\n' (diretivas address são separadas aqui)."""
+        pos = 0
+        for m in _ADDRESS_LINE.finditer(text):
+            self._words(text[pos:m.start()])
+            self.line_no += 1
             try:
-                word = binstr_to_word(line)
-            except ValueError as e:
-                raise LoaderError(f"Erro na linha {line_no}: {e}")
+                self.address = parse_address_directive(m.group(), len(self.memory))
+            except Exception as e:
+                raise LoaderError(f"Erro na linha {self.line_no}: {e}")
+            pos = m.end()
+        self._words(text[pos:])
+
+    def _words(self, text):
+        if not text:
+            return
+        if _FAST_BLOCK.fullmatch(text):
+            words = array(WORD_TYPECODE, map(int, _WORD_LINE.findall(text), repeat(2)))
+            if self.address + len(words) <= len(self.memory):
+                if words:
+                    write_block(self.memory, self.address, words)
+                    self.address += len(words)
+                self.line_no += text.count("\n")
+                return
+        # Trecho inválido: linha a linha, para apontar a linha exata do erro
+        self._slow(text)
 
-            if not (0 <= address < MEMORY_SIZE_WORDS):
-                raise LoaderError(f"Endereco {address} fora da memoria ao tentar escrever (linha {line_no})")
+    def _slow(self, text):
+        memory = self.memory
+        run_start = self.address
+        run = []
+        try:
+            for raw_line in text.split("\n")[:-1]:
+                self.line_no += 1
+                line = raw_line.strip()
+                if line == "" or line.startswith("#"):  # permite comentarios com #
+                    continue
+                try:
+                    word = binstr_to_word(line)
+                except ValueError as e:
+                    raise LoaderError(f"Erro na linha {self.line_no}: {e}")
+                if not (0 <= self.address < len(memory)):
+                    raise LoaderError(f"Endereco {self.address} fora da memoria ao tentar escrever (linha {self.line_no})")
+                run.append(word)
+                self.address += 1
+        finally:
+            # As palavras válidas anteriores ao erro ficam na memória
+            if run:
+                write_block(memory, run_start, run)
+
+
+def _open_source(source):
+    """Retorna (arquivo texto, liberar) para caminho, '-' (stdin) ou objeto arquivo.
+    liberar() fecha o arquivo aberto aqui ou desacopla o TextIOWrapper de um
+    arquivo binário do chamador (que continua aberto); None se nada a fazer."""
+    if source == "-":
+        return sys.stdin, None
+    if hasattr(source, "read"):
+        if isinstance(source, io.TextIOBase):
+            return source, None
+        wrapper = io.TextIOWrapper(source, encoding="utf-8")
+        return wrapper, wrapper.detach
+    if not os.path.exists(source):
+        raise LoaderError(f"Arquivo nao encontrado: {source}")
+    f = open(source, "r", encoding="utf-8")
+    return f, f.close
 
-            memory[address] = word
-            address += 1
 
-    return address
+def load_binary_file(filepath, memory: List[int], default_start: int = 0) -> int:
+    """
+    Carrega um arquivo de instrucoes binario (texto) na memoria.
+    - filepath: caminho para o arquivo de texto, '-' para stdin ou um objeto
+      arquivo/pipe (texto ou binario)
+    - memory: memoria retornada por create_memory() ou PagedMemory
+    - default_start: endereco inicial (se nao houver 'address')
+    Retorna: proximo endereco livre (int)
+    Lanca LoaderError em caso de erros irrecuperaveis.
+    O arquivo e lido em blocos de CHUNK_CHARS caracteres; cada bloco e validado
+    por expressao regular e escrito na memoria em bloco.
+    """
+    f, release = _open_source(filepath)
+    state = _TextLoader(memory, default_start)
+    try:
+        pending = ""
+        while True:
+            chunk = f.read(CHUNK_CHARS)
+            if not chunk:
+                break
+            chunk = pending + chunk
+            cut = chunk.rfind("\n") + 1
+            pending = chunk[cut:]
+            state.feed(chunk[:cut])
+        if pending:
+            state.feed(pending + "\n")
+    finally:
+        if release is not None:
+            release()
+    return state.address
 
 def dump_loaded_memory(memory: List[int], start: int = 0, end: int = 64):
     """
@@ -89,8 +169,9 @@ def dump_loaded_memory(memory: List[int], start: int = 0, end: int = 64):
     Para debug.
     """
     print("Dump de memoria (apenas posicoes nao-nulas no intervalo):")
-    for addr in range(start, min(end, len(memory))):
-        val = memory[addr]
+    end = min(end, len(memory))
+    block = read_block(memory, start, max(end - start, 0))
+    for addr, val in enumerate(block, start):
         if val != 0:
             binstr = format(val, '032b')
             print(f"  [{addr:5}] {binstr}  (0x{val:08X})")
@@ -0,0 +1,114 @@
+# src/simulador/loops.py
+# Detecção de laços infinitos (CPU.enable_loop_detection()).
+#
+# O run() passa a executar em fatias de `interval` ciclos/instruções; entre as
+# fatias, o estado da CPU vira uma assinatura: PC, registradores e, no
+# pipeline, o conteúdo dos latches e o estado da busca. Preditor e caches
+# ficam de fora: mudam o tempo, não os resultados. Como a execução é
+# determinística, voltar à mesma assinatura com a memória igual significa que
+# o trecho entre as duas se repete para sempre sem chegar ao HALT: a CPU para
+# com stop_reason = "loop". Isso cobre o desvio para si mesmo (J pc) e qualquer
+# laço que não altere o estado arquitetural (espera por um valor que nunca
+# muda). Laços que alteram registradores ou memória a cada volta não são
+# detectados (o orçamento de ciclos continua valendo).
+#
+# A memória só é copiada quando uma assinatura se repete: a cópia feita na
+# segunda ocorrência é comparada com a memória na terceira. Um laço que passa
+# por p estados distintos nas verificações é detectado em torno de 2p + 1
+# fatias; o desvio para si mesmo (p = 1), em 3.
+from src.simulador.memory import PagedMemory
+from src.simulador.checkpoint import _memory_bytes
+
+LOOP_CHECK_INTERVAL = 4096
+MAX_SIGNATURES = 4096  # assinaturas guardadas antes de recomeçar (programas longos)
+
+
+def _latch_signature(latch):
+    if not latch.valid:
+        return None
+    return (latch.pc, latch.ir, latch.reg_ra_val, latch.reg_rb_val, latch.exec_rc,
+            latch.exec_result, latch.address, latch.store_value)
+
+
+def memory_image(memory):
+    """Cópia comparável do conteúdo da memória."""
+    if isinstance(memory, PagedMemory):
+        return {n: page.tobytes() for n, page in memory.pages.items()}
+    return _memory_bytes(memory)
+
+
+class LoopDetector:
+    """Executa o run() da CPU em fatias e para laços que não mudam o estado."""
+
+    def __init__(self, cpu, interval=LOOP_CHECK_INTERVAL):
+        if interval <= 0:
+            raise ValueError(f"Intervalo inválido: {interval}")
+        self.cpu = cpu
+        self.interval = interval
+        self.seen = {}       # assinatura -> None (vista uma vez) ou cópia da memória
+        self.checks = 0
+        self.detected_pc = None
+        self._resume = None  # posição ao fim do último run(): detecta alterações por fora
+
+    def signature(self, mode):
+        cpu = self.cpu
+        if mode != "pipeline":
+            return (cpu.pc, tuple(cpu.registers))
+        return (cpu.pc, tuple(cpu.registers), cpu.fetch_stop, cpu.halt_pending,
+                cpu._if_wait, cpu._mem_wait, cpu.IF_ID.pc if cpu.IF_ID.valid else None,
+                _latch_signature(cpu.ID_EX), _latch_signature(cpu.EX_MEM),
+                _latch_signature(cpu.MEM_WB))
+
+    def check(self, mode):
+        """True se o estado atual repete um estado anterior com a mesma memória."""
+        self.checks += 1
+        sig = self.signature(mode)
+        seen = self.seen
+        if sig not in seen:
+            if len(seen) >= MAX_SIGNATURES:
+                seen.clear()
+            seen[sig] = None
+            return False
+        image = memory_image(self.cpu.memory)
+        if seen[sig] == image:
+            self.detected_pc = self.cpu.pc
+            return True
+        seen[sig] = image
+        return False
+
+    def reset(self):
+        """Esquece os estados vistos (depois de alterar a memória por fora do run())."""
+        self.seen = {}
+        self.detected_pc = None
+        self._resume = None
+
+    def _position(self, mode):
+        cpu = self.cpu
+        return (mode, cpu.cycle, cpu.instret, self.signature(mode))
+
+    def run(self, max_cycles, mode):
+        """run() em fatias, verificando o estado entre elas. Retorna os ciclos."""
+        cpu = self.cpu
+        limit = -1 if max_cycles is None else max_cycles
+        if self._resume != self._position(mode):
+            # Registradores, PC ou contadores mudaram desde o último run() (restore(),
+            # fast-forward, testes): os estados vistos não levam mais ao atual
+            self.seen = {}
+        n = 0
+        while n != limit and (not cpu.halted or cpu.halt_pending):
+            chunk = self.interval if limit < 0 else min(self.interval, limit - n)
+            done = cpu._run_mode(chunk, mode)
+            n += done
+            if cpu.halted:
+                if cpu.halt_pending and done:
+                    continue  # HALT buscado no modo "none": termina o esvaziamento
+                break
+            if done < chunk:
+                break
+            if self.check(mode):
+                cpu.halted = True
+                cpu.halt_pending = False
+                cpu.stop_reason = "loop"
+                break
+        self._resume = self._position(mode)
+        return n
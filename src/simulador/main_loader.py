@@ -1,19 +1,20 @@
 # src/simulador/main_loader.py
 
 from src.simulador.memory import create_memory
-from src.simulador.loader import load_binary_file, dump_loaded_memory
+from src.simulador.loader import dump_loaded_memory
+from src.simulador.image import load_program
 import sys
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Uso: python main_loader.py binarios/exemplo_programa.txt")
+        print("Uso: python main_loader.py binarios/exemplo_programa.txt (ou imagem .img, ou - para stdin)")
         return
 
     path = sys.argv[1]
     mem = create_memory()
     try:
-        next_addr = load_binary_file(path, mem, default_start=0)
+        next_addr = load_program(path, mem, default_start=0)
     except Exception as e:
         print("Erro ao carregar arquivo:", e)
         return
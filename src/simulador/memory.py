@@ -1,11 +1,161 @@
-
+import mmap
+import os
+from array import array
 
 MEMORY_SIZE_WORDS = 65536  # 2^16 posições (memória endereçada por palavra)
 
-def create_memory():
+# Código de tipo do array com itens de 32 bits sem sinal
+WORD_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+WORD_BYTES = 4
+
+def create_memory(size=MEMORY_SIZE_WORDS):
     """
-    Cria a memória do processador como uma lista de inteiros (palavras de 32 bits).
+    Cria a memória do processador como um array compacto de palavras de 32 bits
+    (array('I'), 4 bytes por posição). Indexação igual à de uma lista.
     Inicialmente todas as posições valem 0.
-    Retorna: lista com MEMORY_SIZE_WORDS elementos.
+    Retorna: array com size elementos.
+    """
+    return array(WORD_TYPECODE, bytes(size * WORD_BYTES))
+
+def map_memory_image(path, size=MEMORY_SIZE_WORDS, writable=False):
+    """
+    Cria a memória a partir de uma imagem crua (palavras de 32 bits na ordem de
+    bytes da máquina, little-endian em x86/ARM).
+    - Se o arquivo cobre as size palavras, a memória é um memoryview sobre um
+      mmap do arquivo (sem cópia). writable=True grava as escritas da CPU no
+      arquivo; caso contrário o mapeamento é copy-on-write (o arquivo não muda).
+    - Se o arquivo for menor, é lido de uma vez para um array de size palavras.
+    """
+    file_size = os.path.getsize(path)
+    if file_size % WORD_BYTES:
+        raise ValueError(f"Imagem de memoria com tamanho invalido (nao multiplo de 4): {file_size} bytes")
+    nbytes = size * WORD_BYTES
+    if file_size >= nbytes:
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY
+        with open(path, "r+b" if writable else "rb") as f:
+            mapped = mmap.mmap(f.fileno(), nbytes, access=access)
+        return memoryview(mapped).cast(WORD_TYPECODE)
+    memory = create_memory(size)
+    with open(path, "rb") as f:
+        f.readinto(memoryview(memory).cast("B"))
+    return memory
+
+def save_memory_image(memory, path, start=0, count=None):
+    """Grava palavras da memória em uma imagem crua (formato de map_memory_image)."""
+    if count is None:
+        count = len(memory) - start
+    with open(path, "wb") as f:
+        f.write(read_block(memory, start, count).tobytes())
+
+def _check_block(memory, start, count):
+    if start < 0 or count < 0 or start + count > len(memory):
+        raise IndexError(f"Bloco fora da memoria: [{start}, {start + count}) de {len(memory)} palavras")
+
+def read_block(memory, start, count):
+    """Lê count palavras a partir de start. Retorna uma cópia em array('I')."""
+    _check_block(memory, start, count)
+    block = memory[start:start + count]
+    if isinstance(block, array) and block.typecode == WORD_TYPECODE:
+        return block
+    if isinstance(block, memoryview):
+        return array(WORD_TYPECODE, block.tobytes())
+    return array(WORD_TYPECODE, block)
+
+def write_block(memory, start, words):
+    """Escreve a sequência words (inteiros de 32 bits) a partir de start."""
+    count = len(words)
+    _check_block(memory, start, count)
+    if isinstance(memory, (array, memoryview)):
+        if not (isinstance(words, array) and words.typecode == WORD_TYPECODE):
+            words = array(WORD_TYPECODE, words)
+        memory[start:start + count] = words
+    else:
+        memory[start:start + count] = list(words)
+
+
+PAGE_BITS = 12  # 4096 palavras por página
+
+class PagedMemory:
+    """
+    Espaço de endereçamento esparso (pode ir além de MEMORY_SIZE_WORDS).
+    As páginas são alocadas na primeira escrita; leituras de páginas nunca
+    escritas retornam 0 sem alocar. Cada escrita marca a página como suja.
+    Mesmo contrato de indexação de create_memory(): mem[addr], mem[a:b], len(mem).
+    """
+
+    def __init__(self, size=1 << 26, page_bits=PAGE_BITS):
+        self.size = size
+        self.page_bits = page_bits
+        self.page_words = 1 << page_bits
+        self.page_mask = self.page_words - 1
+        self.pages = {}      # número da página -> array('I')
+        self.dirty = set()   # páginas escritas desde o último clear_dirty()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, addr):
+        if isinstance(addr, slice):
+            start, stop, step = addr.indices(self.size)
+            return array(WORD_TYPECODE, [self[a] for a in range(start, stop, step)])
+        if not (0 <= addr < self.size):
+            raise IndexError(f"Endereco fora da memoria: {addr}")
+        page = self.pages.get(addr >> self.page_bits)
+        if page is None:
+            return 0
+        return page[addr & self.page_mask]
+
+    def __setitem__(self, addr, value):
+        if isinstance(addr, slice):
+            start, stop, step = addr.indices(self.size)
+            targets = range(start, stop, step)
+            if len(targets) != len(value):
+                raise ValueError("Atribuicao em fatia com tamanho diferente")
+            for a, v in zip(targets, value):
+                self[a] = v
+            return
+        if not (0 <= addr < self.size):
+            raise IndexError(f"Endereco fora da memoria: {addr}")
+        number = addr >> self.page_bits
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = create_memory(self.page_words)
+        page[addr & self.page_mask] = value
+        self.dirty.add(number)
+
+    def allocated_pages(self):
+        """Números das páginas alocadas, em ordem."""
+        return sorted(self.pages)
+
+    def clear_dirty(self):
+        """Limpa os bits de sujeira e retorna as páginas que estavam sujas."""
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+
+def allocated_ranges(memory, start=0, end=None):
+    """
+    Faixas [inicio, fim) de [start, end) que podem conter palavras não nulas.
+    Em PagedMemory são só as páginas alocadas (páginas vizinhas formam uma
+    faixa); nas demais memórias é a faixa inteira. Usado por quem varre a
+    memória (pré-decodificação, fusão) para não percorrer 2^26 endereços.
     """
-    return [0] * MEMORY_SIZE_WORDS
+    size = len(memory)
+    if end is None or end > size:
+        end = size
+    start = max(start, 0)
+    if not isinstance(memory, PagedMemory):
+        return [(start, end)] if start < end else []
+    ranges = []
+    words = memory.page_words
+    for number in memory.allocated_pages():
+        lo = max(number * words, start)
+        hi = min((number + 1) * words, end)
+        if lo >= hi:
+            continue
+        if ranges and ranges[-1][1] == lo:
+            ranges[-1] = (ranges[-1][0], hi)
+        else:
+            ranges.append((lo, hi))
+    return ranges
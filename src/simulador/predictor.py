@@ -0,0 +1,204 @@
+# src/simulador/predictor.py
+# Preditores de desvio consultados no IF (modos da unidade de hazards).
+#
+# O IF pergunta ao preditor qual é o próximo PC; o EX resolve o desvio e, se a
+# previsão estiver errada, a instrução buscada no caminho errado é descartada.
+# Direção:
+#   "not_taken": estático, sempre PC+1 (comportamento original)
+#   "btfnt":     estático, desvio condicional para trás é tomado, para frente não
+#   "1bit":      1 bit por entrada (última direção)
+#   "2bit":      contador saturante de 2 bits por entrada
+# Alvo: sem BTB, vem dos campos da instrução (pré-decodificada); o JR, cujo alvo
+# está em registrador, é sempre previsto como não tomado. Com BTB, só há previsão
+# de desvio para PCs presentes no buffer (inclusive JR).
+from src.simulador.execute import OPCODES
+
+OP_JAL = OPCODES["jal"]
+OP_JR = OPCODES["jr"]
+OP_BEQ = OPCODES["beq"]
+OP_BNE = OPCODES["bne"]
+OP_J = OPCODES["j"]
+
+BRANCH_OPCODES = frozenset((OP_JAL, OP_JR, OP_BEQ, OP_BNE, OP_J))
+CONDITIONAL_OPCODES = frozenset((OP_BEQ, OP_BNE))
+
+
+class BTB:
+    """Branch target buffer com mapeamento direto: índice = pc % entries."""
+    __slots__ = ("entries", "tags", "targets", "hits", "misses")
+
+    def __init__(self, entries=64):
+        if entries <= 0:
+            raise ValueError(f"BTB precisa de pelo menos uma entrada: {entries}")
+        self.entries = entries
+        self.tags = [-1] * entries
+        self.targets = [0] * entries
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, pc):
+        """Alvo guardado para pc (ou None)."""
+        i = pc % self.entries
+        if self.tags[i] == pc:
+            self.hits += 1
+            return self.targets[i]
+        self.misses += 1
+        return None
+
+    def insert(self, pc, target):
+        i = pc % self.entries
+        self.tags[i] = pc
+        self.targets[i] = target
+
+
+class Predictor:
+    """Base dos preditores: alvo (campos ou BTB) e estatísticas por PC de desvio.
+
+    Subclasses implementam taken(pc, dec) para desvios condicionais e, se tiverem
+    estado, train(pc, taken).
+    """
+    name = "base"
+
+    def __init__(self, btb=None):
+        self.btb = btb
+        self.branches = {}  # pc -> [executados, tomados, erros, ciclos perdidos]
+
+    def target(self, pc, dec):
+        """Alvo previsto para o desvio em pc (None se desconhecido)."""
+        if self.btb is not None:
+            return self.btb.lookup(pc)
+        op = dec.opcode
+        if op == OP_BEQ or op == OP_BNE:
+            return dec.const_low & 0xFFFF
+        if op == OP_J:
+            return dec.jump_addr
+        if op == OP_JAL:
+            return dec.jump_addr & 0xFFFFFF
+        return None
+
+    def predict(self, pc, dec):
+        """Próximo PC previsto para a instrução buscada em pc."""
+        if dec.opcode not in BRANCH_OPCODES:
+            return pc + 1
+        dest = self.target(pc, dec)
+        if dest is None:
+            return pc + 1
+        if dec.opcode in CONDITIONAL_OPCODES and not self.taken(pc, dec, dest):
+            return pc + 1
+        return dest
+
+    def taken(self, pc, dec, dest):
+        return False
+
+    def train(self, pc, taken):
+        pass
+
+    def update(self, pc, dec, taken, dest, mispredicted, penalty):
+        """Chamado pelo EX ao resolver o desvio em pc (dest: alvo, se tomado)."""
+        if dec.opcode in CONDITIONAL_OPCODES:
+            self.train(pc, taken)
+        if taken and dest is not None and self.btb is not None:
+            self.btb.insert(pc, dest)
+        st = self.branches.get(pc)
+        if st is None:
+            st = self.branches[pc] = [0, 0, 0, 0]
+        st[0] += 1
+        if taken:
+            st[1] += 1
+        if mispredicted:
+            st[2] += 1
+            st[3] += penalty
+
+    def stats(self):
+        """Totais e contadores por PC de desvio (acurácia e ciclos perdidos)."""
+        total = sum(st[0] for st in self.branches.values())
+        wrong = sum(st[2] for st in self.branches.values())
+        per_pc = {
+            pc: {"executed": st[0], "taken": st[1], "mispredicts": st[2],
+                 "penalty": st[3], "accuracy": 1.0 - st[2] / st[0]}
+            for pc, st in sorted(self.branches.items())
+        }
+        out = {
+            "predictor": self.name,
+            "branches": total,
+            "mispredicts": wrong,
+            "penalty": sum(st[3] for st in self.branches.values()),
+            "accuracy": 1.0 - wrong / total if total else 1.0,
+            "per_pc": per_pc,
+        }
+        if self.btb is not None:
+            out["btb_hits"] = self.btb.hits
+            out["btb_misses"] = self.btb.misses
+        return out
+
+
+class NotTakenPredictor(Predictor):
+    """Estático: desvios condicionais nunca são tomados."""
+    name = "not_taken"
+
+    def predict(self, pc, dec):
+        # Nem J/JAL são previstos: o IF sempre busca PC+1
+        return pc + 1
+
+
+class BTFNTPredictor(Predictor):
+    """Estático: tomado se o alvo estiver antes do desvio (laços)."""
+    name = "btfnt"
+
+    def taken(self, pc, dec, dest):
+        return dest <= pc
+
+
+class OneBitPredictor(Predictor):
+    """Um bit por entrada: repete a última direção do desvio."""
+    name = "1bit"
+
+    def __init__(self, entries=1024, btb=None):
+        super().__init__(btb)
+        self.entries = entries
+        self.table = bytearray(entries)
+
+    def taken(self, pc, dec, dest):
+        return self.table[pc % self.entries] != 0
+
+    def train(self, pc, taken):
+        self.table[pc % self.entries] = 1 if taken else 0
+
+
+class TwoBitPredictor(OneBitPredictor):
+    """Contador saturante de 2 bits (0-1: não tomado, 2-3: tomado)."""
+    name = "2bit"
+
+    def __init__(self, entries=1024, btb=None, initial=1):
+        super().__init__(entries, btb)
+        for i in range(entries):
+            self.table[i] = initial
+
+    def taken(self, pc, dec, dest):
+        return self.table[pc % self.entries] >= 2
+
+    def train(self, pc, taken):
+        i = pc % self.entries
+        c = self.table[i]
+        if taken:
+            if c < 3:
+                self.table[i] = c + 1
+        elif c > 0:
+            self.table[i] = c - 1
+
+
+PREDICTORS = {
+    "not_taken": NotTakenPredictor,
+    "btfnt": BTFNTPredictor,
+    "1bit": OneBitPredictor,
+    "2bit": TwoBitPredictor,
+}
+
+
+def make_predictor(name, btb_entries=None, **kwargs):
+    """Cria um preditor pelo nome; btb_entries > 0 adiciona um BTB."""
+    cls = PREDICTORS.get(name)
+    if cls is None:
+        raise ValueError(f"Preditor desconhecido: {name!r} (use {', '.join(PREDICTORS)})")
+    btb = BTB(btb_entries) if btb_entries else None
+    return cls(btb=btb, **kwargs)
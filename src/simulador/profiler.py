@@ -0,0 +1,154 @@
+# src/simulador/profiler.py
+# Contadores por PC e por opcode (CPU.enable_profiling()).
+#
+# Cada contador por PC fica em páginas de PAGE_SIZE posições (array('Q'),
+# chave pc >> PAGE_BITS) criadas na primeira instrução da página, de modo que o
+# custo acompanha o código executado e não o maior PC (com PagedMemory o
+# código pode estar em qualquer lugar de 2^26 palavras). Por opcode, cada
+# contador é um array de NUM_OPCODES posições. Contadores:
+#   executed:       instruções concluídas (WB no pipeline, execução no funcional)
+#   stalls:         ciclos com a instrução travada no ID (hazard de dados)
+#   branch_penalty: ciclos perdidos por previsão errada do desvio
+#   icache_misses / dcache_misses: faltas nas caches
+#   cache_stalls:   ciclos de travamento por faltas nas caches
+# Os ciclos atribuídos a um PC são executed + stalls + branch_penalty + cache_stalls.
+from array import array
+from src.simulador.execute import NUM_OPCODES, OPCODES
+
+COUNTERS = ("executed", "stalls", "branch_penalty",
+            "icache_misses", "dcache_misses", "cache_stalls")
+CYCLE_COUNTERS = ("executed", "stalls", "branch_penalty", "cache_stalls")
+
+PAGE_BITS = 10  # 1024 PCs por página
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+HALT_OPCODE = 0x3F
+OPCODE_NAMES = {0: "nop", HALT_OPCODE: "halt"}
+OPCODE_NAMES.update({op: name for name, op in OPCODES.items()})
+
+
+def opcode_name(opcode):
+    return OPCODE_NAMES.get(opcode, f"op{opcode}")
+
+
+class PagedCounts:
+    """Contadores indexados pelo PC, em páginas alocadas no primeiro uso.
+
+    counts[pc] lê (0 fora das páginas alocadas); iterar percorre os valores
+    das páginas alocadas, em ordem de PC.
+    """
+    __slots__ = ("typecode", "pages")
+
+    def __init__(self, typecode="Q"):
+        self.typecode = typecode
+        self.pages = {}
+
+    def page(self, index):
+        page = self.pages.get(index)
+        if page is None:
+            page = self.pages[index] = array(self.typecode, [0]) * PAGE_SIZE
+        return page
+
+    def __getitem__(self, pc):
+        page = self.pages.get(pc >> PAGE_BITS)
+        return 0 if page is None else page[pc & PAGE_MASK]
+
+    def __iter__(self):
+        for index in sorted(self.pages):
+            yield from self.pages[index]
+
+    def clear(self):
+        self.pages.clear()
+
+
+class Profiler:
+    """Contadores por PC (em páginas) e por opcode em arrays compactos."""
+
+    def __init__(self):
+        self.pc = {name: PagedCounts() for name in COUNTERS}
+        self.opcode_at = PagedCounts("B")   # último opcode visto em cada PC
+        self.opcode = {name: array("Q", bytes(8 * NUM_OPCODES)) for name in COUNTERS}
+
+    def add(self, name, pc, opcode, n=1):
+        index = pc >> PAGE_BITS
+        offset = pc & PAGE_MASK
+        self.pc[name].page(index)[offset] += n
+        self.opcode[name][opcode] += n
+        self.opcode_at.page(index)[offset] = opcode
+
+    def clear(self):
+        for counters in self.pc.values():
+            counters.clear()
+        self.opcode_at.clear()
+        for counters in self.opcode.values():
+            counters[:] = array("Q", bytes(8 * len(counters)))
+
+    def cycles(self, pc):
+        return sum(self.pc[name][pc] for name in CYCLE_COUNTERS)
+
+    def hotspots(self, top=None):
+        """PCs ordenados pelos ciclos atribuídos (maior primeiro)."""
+        rows = []
+        pcs = self.pc
+        opcode_at = self.opcode_at.pages
+        for index in sorted(opcode_at):
+            pages = [(name, pcs[name].pages.get(index)) for name in COUNTERS]
+            base = index << PAGE_BITS
+            for offset in range(PAGE_SIZE):
+                counts = {name: page[offset] if page is not None else 0 for name, page in pages}
+                if not any(counts.values()):
+                    continue
+                counts["pc"] = base + offset
+                counts["opcode"] = opcode_name(opcode_at[index][offset])
+                counts["cycles"] = sum(counts[name] for name in CYCLE_COUNTERS)
+                rows.append(counts)
+        rows.sort(key=lambda r: (-r["cycles"], r["pc"]))
+        return rows if top is None else rows[:top]
+
+    def by_opcode(self):
+        """Contadores agregados por opcode, ordenados pelos ciclos."""
+        rows = []
+        for op in range(NUM_OPCODES):
+            counts = {name: self.opcode[name][op] for name in COUNTERS}
+            if not any(counts.values()):
+                continue
+            counts["opcode"] = opcode_name(op)
+            counts["cycles"] = sum(counts[name] for name in CYCLE_COUNTERS)
+            rows.append(counts)
+        rows.sort(key=lambda r: (-r["cycles"], r["opcode"]))
+        return rows
+
+    def report(self, top=20):
+        """Relatório de hotspots em texto (por PC e por opcode)."""
+        rows = self.hotspots()
+        total = sum(r["cycles"] for r in rows) or 1
+        lines = [f"{'PC':>6} {'opcode':<6} {'ciclos':>10} {'%':>6} {'exec':>10} "
+                 f"{'trav':>8} {'desvio':>8} {'cache':>8} {'I$miss':>7} {'D$miss':>7}"]
+        for r in rows[:top]:
+            lines.append(
+                f"{r['pc']:>6} {r['opcode']:<6} {r['cycles']:>10} {100 * r['cycles'] / total:>5.1f}% "
+                f"{r['executed']:>10} {r['stalls']:>8} {r['branch_penalty']:>8} "
+                f"{r['cache_stalls']:>8} {r['icache_misses']:>7} {r['dcache_misses']:>7}")
+        lines.append("")
+        lines.append(f"{'opcode':<6} {'ciclos':>10} {'%':>6} {'exec':>10}")
+        for r in self.by_opcode():
+            lines.append(f"{r['opcode']:<6} {r['cycles']:>10} {100 * r['cycles'] / total:>5.1f}% "
+                         f"{r['executed']:>10}")
+        return "\n".join(lines)
+
+    def folded(self):
+        """Linhas "opcode;pc_XXXX;causa ciclos" no formato de pilhas colapsadas
+        (flamegraph.pl, speedscope, inferno)."""
+        lines = []
+        for r in self.hotspots():
+            frame = f"{r['opcode']};pc_{r['pc']:04x}"
+            for name in CYCLE_COUNTERS:
+                if r[name]:
+                    lines.append(f"{frame};{name} {r[name]}")
+        return lines
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            for line in self.folded():
+                f.write(line + "\n")
@@ -0,0 +1,292 @@
+# src/simulador/regression.py
+# Executor de regressão paralelo: distribui programas entre processos, aplica
+# orçamento de ciclos e tempo limite por programa, coleta o estado final
+# (registradores, flags, digest da memória) e compara com resultados "golden".
+# Cada programa roda em um processo próprio. O worker confere o tempo limite
+# entre fatias de CHUNK_CYCLES ciclos e devolve o estado parcial; se mesmo
+# assim passar do prazo (uma fatia lenta, carga travada), o processo principal
+# mata o worker após KILL_GRACE segundos e registra o status "timeout".
+# Programas presos em laços que não mudam o estado terminam cedo com o status
+# "loop" (src/simulador/loops.py), sem gastar o orçamento inteiro.
+#
+# Uso:
+#   python -m src.simulador.regression binarios/                # todos os .txt
+#   python -m src.simulador.regression --manifest testes.json -j 32 -o resumo.json
+#   python -m src.simulador.regression binarios/ --golden golden.json --update-golden
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+
+from src.simulador.cpu import CPU
+from src.simulador.memory import create_memory, read_block
+from src.simulador.image import load_program
+
+DEFAULT_MAX_CYCLES = 1_000_000
+DEFAULT_TIMEOUT = 10.0   # segundos de relógio por programa
+CHUNK_CYCLES = 10_000    # ciclos entre verificações do tempo limite no worker
+KILL_GRACE = 1.0         # segundos além do tempo limite antes de matar o worker
+
+# Campos de resultado comparados com o golden (quando presentes na expectativa)
+COMPARED_FIELDS = ("status", "halted", "registers", "flags", "memory_digest")
+
+
+def make_job(program, registers=None, max_cycles=DEFAULT_MAX_CYCLES,
+             timeout=DEFAULT_TIMEOUT, mode="functional", expect=None, detect_loops=True):
+    """Descrição serializável de um programa a executar."""
+    return {
+        "program": program,
+        "registers": dict(registers or {}),
+        "max_cycles": max_cycles,
+        "timeout": timeout,
+        "mode": mode,
+        "expect": expect,
+        "detect_loops": detect_loops,
+    }
+
+
+def memory_digest(memory):
+    """SHA-256 do conteúdo da memória (palavras de 32 bits)."""
+    return hashlib.sha256(read_block(memory, 0, len(memory)).tobytes()).hexdigest()
+
+
+def run_job(job):
+    """Executa um programa (no processo do worker) e retorna o resultado estruturado."""
+    start = time.monotonic()
+    result = {"id": job.get("id"), "program": job["program"], "mode": job["mode"]}
+    try:
+        memory = create_memory()
+        load_program(job["program"], memory)
+        cpu = CPU(memory)
+        for idx, value in job["registers"].items():
+            cpu.registers[int(idx)] = value & 0xFFFFFFFF
+        if job.get("detect_loops", True):
+            cpu.enable_loop_detection()
+
+        # Executa em fatias para parar sozinho no tempo limite (com estado parcial);
+        # o processo principal só mata o worker se ele não voltar a tempo
+        budget = job["max_cycles"]
+        deadline = start + job["timeout"]
+        cycles = 0
+        status = "ok"
+        while not cpu.halted or cpu.halt_pending:
+            if cycles >= budget:
+                status = "budget"
+                break
+            if time.monotonic() > deadline:
+                status = "timeout"
+                break
+            cycles += cpu.run(max_cycles=min(CHUNK_CYCLES, budget - cycles), mode=job["mode"])
+        if cpu.stop_reason == "loop":
+            status = "loop"
+
+        result.update({
+            "status": status,
+            "cycles": cycles,
+            "instret": cpu.instret,
+            "halted": cpu.halted,
+            "pc": cpu.pc,
+            "registers": list(cpu.registers),
+            "flags": {"N": cpu.flag_neg, "Z": cpu.flag_zero,
+                      "C": cpu.flag_carry, "V": cpu.flag_overflow},
+            "memory_digest": memory_digest(memory),
+        })
+    except Exception as e:
+        result.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    result["elapsed"] = time.monotonic() - start
+    return result
+
+
+def _worker(job, conn):
+    conn.send(run_job(job))
+    conn.close()
+
+
+def _run_workers(jobs, processes):
+    """
+    Executa cada job em um processo, no máximo 'processes' ao mesmo tempo.
+    O prazo de cada worker (timeout + KILL_GRACE) é imposto aqui: ao vencer,
+    o processo é terminado e o job recebe status "timeout" sem estado final.
+    """
+    pending = list(reversed(jobs))
+    running = {}  # conexão -> (processo, job, início, prazo)
+    results = []
+    while pending or running:
+        while pending and len(running) < processes:
+            job = pending.pop()
+            recv_end, send_end = Pipe(duplex=False)
+            proc = Process(target=_worker, args=(job, send_end), daemon=True)
+            proc.start()
+            send_end.close()
+            started = time.monotonic()
+            running[recv_end] = (proc, job, started, started + job["timeout"] + KILL_GRACE)
+
+        remaining = min(deadline for _, _, _, deadline in running.values()) - time.monotonic()
+        for conn in wait(list(running), max(remaining, 0)):
+            proc, job, started, _ = running.pop(conn)
+            try:
+                results.append(conn.recv())
+            except EOFError:
+                results.append({"id": job["id"], "program": job["program"], "mode": job["mode"],
+                                "status": "error", "elapsed": time.monotonic() - started,
+                                "error": f"worker terminou sem resultado (codigo {proc.exitcode})"})
+            conn.close()
+            proc.join()
+
+        now = time.monotonic()
+        for conn, (proc, job, started, deadline) in list(running.items()):
+            if now >= deadline:
+                proc.terminate()
+                proc.join()
+                conn.close()
+                del running[conn]
+                results.append({"id": job["id"], "program": job["program"], "mode": job["mode"],
+                                "status": "timeout", "killed": True, "elapsed": now - started})
+    return results
+
+
+def compare(result, expect):
+    """Lista das diferenças entre o resultado e a expectativa (vazia = passou)."""
+    mismatches = []
+    for field in COMPARED_FIELDS:
+        if field not in expect:
+            continue
+        want, got = expect[field], result.get(field)
+        if field == "registers" and isinstance(want, dict):
+            # Expectativa parcial: {"3": 30, ...}
+            for idx, value in want.items():
+                if got is None or got[int(idx)] != value:
+                    mismatches.append(f"r{idx}: esperado {value}, obtido {None if got is None else got[int(idx)]}")
+        elif got != want:
+            mismatches.append(f"{field}: esperado {want!r}, obtido {got!r}")
+    return mismatches
+
+
+def run_regression(jobs, processes=None, golden=None):
+    """
+    Executa os jobs em um pool de processos e retorna o resumo.
+    - processes: nº de processos (padrão: os.cpu_count())
+    - golden: dict programa -> expectativa (usado quando o job não traz 'expect')
+    Jobs que estouram o tempo limite têm o worker terminado (resultado com
+    "killed": True) e não atrasam os demais.
+    """
+    golden = golden or {}
+    jobs = [dict(job, id=i) for i, job in enumerate(jobs)]
+    start = time.monotonic()
+    results = _run_workers(jobs, max(1, processes or os.cpu_count()))
+
+    counts = {"passed": 0, "failed": 0, "unchecked": 0, "errors": 0}
+    for result in results:
+        job = jobs[result["id"]]
+        expect = job.get("expect") or golden.get(result["program"])
+        if result["status"] == "error":
+            result["verdict"] = "error"
+            counts["errors"] += 1
+        elif expect is None:
+            result["verdict"] = "unchecked"
+            counts["unchecked"] += 1
+        else:
+            result["mismatches"] = compare(result, expect)
+            result["verdict"] = "fail" if result["mismatches"] else "pass"
+            counts["failed" if result["mismatches"] else "passed"] += 1
+
+    results.sort(key=lambda r: r["id"])
+    return {
+        "total": len(results),
+        **counts,
+        "elapsed": time.monotonic() - start,
+        "processes": processes or os.cpu_count(),
+        "results": results,
+    }
+
+
+def golden_from_summary(summary):
+    """Gera o arquivo golden (programa -> expectativa) a partir de um resumo."""
+    return {
+        r["program"]: {field: r[field] for field in COMPARED_FIELDS if field in r}
+        for r in summary["results"] if r["status"] != "error"
+    }
+
+
+def jobs_from_paths(paths, **defaults):
+    """Um job por arquivo .txt (diretórios são percorridos em ordem alfabética)."""
+    jobs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".txt"):
+                    jobs.append(make_job(os.path.join(path, name), **defaults))
+        else:
+            jobs.append(make_job(path, **defaults))
+    return jobs
+
+
+def jobs_from_manifest(path, **defaults):
+    """
+    Manifesto JSON: lista de objetos {"program": ..., "registers": {...},
+    "max_cycles": ..., "timeout": ..., "mode": ..., "detect_loops": ...,
+    "expect": {...}}.
+    Caminhos relativos são resolvidos a partir do diretório do manifesto.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for entry in entries:
+        options = dict(defaults)
+        options.update({k: v for k, v in entry.items() if k != "program"})
+        program = entry["program"]
+        if not os.path.isabs(program):
+            program = os.path.join(base, program)
+        jobs.append(make_job(program, **options))
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executor de regressao paralelo do simulador UFLA-RISC")
+    parser.add_argument("paths", nargs="*", help="arquivos .txt ou diretorios (ex.: binarios/)")
+    parser.add_argument("--manifest", help="manifesto JSON com os programas e expectativas")
+    parser.add_argument("--golden", help="arquivo JSON com os resultados esperados por programa")
+    parser.add_argument("--update-golden", action="store_true", help="regrava o golden com os resultados obtidos")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="processos (padrao: nº de CPUs)")
+    parser.add_argument("--mode", default="functional", choices=("functional", "translated", "pipeline"))
+    parser.add_argument("--max-cycles", type=int, default=DEFAULT_MAX_CYCLES)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--no-loop-detection", action="store_true",
+                        help="nao encerra lacos sem mudanca de estado (status 'loop')")
+    parser.add_argument("-o", "--output", help="grava o resumo JSON neste arquivo (padrao: stdout)")
+    args = parser.parse_args(argv)
+
+    defaults = {"max_cycles": args.max_cycles, "timeout": args.timeout, "mode": args.mode,
+                "detect_loops": not args.no_loop_detection}
+    jobs = jobs_from_manifest(args.manifest, **defaults) if args.manifest else []
+    jobs += jobs_from_paths(args.paths, **defaults)
+    if not jobs:
+        parser.error("nenhum programa informado")
+
+    golden = None
+    if args.golden and os.path.exists(args.golden) and not args.update_golden:
+        with open(args.golden, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+
+    summary = run_regression(jobs, processes=args.processes, golden=golden)
+
+    if args.update_golden and args.golden:
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(golden_from_summary(summary), f, indent=2, sort_keys=True)
+
+    text = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if summary["failed"] or summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
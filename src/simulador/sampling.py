@@ -0,0 +1,121 @@
+# src/simulador/sampling.py
+# Simulação por amostragem: avança no modo rápido (functional/translated) e
+# simula em detalhe, no pipeline, apenas janelas curtas do programa.
+#
+# Cada amostra: fast_forward() até o ponto da amostra (o pipeline começa
+# vazio em cpu.pc), warmup instruções no pipeline para aquecer preditor,
+# caches e latches (não medidas), window instruções medidas e drain() para
+# voltar ao estado só arquitetural. O CPI estimado é o das janelas somadas;
+# os ciclos estimados, CPI × instruções do programa inteiro (o restante é
+# executado no modo rápido até o HALT para contá-las).
+import itertools
+import math
+
+FAST_MODES = ("functional", "translated")
+
+
+def fast_forward(cpu, instructions=None, until_pc=None, mode="translated"):
+    """Avança no modo rápido e deixa o pipeline pronto para começar em cpu.pc.
+
+    Para depois de `instructions` instruções ou na próxima vez que o PC chegar
+    a until_pc (a instrução em until_pc não é executada; requer
+    mode="functional"). Instruções ainda no pipeline são concluídas antes.
+    Retorna o número de instruções executadas no modo rápido.
+    """
+    if mode not in FAST_MODES:
+        raise ValueError(f"Modo rápido desconhecido: {mode!r} (use {', '.join(FAST_MODES)})")
+    if cpu.any_pipeline_active():
+        cpu.drain()
+    if until_pc is None:
+        n = cpu.run(instructions, mode=mode)
+    elif mode != "functional":
+        raise ValueError("until_pc requer mode='functional'")
+    elif cpu.profiler is not None:
+        n = cpu._run_functional_profiled(-1 if instructions is None else instructions, until_pc)
+    else:
+        n = cpu._run_functional(instructions, until_pc)
+    cpu.reset_pipeline()
+    return n
+
+
+def detailed(cpu, instructions, max_cycles=None):
+    """Simula no pipeline até concluir mais `instructions` instruções (ou HALT).
+    Retorna (ciclos, instruções concluídas)."""
+    step = cpu.step
+    cycle0 = cpu.cycle
+    instret0 = cpu.instret
+    target = instret0 + instructions
+    end = -1 if max_cycles is None else cycle0 + max_cycles
+    while cpu.instret < target and not cpu.halted and cpu.cycle != end:
+        step()
+    return cpu.cycle - cycle0, cpu.instret - instret0
+
+
+def run_sampled(cpu, period=None, points=None, warmup=1000, window=10000,
+                offset=0, mode="translated", max_instructions=None):
+    """Executa o programa até o HALT simulando em detalhe só as amostras.
+
+    As amostras começam (início do warmup) a cada `period` instruções a partir
+    de `offset`, ou nas posições de `points` (instruções desde o início).
+    max_instructions limita o programa inteiro. Retorna um dicionário com as
+    amostras, o CPI estimado, o intervalo de confiança de 95% do CPI e os
+    ciclos totais estimados.
+    """
+    if (period is None) == (points is None):
+        raise ValueError("Informe period ou points")
+    if period is not None and period <= 0:
+        raise ValueError("period deve ser positivo")
+    if window <= 0 or warmup < 0:
+        raise ValueError("window deve ser positivo e warmup não negativo")
+    if points is not None:
+        starts = iter(sorted(points))
+    else:
+        starts = itertools.count(offset, period)
+
+    base = cpu.instret
+    stop = None if max_instructions is None else base + max_instructions
+    samples = []
+    detail_cycles = 0
+    for start in starts:
+        start += base
+        if stop is not None and start >= stop:
+            break
+        ahead = start - cpu.instret
+        if ahead > 0:
+            fast_forward(cpu, ahead, mode=mode)
+        if cpu.halted:
+            break
+        cycle0 = cpu.cycle
+        if not cpu.any_pipeline_active():
+            cpu.reset_pipeline()
+        detailed(cpu, warmup)
+        measure_at = cpu.instret - base
+        cycles, instructions = detailed(cpu, window)
+        cpu.drain()
+        detail_cycles += cpu.cycle - cycle0
+        if instructions:
+            samples.append({"start": measure_at, "cycles": cycles,
+                            "instructions": instructions, "cpi": cycles / instructions})
+        if cpu.halted:
+            break
+    if not cpu.halted:
+        rest = None if stop is None else max(stop - cpu.instret, 0)
+        fast_forward(cpu, rest, mode=mode)
+
+    total = cpu.instret - base
+    measured = sum(s["instructions"] for s in samples)
+    cpi = sum(s["cycles"] for s in samples) / measured if measured else 0.0
+    ci95 = 0.0
+    if len(samples) > 1:
+        mean = sum(s["cpi"] for s in samples) / len(samples)
+        var = sum((s["cpi"] - mean) ** 2 for s in samples) / (len(samples) - 1)
+        ci95 = 1.96 * math.sqrt(var / len(samples))
+    return {
+        "samples": samples,
+        "instructions": total,
+        "measured_instructions": measured,
+        "detailed_cycles": detail_cycles,   # inclui warmup e drain
+        "cpi": cpi,
+        "cpi_ci95": ci95,                   # meia largura do intervalo de 95%
+        "estimated_cycles": round(cpi * total),
+    }
@@ -0,0 +1,215 @@
+# src/simulador/stream.py
+# Execução em fatias com instantâneos do estado (CPU.stream()).
+#
+# Interfaces gráficas e painéis não precisam chamar step() a cada ciclo: o
+# gerador executa fatias de `every` ciclos (instruções nos modos functional e
+# translated) com o run() normal e produz um Snapshot ao fim de cada fatia.
+# Eventos pedidos geram um Snapshot no ciclo em que ocorrem:
+#   registers=(3, 4):        escrita (WB) em um desses registradores
+#   stores=(inicio, fim):    SW em um endereço de [inicio, fim)
+# Com eventos, a execução é observada por um Watch (também usado pelo
+# depurador, src/simulador/debugger.py). No pipeline, versões instrumentadas de
+# WB/MEM, instaladas como atributos da instância (como no profiling) e
+# removidas no fim, anotam os eventos, e a fatia roda no laço interno de
+# run_until(), que para no ciclo em que a lista de eventos deixa de estar
+# vazia (sem a detecção de laços do run()). Nos modos functional e translated
+# a execução anda uma instrução por vez, inspecionada antes de executar
+# (sempre no modo functional, que tem os mesmos resultados do translated).
+from src.simulador.execute import EXEC_TABLE, LOAD, STORE, CONTROL
+from src.simulador.instruction import HALT_INSTRUCTION, WORD_MASK as MASK
+
+DEFAULT_EVERY = 10_000
+
+# Tipo do evento do Watch -> reason do Snapshot
+_REASONS = {"register": "write", "write": "store"}
+
+
+class Snapshot:
+    """Estado resumido da CPU em um ponto da execução.
+
+    reason: "interval" (fim de uma fatia), "write" (where = registrador),
+    "store" (where = endereço), "halt" ou o stop_reason da CPU ("loop").
+    value/source_pc: valor escrito e PC da instrução (só nos eventos).
+    elapsed: ciclos (ou instruções) desde o início do stream().
+    """
+    __slots__ = ("reason", "elapsed", "cycle", "instret", "pc", "halted", "registers",
+                 "where", "value", "source_pc")
+
+    def __init__(self, cpu, reason, elapsed, where=None, value=None, source_pc=None):
+        self.reason = reason
+        self.elapsed = elapsed
+        self.cycle = cpu.cycle
+        self.instret = cpu.instret
+        self.pc = cpu.pc
+        self.halted = cpu.halted
+        self.registers = tuple(cpu.registers)
+        self.where = where
+        self.value = value
+        self.source_pc = source_pc
+
+    def __repr__(self):
+        extra = f", where={self.where}, value={self.value}" if self.where is not None else ""
+        return f"Snapshot({self.reason}, elapsed={self.elapsed}, pc={self.pc}{extra})"
+
+
+class Watch:
+    """Escritas em registradores e acessos à memória (LW/SW) de uma CPU.
+
+    registers: índices observados (R0 nunca é escrito). reads/writes:
+    contêineres de endereços (addr in reads) para LW e SW, ou None. Cada passo
+    acrescenta a events tuplas (kind, where, value, pc), com kind "register"
+    (where = registrador), "read" ou "write" (where = endereço).
+    """
+
+    def __init__(self, cpu, registers=None, reads=None, writes=None):
+        self.cpu = cpu
+        self.registers = frozenset(r & 0x1F for r in registers or ()) - {0}
+        self.reads = reads
+        self.writes = writes
+        self.events = []
+        self._hooked_wb = self._hooked_mem = False
+
+    # Pipeline: WB/MEM instrumentados
+    def hook(self):
+        cpu = self.cpu
+        if self.registers:
+            self._WB_unwatched = cpu.WB
+            cpu.WB = self._WB_watched
+            self._hooked_wb = True
+        if self.reads is not None or self.writes is not None:
+            self._MEM_unwatched = cpu.MEM
+            cpu.MEM = self._MEM_watched
+            self._hooked_mem = True
+
+    def unhook(self):
+        cpu = self.cpu
+        if self._hooked_mem:
+            cpu._restore_method("MEM", self._MEM_unwatched)
+            self._hooked_mem = False
+        if self._hooked_wb:
+            cpu._restore_method("WB", self._WB_unwatched)
+            self._hooked_wb = False
+
+    def _WB_watched(self):
+        src = self.cpu.MEM_WB
+        if src.valid and src.exec_result is not None and (src.exec_rc & 0x1F) in self.registers:
+            self.events.append(("register", src.exec_rc & 0x1F, src.exec_result & MASK, src.pc))
+        self._WB_unwatched()
+
+    def _MEM_watched(self):
+        cpu = self.cpu
+        src = cpu.EX_MEM
+        event = None
+        if src.valid and 0 <= src.address < cpu.mem_size:
+            kind = src.kind
+            if kind == LOAD and self.reads is not None and src.address in self.reads:
+                event = "read"
+            elif kind == STORE and self.writes is not None and src.address in self.writes:
+                event = "write"
+        self._MEM_unwatched()
+        if event == "read":
+            self.events.append(("read", src.address, cpu.MEM_WB.exec_result, src.pc))
+        elif event == "write":
+            self.events.append(("write", src.address, src.store_value & MASK, src.pc))
+
+    # Modos functional/translated: uma instrução por vez
+    def _inspect(self, pc):
+        """Acessos observados que a instrução em pc fará: [(kind, onde), ...]."""
+        cpu = self.cpu
+        if not (0 <= pc < cpu.mem_size) or cpu.halted:
+            return ()
+        dec = cpu.decode_cache.get(pc)
+        if dec is None:
+            dec = cpu.decode_ir(cpu.memory[pc])
+        op = EXEC_TABLE[dec.opcode]
+        if op is None or dec.ir == HALT_INSTRUCTION:
+            return ()
+        kind = op.kind
+        accesses = []
+        if kind == LOAD or kind == STORE:
+            where = self.reads if kind == LOAD else self.writes
+            if where is not None:
+                r = cpu.registers
+                addr = op.handler(cpu, dec, r[dec.ra], r[dec.rb])
+                if 0 <= addr < cpu.mem_size and addr in where:
+                    accesses.append(("read" if kind == LOAD else "write", addr))
+            if kind == STORE:
+                return accesses
+        elif kind == CONTROL and op.dest is None:
+            return accesses
+        dest = (dec.rc if op.dest is None else op.dest) & 0x1F
+        if dest in self.registers:
+            accesses.append(("register", dest))
+        return accesses
+
+    def step_functional(self, run=None):
+        """Executa uma instrução no modo functional e registra os eventos.
+        run(max_cycles, mode) executa a instrução (padrão: cpu.run). Retorna
+        quantas instruções executou (0 ou 1)."""
+        cpu = self.cpu
+        pc = cpu.pc
+        accesses = self._inspect(pc)
+        n = (run or cpu.run)(1, "functional")
+        if not n:
+            return n
+        for kind, where in accesses:
+            if kind != "register":
+                # endereço dentro da memória: o acesso não falha
+                self.events.append((kind, where, cpu.memory[where] & MASK, pc))
+            elif not cpu.halted:
+                # LW fora da memória ou JAL para fora dela param sem escrever
+                self.events.append((kind, where, cpu.registers[where], pc))
+        return n
+
+
+def stream(cpu, every=DEFAULT_EVERY, mode="pipeline", max_cycles=None,
+           registers=None, stores=None):
+    """Gerador de Snapshots: um a cada `every` ciclos/instruções e um por evento.
+
+    O último Snapshot (reason "halt" ou o stop_reason da CPU) sai quando a CPU
+    para; max_cycles limita o total executado. Fechar o gerador remove a
+    instrumentação dos eventos.
+    """
+    if every <= 0:
+        raise ValueError(f"Intervalo inválido: {every}")
+    watch = None
+    if registers or stores is not None:
+        writes = None
+        if stores is not None:
+            start, end = stores
+            if start > end:
+                raise ValueError(f"Faixa de endereços inválida: {stores}")
+            writes = range(start, end)
+        watch = Watch(cpu, registers, writes=writes)
+        if mode == "pipeline":
+            watch.hook()
+    limit = -1 if max_cycles is None else max_cycles
+    n = 0
+    tick = every
+    try:
+        while n != limit and (not cpu.halted or cpu.halt_pending):
+            chunk = tick - n if limit < 0 else min(tick, limit) - n
+            if watch is None:
+                done = cpu.run(chunk, mode=mode)
+            elif mode == "pipeline":
+                # Fatia inteira no laço do run_until(): para no ciclo do evento
+                done = cpu._run_pipeline_until((), chunk, watch.events)[0]
+            else:
+                done = watch.step_functional()
+            n += done
+            if watch is not None and watch.events:
+                for kind, where, value, source_pc in watch.events:
+                    yield Snapshot(cpu, _REASONS[kind], n, where, value, source_pc)
+                watch.events.clear()
+            if cpu.halted and not cpu.halt_pending:
+                break
+            if n >= tick:
+                yield Snapshot(cpu, "interval", n)
+                tick += every
+            if not done:
+                break
+        if cpu.halted and not cpu.halt_pending:
+            yield Snapshot(cpu, cpu.stop_reason or "halt", n)
+    finally:
+        if watch is not None:
+            watch.unhook()
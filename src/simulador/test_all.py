@@ -1,39 +1,8 @@
 import sys
-from src.simulador.cpu import CPU
-from src.simulador.memory import create_memory, MEMORY_SIZE_WORDS
-from src.simulador.loader import load_binary_file
+from src.simulador.regression import make_job, run_regression
 
-def run_test(file):
-    print("\n======================================")
-    print(f"🔥 Rodando teste: {file}")
-    print("======================================")
-
-    memory = create_memory()
-    cpu = CPU(memory)
-
-    # cria registradores iniciais para cada teste
-    cpu.registers[1] = 10
-    cpu.registers[2] = 20
-    cpu.registers[3] = 3
-    cpu.registers[4] = 4
-    cpu.registers[5] = 5
-    cpu.registers[6] = 6
-    cpu.registers[7] = 7
-    cpu.registers[8] = 8
-    cpu.registers[9] = 9
-    cpu.registers[10] = 10
-
-    # carrega arquivo binário
-    load_binary_file(file, memory)
-
-    # executa
-    cpu.run()
-
-    print("\n--- Registradores finais ---")
-    print(cpu.registers)
-
-    print("\n--- Memória (primeiros 16 endereços) ---")
-    print(memory[:16])
+# registradores iniciais usados por todos os testes
+INITIAL_REGISTERS = {1: 10, 2: 20, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9, 10: 10}
 
 def main():
     tests = [
@@ -42,9 +11,27 @@ def main():
         "binarios/test_jumps.txt"
     ]
 
-    for t in tests:
-        run_test(t)
+    # executa os testes em paralelo (um processo por programa)
+    jobs = [make_job(t, registers=INITIAL_REGISTERS, mode="pipeline", max_cycles=10000) for t in tests]
+    summary = run_regression(jobs)
+
+    for result in summary["results"]:
+        print("\n======================================")
+        print(f"🔥 Teste: {result['program']} ({result['status']})")
+        print("======================================")
+        if result["status"] == "error":
+            print(result["error"])
+            continue
+        print(f"Ciclos: {result['cycles']}  Instrucoes: {result['instret']}")
+        print("\n--- Registradores finais ---")
+        print(result["registers"])
+        print("\n--- Flags ---")
+        print(result["flags"])
+        print("\n--- Digest da memória ---")
+        print(result["memory_digest"])
+
+    return 1 if summary["errors"] else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
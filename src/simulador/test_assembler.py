@@ -0,0 +1,187 @@
+# src/simulador/test_assembler.py
+# Montador de dois passos: rótulos, diretivas e montagem direto na memória.
+import os
+import tempfile
+from src.interpretador.assembler import AssemblerError, assemble, assemble_into, assemble_file
+from src.simulador.memory import create_memory
+from src.simulador.loader import load_binary_file
+from src.simulador.cpu import CPU
+from src.simulador.instruction import encode_fields, encode_jump
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "..", "exemplos")
+
+# Laço de contagem: r3 soma r1 até r4 == r2 (NOPs evitam hazards no pipeline)
+SOURCE = """
+        add r0 r0 r3        ; r3 = 0
+        nop
+        nop
+loop:   add r3 r1 r3
+        add r4 r1 r4
+        nop
+        nop
+        bne r4 r2 loop
+        nop                 # delay slot
+        sw  r0 r3 result
+        jal sub
+        nop
+        halt
+sub:    add r3 r3 r5
+        jr r31
+        nop
+address 0x40
+result: .word 0
+table:  .word 1 2 table
+        .space 2
+"""
+
+
+def test_simbolos_e_codificacao():
+    program = assemble(SOURCE)
+    assert program.symbols == {"loop": 3, "sub": 13, "result": 0x40, "table": 0x41}
+    (code_start, code), (data_start, data) = program.segments
+    assert code_start == 0 and len(code) == 16
+    assert code[3] == encode_fields(1, 3, 1, 3)
+    assert code[7] == encode_fields(27, 4, 2, const16=3)     # BNE: alvo de 16 bits
+    assert code[9] == encode_fields(23, 0, 3, const16=0x40)
+    assert code[10] == encode_jump(24, 13)
+    assert data_start == 0x40 and data == [0, 1, 2, 0x41, 0, 0]
+    assert program.source_map[3] == 5 and program.next_free == 0x46
+
+
+def test_montagem_direta_em_todos_os_modos():
+    for mode in ("pipeline", "functional", "translated"):
+        mem = create_memory()
+        assemble_into(SOURCE, mem)
+        cpu = CPU(mem)
+        cpu.registers[1] = 3
+        cpu.registers[2] = 12
+        cpu.run(max_cycles=1000, mode=mode)
+        assert cpu.halted, mode
+        assert cpu.registers[3] == 12 and mem[0x40] == 12, mode
+        assert cpu.registers[5] == 24, mode
+
+
+def test_saida_texto_igual_a_memoria():
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = os.path.join(tmp, "p.s"), os.path.join(tmp, "p.txt")
+        with open(src, "w") as f:
+            f.write(SOURCE)
+        assemble_file(src, out)
+        loaded, direct = create_memory(), create_memory()
+        load_binary_file(out, loaded)
+        assemble_into(SOURCE, direct)
+        assert loaded == direct
+
+
+def test_erros_com_linha():
+    cases = [
+        ("nop\nfoo r1\n", "linha 2"),
+        ("j nowhere\n", "linha 1"),
+        ("x: nop\nx: nop\n", "linha 2"),
+        ("lcll r1 5000\n", "linha 1"),
+        ("nop\nlcll r1 10\n", "linha 2"),
+        ("lclh r2 2048\n", "linha 1"),
+        ("lw r5 r0 200\n", "linha 1"),
+        ("lw r5 r1\n", "linha 1"),
+        ("add r1 r2\n", "linha 1"),
+        ("add r1 r2 r40\n", "linha 1"),
+    ]
+    for text, where in cases:
+        try:
+            assemble(text)
+        except AssemblerError as e:
+            assert where in str(e), (text, str(e))
+        else:
+            raise AssertionError(f"deveria falhar: {text!r}")
+
+
+def test_constantes_conferidas():
+    # A constante precisa ter os bits 15:11 iguais a rc: com r9, 9 << 11 = 18432
+    c = (9 << 11) | 5
+    try:
+        assemble("lcll r9 5\n")
+    except AssemblerError as e:
+        assert "18437" in str(e) and "18432..20479" in str(e), str(e)
+    else:
+        raise AssertionError("lcll r9 5 deveria falhar")
+    source = f"""
+        zero r8
+        lcll r9 {c}
+        lclh r8 {8 << 11}
+        lw   r5 r0 v         ; v = 5 << 11: o deslocamento é o próprio rótulo
+        halt
+address 10240
+v:      .word 1234
+"""
+    for mode in ("pipeline", "functional", "translated"):
+        mem = create_memory()
+        assemble_into(source, mem)
+        cpu = CPU(mem)
+        cpu.run(max_cycles=100, mode=mode)
+        assert cpu.halted, mode
+        assert cpu.registers[9] == (c << 8) | c == 0x484D05, mode
+        assert cpu.registers[8] == 0x40000000 and cpu.registers[5] == 1234, mode
+
+
+def test_exemplo_completo():
+    # exemplos/test_complete.s chega aos valores listados no cabeçalho
+    with open(os.path.join(EXAMPLES, "test_complete.s")) as f:
+        source = f.read()
+    expected = {1: 10, 2: 3, 3: 13, 4: 0xFFFFFFF9, 5: 2, 6: 11, 7: 9, 8: 104, 9: 1,
+                10: 1, 11: 104, 12: 5, 13: 1234, 14: 1234, 15: 0, 16: 0, 17: 999,
+                18: 42, 19: 1, 20: 2, 21: 0, 22: 222, 23: 0, 31: 777}
+    for mode, schedule in (("functional", False), ("translated", False), ("pipeline", True)):
+        mem = create_memory()
+        assemble_into(source, mem, schedule=schedule)
+        cpu = CPU(mem)
+        cpu.run(max_cycles=10000, mode=mode)
+        assert cpu.halted, mode
+        assert {r: cpu.registers[r] for r in expected} == expected, mode
+
+
+# Mesmo laço sem NOPs manuais: o escalonador cuida dos hazards e delay slots
+SEQUENTIAL = """
+        zero r3
+loop:   add r3 r1 r3
+        add r4 r1 r4
+        xor r6 r6 r6
+        sub r2 r1 r7
+        bne r4 r2 loop
+        sw  r0 r3 0x40
+        jal sub
+        halt
+sub:    add r3 r3 r5
+        jr r31
+"""
+
+
+def test_escalonador_preenche_hazards():
+    program = assemble(SEQUENTIAL, schedule=True)
+    report = program.schedule
+    assert report["cycles_saved"] > 0
+    assert report["scheduled_nops"] < report["naive_nops"]
+    results = []
+    for mode, schedule in (("functional", False), ("pipeline", True),
+                           ("functional", True), ("translated", True)):
+        mem = create_memory()
+        assemble_into(SEQUENTIAL, mem, schedule=schedule)
+        cpu = CPU(mem)
+        cpu.registers[1] = 3
+        cpu.registers[2] = 12
+        cpu.run(max_cycles=1000, mode=mode)
+        assert cpu.halted
+        results.append((cpu.registers[1:31], cpu.flag_neg, cpu.flag_zero,
+                        cpu.flag_carry, cpu.flag_overflow, mem[0x40]))
+    assert results[0][0][2] == 12 and results[0][0][4] == 24  # r3, r5
+    assert all(r == results[0] for r in results), results
+
+
+if __name__ == "__main__":
+    test_simbolos_e_codificacao()
+    test_montagem_direta_em_todos_os_modos()
+    test_saida_texto_igual_a_memoria()
+    test_erros_com_linha()
+    test_constantes_conferidas()
+    test_exemplo_completo()
+    test_escalonador_preenche_hazards()
+    print("OK")
@@ -0,0 +1,57 @@
+# src/simulador/test_batch.py
+# BatchCPU (NumPy) deve terminar cada lane no mesmo estado do modo funcional.
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.simulador.batch import BatchCPU
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.memory import create_memory
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.testutil import DATA_ADDR
+from src.simulador.test_modes import PROGRAM, BRANCHES
+
+
+def programs():
+    """Alguns programas curtos com ALU, shifts, LW/SW, desvios (BEQ/BNE com
+    registradores) e falha de acesso."""
+    progs = [PROGRAM, BRANCHES]
+    progs.append([encode_fields(1, 1, 2, 3), encode_fields(17, 3, 7, 4), encode_fields(16, 3, 7, 5),
+                  HALT_INSTRUCTION])
+    progs.append([encode_fields(2, 2, 1, 3), encode_fields(21, const16=0x123), encode_fields(25, 8),
+                  HALT_INSTRUCTION])
+    progs.append([encode_jump(24, 3), HALT_INSTRUCTION, 0, encode_fields(3, rc=6), encode_fields(25, 31)])
+    progs.append([encode_fields(22, 9), HALT_INSTRUCTION])  # LW fora da memória
+    return progs
+
+
+def make(words):
+    mem = create_memory()
+    for i, w in enumerate(words):
+        mem[i] = w
+    return mem
+
+
+def test_batch_igual_ao_funcional():
+    regs = [0, 10, 20, 0, 0, 0, 0, 1, 3, 0xFFFFFFF0] + [0] * 22
+    words = programs()
+    batch = BatchCPU([make(w) for w in words], registers=[regs] * len(words))
+    batch.run(max_steps=1000)
+    assert batch.active == 0
+    for lane, w in enumerate(words):
+        mem = make(w)
+        cpu = CPU(mem)
+        cpu.registers[:] = regs
+        cpu.run(max_cycles=1000, mode="functional")
+        state = batch.lane_state(lane)
+        assert state["registers"] == cpu.registers, lane
+        assert state["pc"] == cpu.pc and state["halted"] == cpu.halted
+        assert state["instret"] == cpu.instret
+        assert (state["flag_neg"], state["flag_zero"], state["flag_carry"], state["flag_overflow"]) == \
+            (cpu.flag_neg, cpu.flag_zero, cpu.flag_carry, cpu.flag_overflow)
+        assert int(batch.memory[lane, DATA_ADDR]) == mem[DATA_ADDR]
+
+
+if __name__ == "__main__":
+    test_batch_igual_ao_funcional()
+    print("OK")
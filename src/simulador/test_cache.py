@@ -0,0 +1,89 @@
+# src/simulador/test_cache.py
+# Modelo de caches e travamentos do pipeline em faltas.
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.cache import Cache
+from src.simulador.instruction import encode_fields
+from src.simulador.testutil import load_program
+
+
+def test_lru_e_fifo_escolhem_vitimas_diferentes():
+    # 1 conjunto, 2 vias, linhas de 1 palavra: acessa 0, 1, 0 e depois 2
+    lru = Cache(size=2, line_size=1, assoc=2, replacement="lru", miss_penalty=5)
+    fifo = Cache(size=2, line_size=1, assoc=2, replacement="fifo", miss_penalty=5)
+    for cache in (lru, fifo):
+        assert [cache.access(a) for a in (0, 1, 0, 2)] == [5, 5, 0, 5]
+    assert lru.access(0) == 0      # LRU removeu a linha 1
+    assert fifo.access(0) == 5     # FIFO removeu a linha 0 (a mais antiga)
+    assert lru.stats()["evictions"] == 1 and lru.stats()["hits"] == 2
+
+
+def test_write_back_e_write_through():
+    wb = Cache(size=4, line_size=2, assoc=1, write_back=True, miss_penalty=3)
+    assert wb.access(0, write=True) == 3   # write-allocate
+    assert wb.access(1) == 0               # mesma linha
+    assert wb.access(4) == 6               # remove a linha suja: falta + write-back
+    assert wb.stats()["writebacks"] == 1
+
+    wt = Cache(size=4, line_size=2, assoc=1, write_back=False, miss_penalty=3)
+    assert wt.access(0, write=True) == 0   # sem write-allocate
+    assert wt.access(0) == 3
+    assert wt.access(4) == 3               # linha limpa: sem write-back
+    st = wt.stats()
+    assert st["writebacks"] == 0 and st["mem_writes"] == 1
+
+
+def test_geometria_invalida():
+    for kwargs in ({"size": 12}, {"line_size": 3}, {"size": 4, "line_size": 4, "assoc": 2},
+                   {"replacement": "mru"}):
+        try:
+            Cache(**kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"geometria invalida deveria falhar: {kwargs}")
+
+
+# Reta de 8 ADDs, LW repetido no mesmo endereço e HALT
+PROGRAM = ([encode_fields(1, 1, 1, 2)] * 8 + [encode_fields(22, const16=100)] * 2
+           + [HALT_INSTRUCTION])
+
+
+def run(**caches):
+    cpu = load_program(PROGRAM, registers={1: 3}, hazard="full", **caches)
+    cpu.run(max_cycles=1000)
+    assert cpu.halted and cpu.registers[2] == 6
+    return cpu
+
+
+def test_faltas_travam_o_pipeline():
+    base = run().cycle
+    # 11 instruções em linhas de 4 palavras -> 3 faltas de 7 ciclos
+    cpu = run(icache=Cache(size=64, line_size=4, assoc=2, miss_penalty=7))
+    st = cpu.hazard_stats()
+    assert st["icache"]["misses"] == 3
+    assert st["icache_stalls"] == 21 and cpu.cycle == base + 21
+    # Os dois LW acessam a mesma palavra: só o primeiro falta
+    cpu = run(dcache=Cache(size=64, line_size=4, assoc=2, miss_penalty=7))
+    st = cpu.hazard_stats()
+    assert st["dcache"]["misses"] == 1 and st["dcache"]["hits"] == 1
+    assert st["dcache_stalls"] == 7 and cpu.cycle == base + 7
+    assert st["memory_cpi"] == 7 / cpu.instret
+
+
+def test_cache_requer_unidade_de_hazards():
+    try:
+        CPU(create_memory(), icache=Cache())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("cache no modo 'none' deveria falhar")
+
+
+if __name__ == "__main__":
+    test_lru_e_fifo_escolhem_vitimas_diferentes()
+    test_write_back_e_write_through()
+    test_geometria_invalida()
+    test_faltas_travam_o_pipeline()
+    test_cache_requer_unidade_de_hazards()
+    print("OK")
@@ -0,0 +1,160 @@
+# src/simulador/test_checkpoint.py
+# Checkpoint/restore da CPU com deltas de páginas de memória.
+import os
+import tempfile
+
+from src.simulador.memory import create_memory, PagedMemory, PAGE_BITS
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.cache import Cache
+from src.simulador.checkpoint import save_checkpoint, load_checkpoint, load_checkpoints
+from src.simulador.trace import TraceRecorder
+from src.simulador.instruction import encode_fields
+from src.simulador.testutil import DATA_ADDR, load_program
+
+DATA_PAGE = DATA_ADDR >> PAGE_BITS
+
+# Laço de 30 iterações: acumula em r3, grava r3 na memória e lê de volta
+PROGRAM = [
+    encode_fields(1, 3, 8, 3),                     # 0: ADD r3 = r3 + r8
+    encode_fields(23, 0, 3, const16=DATA_ADDR),    # 1: SW  MEM[DATA_ADDR] = r3
+    encode_fields(22, 0, 0, 5, DATA_ADDR),         # 2: LW  r5 = MEM[DATA_ADDR]
+    encode_fields(2, 8, 7, 8),                     # 3: SUB r8 = r8 - r7
+    encode_fields(27, 0, 8, const16=0),            # 4: BNE r0, r8 -> 0
+    HALT_INSTRUCTION,                              # 5: HALT
+]
+
+
+def make_cpu(memory=None, **kwargs):
+    kwargs.setdefault("hazard", "full")
+    return load_program(PROGRAM, memory, registers={7: 1, 8: 30}, **kwargs)
+
+
+def run_cycles(cpu, n):
+    for _ in range(n):
+        if cpu.halted:
+            break
+        cpu.step()
+
+
+def final_state(cpu):
+    return (cpu.cycle, cpu.instret, list(cpu.registers), cpu.memory[DATA_ADDR],
+            cpu.hazard_stats()["mispredicts"])
+
+
+def test_retomar_equivale_a_execucao_sem_interrupcao():
+    ref = make_cpu(icache=Cache(size=16, line_size=2), dcache=Cache(size=16, line_size=2))
+    ref.run(max_cycles=10000)
+    assert ref.halted and ref.registers[5] == ref.registers[3] == 465
+
+    cpu = make_cpu(icache=Cache(size=16, line_size=2), dcache=Cache(size=16, line_size=2))
+    run_cycles(cpu, 37)
+    cp = cpu.checkpoint()
+    cpu.run(max_cycles=10000)
+    assert final_state(cpu) == final_state(ref)
+
+    # Volta ao meio da execução e refaz: mesmo resultado, inclusive caches
+    cpu.restore(cp)
+    assert cpu.cycle == cp.cycle == 37 and not cpu.halted
+    cpu.run(max_cycles=10000)
+    assert final_state(cpu) == final_state(ref)
+    assert cpu.dcache.stats() == ref.dcache.stats()
+
+
+def test_delta_guarda_so_paginas_alteradas():
+    cpu = make_cpu()
+    base = cpu.checkpoint()
+    assert base.parent is None and sorted(base.pages) == [0]
+    run_cycles(cpu, 20)
+    delta = cpu.checkpoint()
+    assert delta.parent is base and sorted(delta.pages) == [DATA_PAGE]
+    # Sem executar nada: delta vazio
+    assert cpu.checkpoint().pages == {}
+
+
+def test_ramificar_experimentos_a_partir_do_mesmo_estado():
+    cpu = make_cpu()
+    run_cycles(cpu, 25)
+    cp = cpu.checkpoint()
+    # Experimento A: segue normalmente
+    cpu.run(max_cycles=10000)
+    a = cpu.registers[3]
+    # Experimento B: mesmo ponto, com o ADD trocado por r3 = r3 + r7 (soma 1)
+    cpu.restore(cp)
+    cpu.memory[0] = encode_fields(1, 3, 7, 3)
+    cpu.invalidate_decode(0)
+    cpu.run(max_cycles=10000)
+    b = cpu.registers[3]
+    assert a == 465 and b < a
+    # Restaurar de novo desfaz a alteração do código
+    cpu.restore(cp)
+    assert cpu.memory[0] == PROGRAM[0]
+    cpu.run(max_cycles=10000)
+    assert cpu.registers[3] == a
+    # Outra CPU (mesmo modo e tamanho de memória) também restaura o checkpoint
+    other = CPU(create_memory(), hazard="full")
+    other.restore(cp)
+    other.run(max_cycles=10000)
+    assert other.registers[3] == a and other.memory[DATA_ADDR] == a
+
+
+def test_trace_continua_correto_depois_do_restore():
+    ref = make_cpu()
+    run_cycles(ref, 25)
+    expected = ref.enable_tracing(TraceRecorder(capacity=4096))
+    ref.run(max_cycles=10000)
+
+    cpu = make_cpu()
+    run_cycles(cpu, 25)
+    cp = cpu.checkpoint()
+    rec = cpu.enable_tracing(TraceRecorder(capacity=4096))
+    cpu.run_for(3)
+    cpu.restore(cp)
+    cpu.run(max_cycles=10000)
+    # Os 3 primeiros ciclos gravados são refeitos depois do restore
+    records = list(rec.records())[3:]
+    assert records == list(expected.records())
+    # Colunas EX/MEM/WB e escritas do WB vêm dos latches da CPU restaurada
+    assert all(r.wb_pc >= 0 for r in records if r.wb_reg)
+    sums = [r.wb_value for r in records if r.wb_reg == 3]
+    assert sums[-1] == cpu.registers[3] == 465
+    assert any(r.mem_kind and r.mem_addr == DATA_ADDR for r in records)
+
+
+def test_arquivo_e_memoria_paginada():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.ckpt")
+        cpu = make_cpu(PagedMemory(size=1 << 16))
+        run_cycles(cpu, 10)
+        first = cpu.checkpoint()
+        run_cycles(cpu, 30)
+        second = cpu.checkpoint()
+        assert sorted(second.pages) == [DATA_PAGE]
+        save_checkpoint(second, path)
+        save_checkpoint(first, path)      # já gravado: não duplica
+        assert [cp.ident for cp in load_checkpoints(path)] == [first.ident, second.ident]
+        cpu.run(max_cycles=10000)
+        expected = final_state(cpu)
+
+        loaded = load_checkpoint(path)
+        assert loaded.ident == second.ident and loaded.parent.ident == first.ident
+        fresh = CPU(PagedMemory(size=1 << 16), hazard="full")
+        fresh.restore(loaded)
+        fresh.run(max_cycles=10000)
+        assert final_state(fresh) == expected
+
+        # Modo de hazards diferente do checkpoint
+        try:
+            CPU(PagedMemory(size=1 << 16)).restore(load_checkpoint(path, first.ident.hex()))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("restaurar em outro modo de hazards deveria falhar")
+
+
+if __name__ == "__main__":
+    test_retomar_equivale_a_execucao_sem_interrupcao()
+    test_delta_guarda_so_paginas_alteradas()
+    test_ramificar_experimentos_a_partir_do_mesmo_estado()
+    test_trace_continua_correto_depois_do_restore()
+    test_arquivo_e_memoria_paginada()
+    print("OK")
@@ -0,0 +1,116 @@
+# src/simulador/test_debugger.py
+# Breakpoints, watchpoints de registrador/memória e condições, nos três modos.
+from src.simulador.cpu import HALT_INSTRUCTION
+from src.simulador.debugger import Debugger, RangeIndex
+from src.simulador.instruction import encode_fields
+from src.simulador.testutil import (
+    DATA_ADDR, ITERATIONS, TOTAL, load_program, make_loop_cpu as make_cpu,
+)
+
+# BEQ r0, r0 sempre desvia: com a unidade de hazards a busca em 1 é descartada
+BRANCH = [
+    encode_fields(26, 0, 0, const16=5),    # 0: BEQ r0, r0 -> 5
+    encode_fields(1, 1, 1, 3),             # 1: ADD r3 = r1 + r1 (caminho errado)
+    0, 0, 0,                               # 2-4: delay slots no hazard "none"
+    encode_fields(1, 1, 1, 4),             # 5: ADD r4 = r1 + r1
+    HALT_INSTRUCTION,                      # 6: HALT
+]
+
+
+def test_indice_de_faixas():
+    index = RangeIndex([(10, 20, "a"), (15, 30, "b"), (40, 41, "c")])
+    assert index.find(9) == () and index.find(30) == () and index.find(41) == ()
+    assert index.find(10) == ("a",) and index.find(19) == ("a", "b")
+    assert index.find(20) == ("b",) and index.find(40) == ("c",)
+    assert 19 in index and 40 in index and 30 not in index
+    assert not RangeIndex() and RangeIndex().find(0) == ()
+
+
+def test_breakpoints():
+    for mode in ("functional", "translated", "pipeline"):
+        cpu = make_cpu()
+        dbg = Debugger(cpu)
+        bp = dbg.break_at(4)
+        hits = dbg.run(mode=mode)
+        assert [h.kind for h in hits] == ["pc"] and hits[0].point is bp
+        if mode == "pipeline":
+            assert cpu.ID_EX.pc == 4
+        else:
+            assert cpu.pc == 4 and cpu.instret == 4
+        # Condicional: só na terceira passagem (r8 já decrementado duas vezes)
+        dbg.remove(bp)
+        dbg.break_at(0, condition=lambda c, hit: c.registers[8] == ITERATIONS - 2)
+        assert dbg.run(mode=mode) and cpu.registers[8] == ITERATIONS - 2
+        dbg.clear()
+        assert dbg.run(mode=mode) == [] and cpu.halted
+
+
+def test_breakpoint_ignora_busca_do_caminho_errado():
+    for hazard in ("stall", "ex_mem", "full"):
+        cpu = load_program(BRANCH, registers={1: 2}, hazard=hazard)
+        dbg = Debugger(cpu)
+        dbg.break_at(1)
+        target = dbg.break_at(5)
+        hits = dbg.run()
+        assert [h.point for h in hits] == [target] and cpu.ID_EX.pc == 5, hazard
+        assert dbg.run() == [] and cpu.halted
+        assert cpu.registers[3] == 0 and cpu.registers[4] == 4 and cpu.flushes == 1
+
+        # run_until() também não para na busca descartada
+        cpu = load_program(BRANCH, registers={1: 2}, hazard=hazard)
+        cpu.run_until(pc=1)
+        assert cpu.halted and cpu.registers[4] == 4
+        cpu = load_program(BRANCH, registers={1: 2}, hazard=hazard)
+        cpu.run_until(pc=1, predicate=lambda c: False)
+        assert cpu.halted
+
+    # Sem unidade de hazards a instrução em 1 (delay slot) executa: para nela
+    cpu = load_program(BRANCH, registers={1: 2})
+    dbg = Debugger(cpu)
+    dbg.break_at(1)
+    assert dbg.run() and cpu.ID_EX.pc == 1
+    dbg.run()
+    assert cpu.halted and cpu.registers[3] == 4
+
+
+def test_watchpoints():
+    results = []
+    for mode in ("functional", "translated", "pipeline"):
+        cpu = make_cpu()
+        dbg = Debugger(cpu)
+        dbg.watch_register(6)
+        dbg.watch_memory(DATA_ADDR - 5, DATA_ADDR + 5, access="rw",
+                         condition=lambda c, hit: hit.value % 3 == 0)
+        stops = []
+        for _ in range(8):
+            stops.append([(h.kind, h.where, h.value, h.pc) for h in dbg.run(mode=mode)])
+        assert "WB" not in cpu.__dict__ and "MEM" not in cpu.__dict__
+        results.append(stops)
+        # Sem pontos ativos, run() termina normalmente
+        dbg.clear()
+        dbg.run(mode=mode)
+        assert cpu.halted and cpu.instret == TOTAL
+    assert results[0] == results[1] == results[2]
+    stops = results[0]
+    assert stops[0] == [("register", 6, 2 * ITERATIONS, 3)]
+    # 2000 + 1999 = 3999 (múltiplo de 3): SW e LW do mesmo endereço param
+    assert stops[1] == [("write", DATA_ADDR, 3999, 1)]
+    assert stops[2] == [("read", DATA_ADDR, 3999, 2)]
+
+
+def test_show():
+    cpu = make_cpu(caches=False)
+    dbg = Debugger(cpu)
+    dbg.break_at(3)
+    dbg.run()
+    text = dbg.show()
+    assert "ID_EX   pc=3" in text and "r8 =2000" in text and "N=" in text
+
+
+if __name__ == "__main__":
+    test_indice_de_faixas()
+    test_breakpoints()
+    test_breakpoint_ignora_busca_do_caminho_errado()
+    test_watchpoints()
+    test_show()
+    print("OK")
@@ -0,0 +1,64 @@
+# src/simulador/test_execute.py
+# register_opcode(): opcodes novos e handlers substituídos valem em todos os modos.
+from src.simulador.cpu import HALT_INSTRUCTION
+from src.simulador import execute as ex
+from src.simulador.instruction import encode_fields
+from src.simulador.testutil import load_program
+
+MODES = ("pipeline", "functional", "translated")
+
+
+def make_cpu(opcode):
+    # r3 = r1 <op> r2 (NOPs evitam hazards no pipeline sem forwarding)
+    return load_program([encode_fields(opcode, 1, 2, 3), 0, 0, HALT_INSTRUCTION],
+                        registers={1: 7, 2: 5})
+
+
+def op_mul(cpu, dec, a_val, b_val):
+    res = cpu._nz = (a_val * b_val) & 0xFFFFFFFF
+    return res
+
+
+def test_opcode_novo():
+    assert ex.lookup(8) is None
+    op = ex.register_opcode(8, "mul", ex.ALU, op_mul)
+    try:
+        assert ex.lookup(8) is op and ex.OPCODES["mul"] == 8
+        for mode in MODES:
+            cpu = make_cpu(8)
+            cpu.run(max_cycles=100, mode=mode)
+            assert cpu.halted and cpu.registers[3] == 35, mode
+    finally:
+        ex.EXEC_TABLE[8] = None
+        del ex.OPCODES["mul"]
+
+
+def test_substituir_handler_existente():
+    original = ex.lookup(1)
+    ex.register_opcode(1, "add", ex.ALU, ex.op_sub)
+    try:
+        for mode in MODES:
+            cpu = make_cpu(1)
+            cpu.run(max_cycles=100, mode=mode)
+            assert cpu.registers[3] == 2, mode
+    finally:
+        ex.register_opcode(1, "add", ex.ALU, original.handler)
+    cpu = make_cpu(1)
+    cpu.run(max_cycles=100)
+    assert cpu.registers[3] == 12
+
+
+def test_opcode_fora_do_intervalo():
+    try:
+        ex.register_opcode(ex.NUM_OPCODES, "x", ex.ALU, op_mul)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("opcode fora do intervalo deveria falhar")
+
+
+if __name__ == "__main__":
+    test_opcode_novo()
+    test_substituir_handler_existente()
+    test_opcode_fora_do_intervalo()
+    print("OK")
@@ -0,0 +1,54 @@
+# src/simulador/test_flags.py
+# Flags N/Z/C/V avaliadas sob demanda a partir do registro feito no EX.
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU
+from src.simulador.execute import EXEC_TABLE
+
+
+def execute(cpu, opcode, a_val, b_val):
+    return EXEC_TABLE[opcode].handler(cpu, cpu.decode_ir(opcode << 26), a_val, b_val)
+
+
+def flags(cpu):
+    return (cpu.flag_neg, cpu.flag_zero, cpu.flag_carry, cpu.flag_overflow)
+
+
+def test_valores_das_flags():
+    cpu = CPU(create_memory(64))
+    assert flags(cpu) == (0, 0, 0, 0)
+    assert execute(cpu, 1, 0x7FFFFFFF, 1) == 0x80000000       # ADD: overflow
+    assert flags(cpu) == (1, 0, 0, 1)
+    assert execute(cpu, 1, 0xFFFFFFFF, 1) == 0                # ADD: carry
+    assert flags(cpu) == (0, 1, 1, 0)
+    assert execute(cpu, 2, 1, 2) == 0xFFFFFFFF                # SUB: empréstimo
+    assert flags(cpu) == (1, 0, 0, 0)
+    assert execute(cpu, 2, 0x80000000, 1) == 0x7FFFFFFF       # SUB: overflow
+    assert flags(cpu) == (0, 0, 1, 1)
+    # LSL define C e mantém o V da última soma/subtração
+    assert execute(cpu, 18, 0x80000001, 1) == 2
+    assert flags(cpu) == (0, 0, 1, 1)
+    assert execute(cpu, 18, 1, 4) == 16
+    assert flags(cpu) == (0, 0, 0, 1)
+    # XOR só define N e Z
+    execute(cpu, 4, 5, 5)
+    assert flags(cpu) == (0, 1, 0, 1)
+
+
+def test_atribuicao_explicita():
+    cpu = CPU(create_memory(64))
+    execute(cpu, 1, 0xFFFFFFFF, 0x80000001)
+    assert flags(cpu) == (1, 0, 1, 0)
+    cpu.flag_zero = 1
+    assert flags(cpu) == (1, 1, 1, 0)
+    cpu.flag_carry = 0
+    cpu.flag_neg = 0
+    assert flags(cpu) == (0, 1, 0, 0)
+    # Um novo resultado volta a definir N e Z juntos
+    execute(cpu, 5, 0x80000000, 0)
+    assert flags(cpu) == (1, 0, 0, 0)
+
+
+if __name__ == "__main__":
+    test_valores_das_flags()
+    test_atribuicao_explicita()
+    print("OK")
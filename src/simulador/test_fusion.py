@@ -0,0 +1,98 @@
+# src/simulador/test_fusion.py
+# Superinstruções do modo funcional: mesmos resultados e contagens, com relatório.
+import os
+
+from src.interpretador.assembler import assemble_into
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields
+from src.simulador import testutil
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "..", "exemplos", "test_complete.s")
+
+DATA_ADDR = (4 << 11) | 100
+
+# Laço com os três padrões: LCLH+LCLL, LW+ADD e SUB+BNE
+LOOP = [
+    encode_fields(20, rc=9),                   # 0: LCLH r9
+    encode_fields(21, rc=9, const16=5),        # 1: LCLL r9
+    encode_fields(22, 0, 0, 4, DATA_ADDR),     # 2: LW   r4 = MEM[DATA_ADDR]
+    encode_fields(1, 3, 4, 3),                 # 3: ADD  r3 = r3 + r4
+    encode_fields(1, 3, 9, 3),                 # 4: ADD  r3 = r3 + r9
+    encode_fields(2, 8, 7, 8),                 # 5: SUB  r8 = r8 - r7
+    encode_fields(27, 0, 8, const16=0),        # 6: BNE  r0, r8 -> 0
+    HALT_INSTRUCTION,                          # 7: HALT
+]
+
+
+def make_cpu(words):
+    cpu = testutil.load_program(words, registers={7: 1, 8: 50})
+    cpu.memory[DATA_ADDR] = 7
+    return cpu
+
+
+def arch_state(cpu):
+    return testutil.arch_state(cpu, 64) + (cpu.pc, cpu.instret, cpu.ir)
+
+
+def test_resultados_e_contagens_iguais():
+    plain = make_cpu(LOOP)
+    plain.run(mode="functional")
+    cpu = make_cpu(LOOP)
+    fusion = cpu.enable_fusion(0, 64)
+    cpu.run(mode="functional")
+    assert arch_state(cpu) == arch_state(plain)
+    stats = fusion.stats()
+    assert {name: st["executed"] for name, st in stats.items()} == \
+        {"const32": 50, "alu_branch": 50, "load_alu": 50}
+    report = fusion.report()
+    assert "const32" in report and "load_alu" in report
+
+    # Orçamento de instruções exato, mesmo no meio de uma superinstrução
+    plain = make_cpu(LOOP)
+    cpu = make_cpu(LOOP)
+    cpu.enable_fusion(0, 64)
+    while not plain.halted:
+        assert plain.run(3, mode="functional") == cpu.run(3, mode="functional")
+        assert arch_state(cpu) == arch_state(plain)
+
+
+def test_codigo_alterado_desfaz_a_fusao():
+    cpu = make_cpu(LOOP)
+    fusion = cpu.enable_fusion(0, 64)
+    # Troca o LCLL por um LCLL r9 com outra constante (cache invalidado como faria um SW)
+    cpu.memory[1] = encode_fields(21, rc=9, const16=6)
+    cpu.invalidate_decode(1)
+    cpu.run(mode="functional")
+    plain = make_cpu(LOOP)
+    plain.memory[1] = encode_fields(21, rc=9, const16=6)
+    plain.run(mode="functional")
+    assert arch_state(cpu) == arch_state(plain)
+    assert fusion.stats()["const32"]["executed"] == 0
+    assert cpu.disable_fusion() is fusion
+    assert all(dec.fused is None for dec in cpu.decode_cache.values())
+
+
+def test_exemplo_completo():
+    results = []
+    for fuse in (False, True):
+        mem = create_memory()
+        with open(EXAMPLE) as f:
+            assemble_into(f.read(), mem)
+        cpu = CPU(mem)
+        if fuse:
+            fusion = cpu.enable_fusion(0, 256)
+        cpu.run(max_cycles=10000, mode="functional")
+        assert cpu.halted
+        results.append(arch_state(cpu))
+    assert results[0] == results[1]
+    # Cada constante é um LW seguido do ADD que a copia
+    load_alu = fusion.stats()["load_alu"]
+    assert load_alu["sites"] >= 8 and load_alu["executed"] > 0
+
+
+if __name__ == "__main__":
+    test_resultados_e_contagens_iguais()
+    test_codigo_alterado_desfaz_a_fusao()
+    test_exemplo_completo()
+    print("OK")
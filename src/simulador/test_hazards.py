@@ -0,0 +1,106 @@
+# src/simulador/test_hazards.py
+# Unidade de hazards: programas sem NOPs devem terminar como no modo funcional.
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.testutil import DATA_ADDR, load_program, arch_state
+
+# Dependências RAW consecutivas, load-use, JAL/JR e laço com BNE (sem NOPs)
+PROGRAM = [
+    encode_fields(1, 1, 2, 3),                     # 0:  ADD r3 = r1 + r2
+    encode_fields(2, 3, 1, 4),                     # 1:  SUB r4 = r3 - r1      (depende de 0)
+    encode_fields(23, 0, 4, const16=DATA_ADDR),    # 2:  SW  MEM[DATA_ADDR] = r4
+    encode_fields(22, 0, 0, 5, DATA_ADDR),         # 3:  LW  r5 = MEM[DATA_ADDR]
+    encode_fields(1, 5, 5, 6),                     # 4:  ADD r6 = r5 + r5      (load-use)
+    encode_jump(24, 10),                           # 5:  JAL 10 (r31 = 6)
+    encode_fields(2, 8, 7, 8),                     # 6:  SUB r8 = r8 - r7
+    encode_fields(27, 0, 8, const16=6),            # 7:  BNE r0, r8 -> 6
+    HALT_INSTRUCTION,                              # 8:  HALT
+    encode_fields(1, 1, 1, 9),                     # 9:  (nunca executada)
+    encode_fields(1, 6, 1, 10),                    # 10: ADD r10 = r6 + r1
+    encode_fields(25, 31),                         # 11: JR r31                (depende do JAL)
+    encode_fields(1, 1, 1, 11),                    # 12: ADD r11 (descartada pelo JR)
+]
+
+
+def make_cpu(hazard):
+    cpu = load_program(PROGRAM, registers={1: 10, 2: 20, 7: 1, 8: 3}, hazard=hazard)
+    return cpu, cpu.memory
+
+
+def run_hazard(hazard):
+    cpu, mem = make_cpu(hazard)
+    cpu.run(max_cycles=10000, mode="pipeline")
+    return cpu, mem
+
+
+def test_modos_de_hazard_iguais_ao_funcional():
+    ref, _ = make_cpu("none")
+    ref.run(max_cycles=10000, mode="functional")
+    assert ref.registers[6] == 40 and ref.registers[10] == 50
+    assert ref.registers[8] == 0 and ref.registers[11] == 0
+    for hazard in ("stall", "ex_mem", "full"):
+        cpu, _ = run_hazard(hazard)
+        assert arch_state(cpu) == arch_state(ref), hazard
+        assert cpu.instret == ref.instret, hazard
+        assert not cpu.any_pipeline_active()
+
+
+def test_forwarding_reduz_travamentos_e_cpi():
+    stats = {h: run_hazard(h)[0].hazard_stats() for h in ("stall", "ex_mem", "full")}
+    assert stats["stall"]["stalls"] > stats["ex_mem"]["stalls"] > stats["full"]["stalls"]
+    assert stats["stall"]["cpi"] > stats["ex_mem"]["cpi"] > stats["full"]["cpi"]
+    # Com forwarding completo só sobra o travamento load-use (LW -> ADD)
+    assert stats["full"]["stalls"] == stats["full"]["load_use_stalls"] == 1
+    # Desvios tomados: JAL, JR, BNE (2x) -> 4 instruções descartadas
+    for st in stats.values():
+        assert st["flushes"] == 4
+
+
+def test_desvio_para_fora_da_memoria_conclui_anteriores():
+    words = [
+        encode_fields(1, 1, 1, 2),    # ADD r2 = r1 + r1
+        encode_fields(25, 3),         # JR r3 (fora da memória)
+        encode_fields(1, 1, 1, 4),    # descartada
+    ]
+    cpu = load_program(words, registers={1: 5}, hazard="full")
+    cpu.registers[3] = cpu.mem_size + 1
+    cpu.run(max_cycles=100)
+    assert cpu.halted
+    assert cpu.registers[2] == 10 and cpu.registers[4] == 0
+
+
+def test_drenagem_usa_a_bolha_compartilhada():
+    # Sem unidade de hazards o HALT é visto já no IF e o pipeline é drenado:
+    # a cada ciclo o IF_ID recebe a bolha pré-alocada (nada de latch novo por
+    # ciclo) e a bolha continua vazia
+    cpu, _ = make_cpu("none")
+    draining = 0
+    while not cpu.halted or cpu.halt_pending:
+        fetched_halt = cpu.halted  # o ciclo que busca o HALT deixa-o no IF_ID
+        cpu.run(max_cycles=1, mode="pipeline")
+        if fetched_halt:
+            assert cpu.IF_ID is cpu._bubble
+            draining += 1
+    assert draining > 1
+    assert not cpu._bubble.valid
+    ref, _ = run_hazard("none")
+    assert arch_state(cpu) == arch_state(ref)
+
+
+def test_modo_de_hazard_invalido():
+    try:
+        CPU(create_memory(), hazard="turbo")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("modo de hazards invalido deveria falhar")
+
+
+if __name__ == "__main__":
+    test_modos_de_hazard_iguais_ao_funcional()
+    test_forwarding_reduz_travamentos_e_cpi()
+    test_desvio_para_fora_da_memoria_conclui_anteriores()
+    test_drenagem_usa_a_bolha_compartilhada()
+    test_modo_de_hazard_invalido()
+    print("OK")
@@ -0,0 +1,100 @@
+# src/simulador/test_image.py
+# Imagem binária de programa e cache de conversão texto -> binário.
+import os
+import tempfile
+from src.simulador.memory import create_memory
+from src.simulador.loader import LoaderError, load_binary_file
+from src.simulador.image import (
+    CACHE_ENV, cache_path, load_image, load_program, read_image, text_to_segments, write_image,
+)
+
+SOURCE = """# programa com dois segmentos
+00000100001000100001100000000000
+11111111111111111111111111111111
+address 0000000000010000
+00000000000000000000000000000101
+00000000000000000000000000000110
+"""
+
+
+def test_imagem_igual_ao_texto():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "prog.txt")
+        with open(src, "w") as f:
+            f.write(SOURCE)
+        segments, next_free = text_to_segments(src, 65536)
+        assert [(s, list(w)) for s, w in segments] == [(0, [0x04221800, 0xFFFFFFFF]), (16, [5, 6])]
+        img = os.path.join(tmp, "prog.img")
+        write_image(img, segments, next_free=next_free)
+        info, _ = read_image(img)
+        assert info["entry"] == 0 and info["next_free"] == 18
+
+        expected = create_memory()
+        assert load_binary_file(src, expected) == 18
+        mem = create_memory()
+        assert load_image(img, mem) == 18
+        assert mem == expected
+
+        # byte corrompido: checksum falha
+        with open(img, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\x01")
+        try:
+            read_image(img)
+        except LoaderError:
+            pass
+        else:
+            raise AssertionError("imagem corrompida deveria falhar")
+
+
+def test_cache_reaproveitado_ate_o_texto_mudar():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "prog.txt")
+        with open(src, "w") as f:
+            f.write(SOURCE)
+        cache_dir = os.path.join(tmp, "cache")
+        mem = create_memory()
+        assert load_program(src, mem, cache_dir=cache_dir) == 18
+        cached = cache_path(src, cache_dir)
+        assert os.path.exists(cached)
+
+        # Enquanto o texto não muda, a imagem é usada (mesmo que o texto nem seja lido)
+        stamp = os.stat(cached).st_mtime_ns
+        mem2 = create_memory()
+        assert load_program(src, mem2, cache_dir=cache_dir) == 18 and mem2 == mem
+        assert os.stat(cached).st_mtime_ns == stamp
+
+        # Texto alterado: reconverte
+        with open(src, "a") as f:
+            f.write("00000000000000000000000000000111\n")
+        mem3 = create_memory()
+        assert load_program(src, mem3, cache_dir=cache_dir) == 19 and mem3[18] == 7
+        assert read_image(cached)[0]["next_free"] == 19
+
+
+def test_sem_cache_configurado_nada_e_gravado():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "prog.txt")
+        with open(src, "w") as f:
+            f.write(SOURCE)
+        saved = os.environ.pop(CACHE_ENV, None)
+        try:
+            mem = create_memory()
+            assert load_program(src, mem) == 18 and mem[17] == 6
+            assert os.listdir(tmp) == ["prog.txt"]
+
+            # Opt-in pela variável de ambiente
+            os.environ[CACHE_ENV] = os.path.join(tmp, "cache")
+            assert load_program(src, create_memory()) == 18
+            assert os.path.exists(cache_path(src, os.environ[CACHE_ENV]))
+        finally:
+            os.environ.pop(CACHE_ENV, None)
+            if saved is not None:
+                os.environ[CACHE_ENV] = saved
+
+
+if __name__ == "__main__":
+    test_imagem_igual_ao_texto()
+    test_cache_reaproveitado_ate_o_texto_mudar()
+    test_sem_cache_configurado_nada_e_gravado()
+    print("OK")
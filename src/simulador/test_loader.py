@@ -0,0 +1,80 @@
+# src/simulador/test_loader.py
+# Loader de texto em blocos: mesmo resultado da leitura linha a linha e
+# número de linha exato nos erros, inclusive em blocos pequenos e pipes.
+import io
+import os
+import tempfile
+import src.simulador.loader as loader
+from src.simulador.loader import LoaderError, load_binary_file
+from src.simulador.memory import create_memory
+
+WORDS = [format(i * 0x01010101, "032b") for i in range(20)]
+
+
+def program_text():
+    lines = ["# cabecalho"] + WORDS[:10] + ["", "address 0000000001000000"] + WORDS[10:]
+    return "\n".join(lines) + "\n"
+
+
+def load_text(text, chunk):
+    old = loader.CHUNK_CHARS
+    loader.CHUNK_CHARS = chunk
+    try:
+        mem = create_memory()
+        return load_binary_file(io.StringIO(text), mem), mem
+    finally:
+        loader.CHUNK_CHARS = old
+
+
+def test_blocos_de_qualquer_tamanho():
+    for chunk in (5, 33, 100, 1 << 20):
+        end, mem = load_text(program_text(), chunk)
+        assert end == 64 + 10
+        assert [mem[i] for i in range(10)] == [int(w, 2) for w in WORDS[:10]]
+        assert [mem[64 + i] for i in range(10)] == [int(w, 2) for w in WORDS[10:]]
+
+
+def test_erro_com_linha_exata():
+    text = program_text().replace(WORDS[15], WORDS[15][:31] + "2")
+    for chunk in (5, 100, 1 << 20):
+        try:
+            load_text(text, chunk)
+        except LoaderError as e:
+            assert str(e).startswith("Erro na linha 19:"), str(e)
+        else:
+            raise AssertionError("caractere invalido deveria falhar")
+    # Palavras anteriores ao erro continuam carregadas
+    mem = create_memory()
+    try:
+        load_binary_file(io.StringIO(text), mem)
+    except LoaderError:
+        pass
+    assert mem[64 + 4] == int(WORDS[14], 2) and mem[64 + 5] == 0
+
+
+def test_arquivo_e_pipe_binario():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prog.txt")
+        with open(path, "w") as f:
+            f.write(program_text().rstrip("\n"))  # sem quebra de linha final
+        mem = create_memory()
+        assert load_binary_file(path, mem) == 74
+    mem2 = create_memory()
+    source = io.BytesIO(program_text().encode())
+    assert load_binary_file(source, mem2) == 74
+    assert mem2 == mem
+    # O arquivo binário do chamador continua aberto (também após um erro)
+    assert not source.closed and source.read() == b""
+    source = io.BytesIO(b"101\n")
+    try:
+        load_binary_file(source, create_memory())
+    except LoaderError:
+        pass
+    assert not source.closed
+
+
+if __name__ == "__main__":
+    test_blocos_de_qualquer_tamanho()
+    test_erro_com_linha_exata()
+    test_arquivo_e_pipe_binario()
+    print("OK")
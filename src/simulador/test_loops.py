@@ -0,0 +1,84 @@
+# src/simulador/test_loops.py
+# Laços infinitos terminam com stop_reason = "loop"; faltas de cache com o
+# pipeline vazio são puladas de uma vez, com os mesmos contadores.
+from src.simulador.cpu import HALT_INSTRUCTION
+from src.simulador.cache import Cache
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.testutil import load_program, make_loop_cpu
+
+FLAG_ADDR = (4 << 11) | 40
+
+# Espera por um valor que nunca muda: LW + BEQ para trás (sem mudar o estado)
+SPIN = [
+    encode_fields(1, 1, 2, 3),                 # 0: ADD r3 = r1 + r2
+    encode_fields(22, 0, 0, 4, FLAG_ADDR),     # 1: LW  r4 = MEM[FLAG_ADDR]
+    encode_fields(26, 4, 0, const16=1),        # 2: BEQ r4, r0 -> 1
+    0,                                         # 3: NOP (delay slot no hazard "none")
+    HALT_INSTRUCTION,                          # 4: HALT
+]
+
+
+def make_cpu(words, **kwargs):
+    return load_program(words, registers={1: 4, 2: 5}, **kwargs)
+
+
+def test_desvio_para_si_mesmo():
+    for mode in ("functional", "translated", "pipeline"):
+        cpu = make_cpu([encode_fields(1, 1, 2, 3), encode_jump(28, 1), 0, HALT_INSTRUCTION])
+        detector = cpu.enable_loop_detection(interval=100)
+        n = cpu.run(mode=mode)
+        assert cpu.halted and cpu.stop_reason == "loop", mode
+        assert n <= 300 and detector.detected_pc in (1, 2, 3)
+        assert cpu.registers[3] == 9
+
+
+def test_laco_sem_mudanca_de_estado():
+    for hazard in ("none", "full"):
+        for mode in ("functional", "pipeline"):
+            cpu = make_cpu(SPIN, hazard=hazard)
+            cpu.enable_loop_detection(interval=64)
+            cpu.run(max_cycles=100000, mode=mode)
+            assert cpu.stop_reason == "loop" and cpu.registers[3] == 9
+            assert (cpu.cycle if mode == "pipeline" else cpu.instret) < 2000
+
+    # O valor esperado aparece na memória: o laço termina normalmente
+    cpu = make_cpu(SPIN)
+    cpu.memory[FLAG_ADDR] = 1
+    cpu.enable_loop_detection(interval=1)
+    cpu.run(mode="functional")
+    assert cpu.halted and cpu.stop_reason is None
+
+
+def test_laco_que_muda_o_estado_nao_e_interrompido():
+    plain = make_loop_cpu(caches=False)
+    plain.run(mode="functional")
+    cpu = make_loop_cpu(caches=False)
+    cpu.enable_loop_detection(interval=16)
+    assert cpu.run(mode="functional") == plain.instret
+    assert cpu.stop_reason is None and list(cpu.registers) == list(plain.registers)
+    assert cpu.disable_loop_detection().checks > 0
+
+
+def test_faltas_de_cache_puladas():
+    results = []
+    for skip in (True, False):
+        cpu = make_loop_cpu()
+        cpu.icache = Cache(size=4, line_size=1, miss_penalty=20)
+        cpu.dcache = Cache(size=4, line_size=1, miss_penalty=20)
+        if not skip:
+            cpu._skip_idle = lambda limit: 0
+        chunks = []
+        while not cpu.halted:
+            chunks.append(cpu.run(max_cycles=997))
+        stats = cpu.hazard_stats()
+        results.append((chunks, stats, list(cpu.registers)))
+    assert results[0] == results[1]
+    assert results[0][1]["icache_stalls"] > 0 and results[0][1]["dcache_stalls"] > 0
+
+
+if __name__ == "__main__":
+    test_desvio_para_si_mesmo()
+    test_laco_sem_mudanca_de_estado()
+    test_laco_que_muda_o_estado_nao_e_interrompido()
+    test_faltas_de_cache_puladas()
+    print("OK")
@@ -0,0 +1,103 @@
+# src/simulador/test_memory.py
+# Memória compacta (array), imagens mapeadas e operações em bloco.
+import os
+import tempfile
+from src.simulador.memory import (
+    MEMORY_SIZE_WORDS, create_memory, map_memory_image, save_memory_image,
+    read_block, write_block, PagedMemory, allocated_ranges,
+)
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields, encode_jump
+
+
+def test_create_memory_compacta():
+    mem = create_memory()
+    assert len(mem) == MEMORY_SIZE_WORDS
+    assert mem.itemsize == 4
+    mem[10] = 0xFFFFFFFF
+    assert mem[10] == 0xFFFFFFFF
+
+
+def test_read_write_block():
+    mem = create_memory(64)
+    write_block(mem, 8, [1, 2, 3])
+    assert list(read_block(mem, 7, 5)) == [0, 1, 2, 3, 0]
+    try:
+        write_block(mem, 63, [1, 2])
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("bloco fora da memoria deveria falhar")
+
+
+def test_imagem_mapeada_sem_alterar_arquivo():
+    mem = create_memory(128)
+    write_block(mem, 0, [0xDEADBEEF, 5])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "img.bin")
+        save_memory_image(mem, path)
+        mapped = map_memory_image(path, size=128)
+        assert isinstance(mapped, memoryview)
+        assert mapped[0] == 0xDEADBEEF and mapped[1] == 5
+        mapped[1] = 6  # copy-on-write: o arquivo continua com 5
+        assert map_memory_image(path, size=128)[1] == 5
+        # arquivo menor que a memória: leitura em bloco para um array
+        small = map_memory_image(path, size=256)
+        assert len(small) == 256 and small[0] == 0xDEADBEEF and small[200] == 0
+        del mapped
+
+
+def test_paged_memory_esparsa():
+    mem = PagedMemory(size=1 << 24)
+    assert len(mem) == 1 << 24
+    assert mem[5_000_000] == 0 and not mem.pages  # leitura não aloca
+    mem[5_000_000] = 42
+    assert mem[5_000_000] == 42
+    assert mem.allocated_pages() == [5_000_000 >> 12]
+    assert mem.clear_dirty() == {5_000_000 >> 12} and not mem.dirty
+    write_block(mem, 100, [7, 8])
+    assert list(read_block(mem, 99, 4)) == [0, 7, 8, 0]
+
+
+def test_cpu_salta_alem_de_64k():
+    # J 0x100000 (alvo de 26 bits) seguido de ADD r3 = r1 + r2 e HALT lá
+    for mode in ("pipeline", "functional", "translated"):
+        mem = PagedMemory(size=1 << 26)
+        mem[0] = encode_jump(28, 0x100000)
+        mem[0x100000] = encode_fields(1, 1, 2, 3)
+        mem[0x100003] = HALT_INSTRUCTION
+        cpu = CPU(mem)
+        cpu.registers[1] = 4
+        cpu.registers[2] = 5
+        cpu.run(max_cycles=100, mode=mode)
+        assert cpu.halted and cpu.registers[3] == 9, mode
+        assert len(mem.pages) == 2
+
+
+def test_varredura_so_das_paginas_alocadas():
+    add = encode_fields(1, 1, 2, 3)
+    bne = encode_fields(27, 3, 0, const16=0x10)
+    mem = PagedMemory(size=1 << 26)
+    assert allocated_ranges(mem) == []
+    # ADD + BNE na divisa das páginas 0 e 1 (vizinhas) e no início da página 256
+    mem[4095], mem[4096] = add, bne
+    mem[0x100000], mem[0x100001] = add, bne
+    assert allocated_ranges(mem) == [(0, 8192), (0x100000, 0x101000)]
+    assert allocated_ranges(mem, 100, 0x100001) == [(100, 8192), (0x100000, 0x100001)]
+    assert allocated_ranges(create_memory(64), 10) == [(10, 64)]
+
+    # predecode() e a fusão sem limites não percorrem os 2^26 endereços
+    cpu = CPU(mem)
+    cpu.predecode()
+    assert sorted(cpu.decode_cache) == [4095, 4096, 0x100000, 0x100001]
+    assert sorted(cpu.enable_fusion().sites) == [4095, 0x100000]
+
+
+if __name__ == "__main__":
+    test_create_memory_compacta()
+    test_read_write_block()
+    test_imagem_mapeada_sem_alterar_arquivo()
+    test_paged_memory_esparsa()
+    test_varredura_so_das_paginas_alocadas()
+    test_cpu_salta_alem_de_64k()
+    print("OK")
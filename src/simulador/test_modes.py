@@ -0,0 +1,180 @@
+# src/simulador/test_modes.py
+# Compara os modos de execução do CPU.run() em programas sem hazards.
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.testutil import DATA_ADDR, load_program, arch_state
+
+
+def padded(words, nops=2):
+    """Intercala NOPs para que o pipeline (sem forwarding) não tenha hazards."""
+    out = []
+    for w in words:
+        out.append(w)
+        out.extend([0] * nops)
+    return out
+
+
+# r3 = r1 + r2; r4 = r3 - r1; MEM[DATA_ADDR] = r4; r5 = MEM[DATA_ADDR]; desvios J/BEQ
+PROGRAM = padded([
+    encode_fields(1, 1, 2, 3),                     # 0:  ADD r3 = r1 + r2
+    encode_fields(2, 3, 1, 4),                     # 3:  SUB r4 = r3 - r1
+    encode_fields(23, 0, 4, const16=DATA_ADDR),    # 6:  SW  MEM[DATA_ADDR] = r4
+    encode_fields(22, 0, 0, 5, DATA_ADDR),         # 9:  LW  r5 = MEM[DATA_ADDR]
+    encode_jump(28, 18),                           # 12: J 18
+    encode_fields(1, 1, 1, 6),                     # 15: ADD r6 = r1 + r1   (pulada)
+    encode_fields(26, 0, 0, const16=24),           # 18: BEQ r0, r0 -> 24
+    encode_fields(1, 1, 1, 6),                     # 21: ADD r6 = r1 + r1   (pulada)
+    encode_fields(18, 5, 7, 9),                    # 24: LSL r9 = r5 << r7
+]) + [HALT_INSTRUCTION]
+
+
+# BEQ/BNE comparam ra e rb e desviam para os bits 15:0 (não para o campo de 26
+# bits do J, que inclui ra/rb). Palavras escritas à mão para fixar a codificação:
+#   0x6C430007 = 011011 00010 00011 0000000000000111: BNE r2, r3 -> 7
+#   0x68240010 = 011010 00001 00100 0000000000010000: BEQ r1, r4 -> 16
+#   0x68430018 = 011010 00010 00011 0000000000011000: BEQ r2, r3 -> 24
+# As 3 palavras depois de cada desvio são os delay slots do hazard "none".
+WRONG = encode_fields(1, 9, 9, 10)                 # ADD r10 = r9 + r9 (não executa)
+BRANCHES = [
+    0x6C430007, 0, 0, 0, WRONG, HALT_INSTRUCTION,  # 0:  r2 != r3: desvia para 7
+    0,
+    encode_fields(1, 9, 9, 12),                    # 7:  ADD r12 = r9 + r9
+    0x68240010, 0, 0, 0, WRONG, HALT_INSTRUCTION,  # 8:  r1 == r4: desvia para 16
+    0, 0,
+    0x68430018, 0, 0, 0,                           # 16: r2 != r3: não desvia
+    encode_fields(1, 9, 9, 11),                    # 20: ADD r11 = r9 + r9
+    HALT_INSTRUCTION, 0, 0,
+    WRONG, HALT_INSTRUCTION,                       # 24
+]
+BRANCH_REGISTERS = {1: 9, 2: 5, 3: 7, 4: 9, 9: 1}
+
+
+def make_cpu():
+    cpu = load_program(PROGRAM, registers={1: 10, 2: 20, 7: 1})
+    return cpu, cpu.memory
+
+
+def run_mode(mode):
+    cpu, mem = make_cpu()
+    cpu.run(max_cycles=10000, mode=mode)
+    return cpu, mem
+
+
+def test_pipeline_conclui_instrucoes_antes_do_halt():
+    cpu, mem = run_mode("pipeline")
+    assert cpu.halted and not cpu.any_pipeline_active()
+    assert cpu.registers[3] == 30
+    assert cpu.registers[5] == 20 and mem[DATA_ADDR] == 20
+    assert cpu.registers[6] == 0
+    assert cpu.registers[9] == 40
+
+
+def test_funcional_igual_ao_pipeline():
+    ref, _ = run_mode("pipeline")
+    cpu, _ = run_mode("functional")
+    assert arch_state(cpu) == arch_state(ref)
+
+
+def test_traduzido_igual_ao_funcional():
+    ref, _ = run_mode("functional")
+    cpu, _ = run_mode("translated")
+    assert arch_state(cpu) == arch_state(ref)
+    assert cpu.instret == ref.instret
+    assert cpu.translator.stats()["blocks_translated"] > 0
+
+
+def test_traduzido_sw_invalida_bloco():
+    # 5: ADD r3 += r1; 6: J 10; 10: SW MEM[6] = r4 (HALT); 11: J 5
+    # Na segunda passagem o bloco em 5 precisa ser retraduzido e termina no HALT.
+    mem = create_memory()
+    mem[5] = encode_fields(1, 3, 1, 3)
+    mem[6] = encode_jump(28, 10)
+    mem[10] = encode_fields(23, 0, 4, const16=6)
+    mem[11] = encode_jump(28, 5)
+    cpu = CPU(mem)
+    cpu.pc = 5
+    cpu.registers[1] = 7
+    cpu.registers[4] = HALT_INSTRUCTION
+    cpu.run(max_cycles=100, mode="translated")
+    assert cpu.halted
+    assert cpu.registers[3] == 14
+    assert cpu.translator.stats()["invalidations"] == 1
+
+
+def test_pipeline_sw_invalida_decodificacao():
+    # 0: ADD r3 += r1; 3: SW MEM[0] = r4 (HALT); 6: J 0 (NOPs nos slots)
+    # A segunda busca em 0 precisa ver o HALT, não o ADD decodificado antes.
+    for hazard in ("none", "full"):
+        mem = create_memory()
+        mem[0] = encode_fields(1, 3, 1, 3)
+        mem[3] = encode_fields(23, 0, 4, const16=0)
+        mem[6] = encode_jump(28, 0)
+        cpu = CPU(mem, hazard=hazard)
+        cpu.registers[1] = 7
+        cpu.registers[4] = HALT_INSTRUCTION
+        cpu.run(max_cycles=100)
+        assert cpu.halted and cpu.registers[3] == 7, hazard
+        assert cpu.decode_cache[0].ir == HALT_INSTRUCTION
+        # Todas as buscas foram faltas: a de 0 repetida também
+        assert cpu.decode_hits == 0 and cpu.decode_misses == len(range(8)) + 1
+
+
+def test_contadores_da_cache_de_decodificacao():
+    cpu, _ = make_cpu()
+    cpu.run(max_cycles=10000)
+    # Sem laços nem escritas em código: uma falta por endereço buscado
+    assert cpu.decode_misses == len(cpu.decode_cache)
+    assert cpu.decode_hits + cpu.decode_misses >= cpu.instret
+
+    # Pré-decodificado: só os NOPs (palavras nulas, puladas pelo predecode) faltam
+    cpu, mem = make_cpu()
+    cpu.predecode(0, len(PROGRAM))
+    cached = set(cpu.decode_cache)
+    cpu.run(max_cycles=10000)
+    missed = set(cpu.decode_cache) - cached
+    assert missed and all(mem[addr] == 0 for addr in missed)
+    # Os ADDs em 15 e 21 são pulados pelos desvios
+    assert cpu.decode_misses == len(missed) and cpu.decode_hits == len(cached) - 2
+
+
+def test_desvios_condicionais_com_alvo_de_16_bits():
+    assert BRANCHES[0] == encode_fields(27, 2, 3, const16=7)
+    assert BRANCHES[8] == encode_fields(26, 1, 4, const16=16)
+    for mode, kwargs in (("pipeline", {}), ("pipeline", {"hazard": "full"}),
+                         ("functional", {}), ("translated", {}), ("fusion", {})):
+        cpu = load_program(BRANCHES, registers=BRANCH_REGISTERS, **kwargs)
+        fusion = None
+        if mode == "fusion":
+            fusion = cpu.enable_fusion(0, len(BRANCHES))
+            mode = "functional"
+        cpu.run(max_cycles=1000, mode=mode)
+        if fusion is not None:
+            assert fusion.stats()["alu_branch"]["executed"] == 1
+        assert cpu.halted and cpu.stop_reason is None, (mode, kwargs)
+        assert cpu.registers[10] == 0, (mode, kwargs)
+        assert cpu.registers[11] == cpu.registers[12] == 2, (mode, kwargs)
+
+
+def test_max_cycles_e_modo_invalido():
+    cpu, _ = make_cpu()
+    assert cpu.run(max_cycles=5, mode="functional") == 5
+    assert not cpu.halted
+    try:
+        cpu.run(mode="turbo")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("modo invalido deveria falhar")
+
+
+if __name__ == "__main__":
+    test_pipeline_conclui_instrucoes_antes_do_halt()
+    test_funcional_igual_ao_pipeline()
+    test_traduzido_igual_ao_funcional()
+    test_traduzido_sw_invalida_bloco()
+    test_pipeline_sw_invalida_decodificacao()
+    test_contadores_da_cache_de_decodificacao()
+    test_desvios_condicionais_com_alvo_de_16_bits()
+    test_max_cycles_e_modo_invalido()
+    print("OK")
@@ -0,0 +1,91 @@
+# src/simulador/test_predictor.py
+# Preditores de desvio no pipeline com unidade de hazards.
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.predictor import BTB, TwoBitPredictor, make_predictor
+from src.simulador.instruction import encode_fields, encode_jump
+from src.simulador.testutil import load_program
+
+# Laço de 10 iterações com chamada de sub-rotina (JAL/JR) no corpo
+LOOP_PC = 1
+PROGRAM = [
+    encode_fields(1, 0, 0, 3),                 # 0: ADD r3 = 0
+    encode_jump(24, 6),                        # 1: JAL 6
+    encode_fields(2, 8, 7, 8),                 # 2: SUB r8 = r8 - r7
+    encode_fields(27, 0, 8, const16=LOOP_PC),  # 3: BNE r0, r8 -> 1
+    HALT_INSTRUCTION,                          # 4: HALT
+    0,                                         # 5
+    encode_fields(1, 3, 7, 3),                 # 6: ADD r3 = r3 + r7
+    encode_fields(25, 31),                     # 7: JR r31
+]
+
+
+def run(predictor, hazard="full"):
+    cpu = load_program(PROGRAM, registers={7: 1, 8: 10}, hazard=hazard, predictor=predictor)
+    cpu.run(max_cycles=10000)
+    assert cpu.halted and cpu.registers[3] == 10 and cpu.registers[8] == 0
+    return cpu
+
+
+def test_estatico_nao_tomado_erra_todos_os_desvios_tomados():
+    cpu = run(None)
+    st = cpu.predictor.stats()
+    # 10 JAL + 10 JR + 9 BNE tomados; a última saída do laço acerta
+    assert st["branches"] == 30 and st["mispredicts"] == 29
+    assert cpu.hazard_stats()["branch_penalty"] == cpu.flushes == 29
+
+
+def test_preditores_dinamicos_melhoram_cpi():
+    stats = {}
+    for name in ("not_taken", "btfnt", "1bit", "2bit"):
+        cpu = run(name)
+        stats[name] = cpu.hazard_stats()
+        assert stats[name]["mispredicts"] == cpu.predictor.stats()["mispredicts"]
+    # btfnt acerta o BNE (para trás) e os J/JAL; só o JR (alvo em registrador) erra
+    assert stats["btfnt"]["mispredicts"] == 11
+    assert stats["2bit"]["mispredicts"] < stats["not_taken"]["mispredicts"]
+    assert stats["btfnt"]["cpi"] < stats["not_taken"]["cpi"]
+    per_pc = run("btfnt").predictor.stats()["per_pc"]
+    assert per_pc[LOOP_PC]["mispredicts"] == 0
+    assert per_pc[3]["executed"] == 10 and per_pc[3]["taken"] == 9
+
+
+def test_btb_preve_o_alvo_do_jr():
+    cpu = run(make_predictor("2bit", btb_entries=16))
+    st = cpu.predictor.stats()
+    # Com BTB o JR acerta a partir da segunda chamada
+    assert st["per_pc"][7]["mispredicts"] == 1
+    assert st["btb_hits"] > 0
+    assert st["mispredicts"] < run("2bit").predictor.stats()["mispredicts"]
+
+
+def test_contador_de_2_bits_satura():
+    p = TwoBitPredictor(entries=4, initial=0)
+    for _ in range(5):
+        p.train(2, True)
+    assert p.table[2] == 3
+    p.train(2, False)
+    assert p.table[2] == 2
+    btb = BTB(4)
+    btb.insert(5, 40)
+    assert btb.lookup(5) == 40 and btb.lookup(1) is None
+
+
+def test_configuracao_invalida():
+    for kwargs in ({"hazard": "none", "predictor": "2bit"},
+                   {"hazard": "full", "predictor": "oraculo"}):
+        try:
+            CPU(create_memory(), **kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"configuracao invalida deveria falhar: {kwargs}")
+
+
+if __name__ == "__main__":
+    test_estatico_nao_tomado_erra_todos_os_desvios_tomados()
+    test_preditores_dinamicos_melhoram_cpi()
+    test_btb_preve_o_alvo_do_jr()
+    test_contador_de_2_bits_satura()
+    test_configuracao_invalida()
+    print("OK")
@@ -0,0 +1,107 @@
+# src/simulador/test_profiler.py
+# Profiler por PC e por opcode.
+from src.simulador.cache import Cache
+from src.simulador.cpu import HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields
+from src.simulador.memory import PagedMemory
+from src.simulador.profiler import PAGE_SIZE
+from src.simulador.testutil import load_program
+
+DATA_ADDR = (4 << 11) | 100
+
+# Laço de 5 iterações: LW seguido de uso (load-use) e BNE de volta
+LOOP_PC = 1
+PROGRAM = [
+    encode_fields(1, 0, 0, 3),                 # 0: ADD r3 = 0
+    encode_fields(22, 0, 0, 4, DATA_ADDR),     # 1: LW  r4 = MEM[DATA_ADDR]
+    encode_fields(1, 3, 4, 3),                 # 2: ADD r3 = r3 + r4
+    encode_fields(2, 8, 7, 8),                 # 3: SUB r8 = r8 - r7
+    encode_fields(27, 0, 8, const16=LOOP_PC),  # 4: BNE r0, r8 -> 1
+    HALT_INSTRUCTION,                          # 5: HALT
+]
+
+
+def make_cpu(**kwargs):
+    cpu = load_program(PROGRAM, registers={7: 1, 8: 5}, **kwargs)
+    cpu.memory[DATA_ADDR] = 2
+    return cpu
+
+
+def test_contadores_batem_com_as_estatisticas_do_pipeline():
+    cpu = make_cpu(hazard="full", predictor="not_taken",
+                   icache=Cache(size=16, line_size=2, assoc=1, miss_penalty=3),
+                   dcache=Cache(size=16, line_size=2, assoc=1, miss_penalty=4))
+    prof = cpu.enable_profiling()
+    cpu.run(max_cycles=1000)
+    assert cpu.halted and cpu.registers[3] == 10
+    st = cpu.hazard_stats()
+    assert sum(prof.pc["executed"]) == cpu.instret
+    assert prof.pc["executed"][LOOP_PC] == 5 and prof.pc["executed"][0] == 1
+    # Todo travamento load-use cai no ADD que usa o LW
+    assert prof.pc["stalls"][2] == st["stalls"] > 0
+    assert prof.pc["branch_penalty"][4] == st["branch_penalty"] == 4
+    assert prof.pc["dcache_misses"][LOOP_PC] == 1
+    assert sum(prof.pc["cache_stalls"]) == st["icache_stalls"] + st["dcache_stalls"]
+    assert sum(prof.pc["icache_misses"]) == st["icache"]["misses"]
+    assert prof.opcode["executed"][22] == 5
+
+
+def test_relatorio_e_exportacao():
+    cpu = make_cpu(hazard="stall")
+    prof = cpu.enable_profiling()
+    cpu.run(max_cycles=1000)
+    hot = prof.hotspots(top=3)
+    assert hot[0]["cycles"] >= hot[1]["cycles"] >= hot[2]["cycles"]
+    report = prof.report(top=5)
+    assert "bne" in report and "lw" in report
+    folded = prof.folded()
+    assert "lw;pc_0001;executed 5" in folded
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+
+
+def test_modo_funcional_e_desligar():
+    cpu = make_cpu()
+    prof = cpu.enable_profiling()
+    cpu.run(max_cycles=1000, mode="functional")
+    assert sum(prof.pc["executed"]) == cpu.instret
+    assert prof.pc["executed"][4] == 5
+    assert cpu.disable_profiling() is prof
+    # Desligado, WB/step voltam a ser os métodos da classe
+    assert "WB" not in cpu.__dict__ and cpu.profiler is None
+    hz = make_cpu(hazard="full")
+    step = hz.step
+    hz.enable_profiling()
+    hz.disable_profiling()
+    assert hz.step == step
+    try:
+        cpu.enable_profiling()
+        cpu.run(mode="translated")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("profiling no modo translated deveria falhar")
+
+
+def test_pc_alto_aloca_so_a_pagina_usada():
+    # Código no fim de um espaço de 2^26 palavras: os contadores não crescem até lá
+    high = (1 << 26) - 4
+    mem = PagedMemory()
+    mem[high] = encode_fields(1, 1, 2, 3)
+    mem[high + 1] = HALT_INSTRUCTION
+    for mode in ("functional", "pipeline"):
+        cpu = load_program([], memory=mem, registers={1: 2, 2: 3})
+        cpu.pc = high
+        prof = cpu.enable_profiling()
+        cpu.run(max_cycles=100, mode=mode)
+        assert cpu.halted and cpu.registers[3] == 5, mode
+        assert prof.pc["executed"][high] == 1 and prof.pc["executed"][0] == 0, mode
+        assert list(prof.pc["executed"].pages) == [high // PAGE_SIZE], mode
+        assert prof.hotspots()[0]["pc"] == high and prof.hotspots()[0]["opcode"] == "add", mode
+
+
+if __name__ == "__main__":
+    test_contadores_batem_com_as_estatisticas_do_pipeline()
+    test_relatorio_e_exportacao()
+    test_modo_funcional_e_desligar()
+    test_pc_alto_aloca_so_a_pagina_usada()
+    print("OK")
@@ -0,0 +1,65 @@
+# src/simulador/test_regression.py
+# Executor de regressão: execução em processos, orçamento de ciclos e golden.
+import os
+import tempfile
+import time
+from src.simulador.regression import KILL_GRACE, make_job, run_regression, golden_from_summary
+from src.simulador.instruction import encode_fields, encode_jump
+
+
+def write_program(path, words):
+    with open(path, "w") as f:
+        for w in words:
+            f.write(f"{w:032b}\n")
+
+
+def test_regressao_paralela_com_golden():
+    add = encode_fields(1, 1, 2, 3)
+    loop = encode_jump(28, 0)  # J 0: nunca termina
+    with tempfile.TemporaryDirectory() as tmp:
+        ok, forever, bad = (os.path.join(tmp, n) for n in ("ok.txt", "loop.txt", "bad.txt"))
+        write_program(ok, [add, 0xFFFFFFFF])
+        write_program(forever, [loop, 0])
+        with open(bad, "w") as f:
+            f.write("0101\n")
+        jobs = [make_job(ok, registers={1: 4, 2: 5}, mode="pipeline"),
+                make_job(forever, max_cycles=500),
+                make_job(bad),
+                make_job(forever),
+                make_job(forever, max_cycles=20000, detect_loops=False)]
+        summary = run_regression(jobs, processes=2)
+        statuses = [r["status"] for r in summary["results"]]
+        assert statuses == ["ok", "budget", "error", "loop", "budget"]
+        assert summary["results"][3]["cycles"] < 20000
+        assert summary["results"][0]["registers"][3] == 9
+        assert summary["errors"] == 1 and summary["unchecked"] == 4
+
+        golden = golden_from_summary(summary)
+        again = run_regression(jobs[:2], processes=1, golden=golden)
+        assert again["passed"] == 2 and again["failed"] == 0
+        golden[ok]["registers"] = {"3": 10}
+        assert run_regression(jobs[:1], golden=golden)["failed"] == 1
+
+
+def test_worker_travado_e_terminado_no_tempo_limite():
+    if not hasattr(os, "mkfifo"):
+        return
+    add = encode_fields(1, 1, 2, 3)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Abrir um FIFO sem escritor bloqueia o worker antes do primeiro ciclo:
+        # só o processo principal consegue impor o tempo limite
+        stuck, ok = os.path.join(tmp, "stuck.txt"), os.path.join(tmp, "ok.txt")
+        os.mkfifo(stuck)
+        write_program(ok, [add, 0xFFFFFFFF])
+        start = time.monotonic()
+        summary = run_regression([make_job(stuck, timeout=0.2), make_job(ok)], processes=2)
+        assert time.monotonic() - start < 0.2 + KILL_GRACE + 5
+        hung, done = summary["results"]
+        assert hung["status"] == "timeout" and hung["killed"] and "registers" not in hung
+        assert done["status"] == "ok" and done["halted"]
+
+
+if __name__ == "__main__":
+    test_regressao_paralela_com_golden()
+    test_worker_travado_e_terminado_no_tempo_limite()
+    print("OK")
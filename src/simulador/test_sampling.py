@@ -0,0 +1,75 @@
+# src/simulador/test_sampling.py
+# Fast-forward no modo rápido, troca para o pipeline e simulação por amostragem.
+from src.simulador.cpu import HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields
+from src.simulador.sampling import fast_forward, detailed, run_sampled
+from src.simulador.trace import TraceRecorder
+from src.simulador.testutil import (
+    DATA_ADDR, ITERATIONS, TOTAL, load_program, make_loop_cpu as make_cpu,
+)
+
+
+def test_fast_forward_e_janela_detalhada():
+    cpu = make_cpu()
+    assert fast_forward(cpu, 600 * 6 + 3) == 600 * 6 + 3
+    assert cpu.pc == 3 and cpu.registers[8] == ITERATIONS - 600
+    cycles, instructions = detailed(cpu, 60)
+    assert instructions == 60 and cycles > 60
+    # Volta ao modo rápido no meio do laço: o pipeline é esvaziado antes
+    fast_forward(cpu, mode="functional")
+    assert cpu.halted and cpu.instret == TOTAL
+    assert cpu.registers[3] == cpu.memory[DATA_ADDR] == ITERATIONS * (ITERATIONS + 1) // 2
+
+
+def test_fast_forward_ate_o_marcador():
+    cpu = make_cpu()
+    fast_forward(cpu, until_pc=4, mode="functional")
+    assert cpu.pc == 4 and cpu.instret == 4
+    # Próxima ocorrência do marcador: uma iteração inteira depois
+    fast_forward(cpu, until_pc=4, mode="functional")
+    assert cpu.pc == 4 and cpu.instret == 10
+    try:
+        fast_forward(cpu, until_pc=4, mode="translated")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("until_pc no modo translated deveria falhar")
+
+
+def test_trace_depois_do_fast_forward():
+    # 6 ADDs r(i+1) = r1 + r1: os 2 primeiros no modo rápido, o resto no pipeline
+    words = [encode_fields(1, 1, 1, i + 2) for i in range(6)] + [HALT_INSTRUCTION]
+    cpu = load_program(words, registers={1: 3}, hazard="full")
+    rec = cpu.enable_tracing(TraceRecorder(capacity=64))
+    fast_forward(cpu, 2, mode="functional")
+    cpu.run()
+    writes = [(r.wb_pc, r.wb_reg, r.wb_value) for r in rec.records() if r.wb_reg]
+    assert writes == [(pc, pc + 2, 6) for pc in range(2, 6)]
+
+
+def test_amostragem_estima_os_ciclos_da_simulacao_completa():
+    for hazard in ("stall", "full"):
+        ref = make_cpu(hazard)
+        ref.run()
+        assert ref.instret == TOTAL
+
+        cpu = make_cpu(hazard)
+        res = run_sampled(cpu, period=1500, warmup=60, window=120)
+        assert cpu.halted and list(cpu.registers) == list(ref.registers)
+        assert res["instructions"] == TOTAL
+        assert len(res["samples"]) == 8
+        assert res["detailed_cycles"] < ref.cycle / 4
+        assert abs(res["estimated_cycles"] - ref.cycle) / ref.cycle < 0.05
+
+    cpu = make_cpu(caches=False)
+    res = run_sampled(cpu, points=[100, 5000], warmup=30, window=60, mode="functional")
+    assert [s["start"] for s in res["samples"]] == [130, 5030]
+    assert all(s["instructions"] == 60 for s in res["samples"])
+
+
+if __name__ == "__main__":
+    test_fast_forward_e_janela_detalhada()
+    test_fast_forward_ate_o_marcador()
+    test_trace_depois_do_fast_forward()
+    test_amostragem_estima_os_ciclos_da_simulacao_completa()
+    print("OK")
@@ -0,0 +1,98 @@
+# src/simulador/test_stream.py
+# run_for()/run_until() e o gerador de Snapshots (intervalos e eventos).
+from src.simulador.testutil import DATA_ADDR, ITERATIONS, TOTAL, make_loop_cpu as make_cpu
+
+
+def test_run_for_em_fatias():
+    plain = make_cpu()
+    plain.run()
+    cpu = make_cpu()
+    total = 0
+    while not cpu.halted:
+        n = cpu.run_for(1000)
+        assert n == 1000 or cpu.halted
+        total += n
+    assert total == plain.cycle == cpu.cycle
+    assert list(cpu.registers) == list(plain.registers)
+
+
+def test_run_until():
+    for mode in ("functional", "translated", "pipeline"):
+        cpu = make_cpu()
+        cpu.run_until(pc=4, mode=mode)
+        if mode == "pipeline":
+            # Parou com a instrução em 4 no ID_EX: ainda não foi concluída
+            assert cpu.ID_EX.pc == 4 and cpu.instret <= 4
+            cycle = cpu.cycle
+            cpu.run_until(pc=4, mode=mode)
+            assert cpu.ID_EX.pc == 4 and cpu.cycle > cycle
+        else:
+            assert cpu.pc == 4 and cpu.instret == 4
+            # Próxima ocorrência: uma iteração depois
+            cpu.run_until(pc=4, mode=mode)
+            assert cpu.pc == 4 and cpu.instret == 10
+
+    cpu = make_cpu()
+    cpu.run_until(predicate=lambda c: c.registers[8] == ITERATIONS - 3, mode="functional")
+    assert cpu.registers[8] == ITERATIONS - 3 and cpu.pc == 5
+    assert cpu.run_until(pc=99, max_cycles=50, mode="pipeline") == 50
+
+
+def test_snapshots_por_intervalo():
+    cpu = make_cpu(caches=False)
+    snaps = list(cpu.stream(every=1000, mode="functional"))
+    assert [s.reason for s in snaps] == ["interval"] * (TOTAL // 1000) + ["halt"]
+    assert [s.elapsed for s in snaps[:-1]] == list(range(1000, TOTAL, 1000))
+    assert snaps[-1].halted and snaps[-1].instret == TOTAL
+    assert snaps[-1].registers == tuple(cpu.registers)
+
+
+def test_eventos_iguais_nos_modos():
+    results = []
+    for mode in ("functional", "translated", "pipeline"):
+        cpu = make_cpu()
+        events = [(s.reason, s.where, s.value, s.source_pc)
+                  for s in cpu.stream(every=10 ** 9, mode=mode, max_cycles=200,
+                                      registers=[3], stores=(DATA_ADDR, DATA_ADDR + 1))]
+        assert "WB" not in cpu.__dict__ and "MEM" not in cpu.__dict__
+        results.append(events)
+    functional, translated, pipeline = results
+    assert functional == translated
+    # O pipeline executou menos instruções em 200 ciclos: mesmo começo
+    assert pipeline == functional[:len(pipeline)] and len(pipeline) >= 10
+    assert functional[:2] == [("write", 3, ITERATIONS, 0), ("store", DATA_ADDR, ITERATIONS, 1)]
+
+    # Fechar o gerador antes do fim remove a instrumentação
+    cpu = make_cpu()
+    gen = cpu.stream(mode="pipeline", registers=[6])
+    snap = next(gen)
+    assert snap.reason == "write" and snap.where == 6 and snap.value == 2 * ITERATIONS
+    gen.close()
+    assert "WB" not in cpu.__dict__
+
+
+def test_evento_no_ciclo_exato_do_wb():
+    # A fatia roda inteira no laço interno e para no ciclo do evento
+    ref = make_cpu()
+    cycles, values = [], []
+    while len(cycles) < 3:
+        before = ref.registers[6]
+        ref.run(1)
+        if ref.registers[6] != before:
+            cycles.append(ref.cycle)
+            values.append(ref.registers[6])
+    cpu = make_cpu()
+    snaps = cpu.stream(every=10 ** 9, registers=[6])
+    got = [next(snaps) for _ in range(3)]
+    snaps.close()
+    assert [s.cycle for s in got] == [s.elapsed for s in got] == cycles
+    assert [s.value for s in got] == values
+
+
+if __name__ == "__main__":
+    test_run_for_em_fatias()
+    test_run_until()
+    test_snapshots_por_intervalo()
+    test_eventos_iguais_nos_modos()
+    test_evento_no_ciclo_exato_do_wb()
+    print("OK")
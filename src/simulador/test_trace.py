@@ -0,0 +1,111 @@
+# src/simulador/test_trace.py
+# Trace binário do pipeline: gravação em blocos, leitura por ciclo e diagrama.
+import os
+import tempfile
+
+from src.simulador.cpu import HALT_INSTRUCTION
+from src.simulador.instruction import encode_fields
+from src.simulador.trace import (
+    TraceRecorder, TraceReader, format_diagram, MEM_LOAD, MEM_STORE,
+)
+from src.simulador.testutil import DATA_ADDR, load_program
+
+# Laço de 20 iterações: SW do contador e LW de volta, com NOPs (modo "none")
+PROGRAM = [
+    encode_fields(2, 8, 7, 8), 0, 0,                   # 0: SUB r8 = r8 - r7
+    encode_fields(23, 0, 8, const16=DATA_ADDR), 0, 0,  # 3: SW  MEM[DATA_ADDR] = r8
+    encode_fields(22, 0, 0, 5, DATA_ADDR), 0, 0,       # 6: LW  r5 = MEM[DATA_ADDR]
+    encode_fields(27, 0, 8, const16=0), 0,             # 9: BNE r0, r8 -> 0 (delay slot em 10)
+    HALT_INSTRUCTION,                                  # 11: HALT
+]
+
+
+def make_cpu(hazard="none"):
+    return load_program(PROGRAM, registers={7: 1, 8: 20}, hazard=hazard)
+
+
+def test_arquivo_em_blocos_comprimidos():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.trace")
+        cpu = make_cpu()
+        with TraceRecorder(path, capacity=64, compress=True) as rec:
+            cpu.enable_tracing(rec)
+            cpu.run(max_cycles=10000)
+            cpu.disable_tracing()
+        assert cpu.halted and cpu.registers[5] == 0
+        with TraceReader(path) as reader:
+            assert len(reader) == cpu.cycle
+            assert len(reader.index) > 3
+            records = list(reader.records())
+            assert [r.cycle for r in records] == list(range(1, cpu.cycle + 1))
+            # Acesso direto a um ciclo no meio do arquivo
+            mid = records[len(records) // 2]
+            assert reader.seek(mid.cycle) == mid
+            # Cada LW/SW aparece no MEM com o valor lido/escrito
+            stores = [r for r in records if r.mem_kind == MEM_STORE]
+            loads = [r for r in records if r.mem_kind == MEM_LOAD]
+            assert len(stores) == len(loads) == 20
+            assert all(r.mem_addr == DATA_ADDR for r in stores + loads)
+            assert [r.mem_value for r in loads] == list(range(19, -1, -1))
+            # Instrução no WB um ciclo depois de passar pelo MEM
+            first = loads[0]
+            nxt = reader.seek(first.cycle + 1)
+            assert nxt.wb_pc == first.mem_pc == 6 and nxt.wb_reg == 5 and nxt.wb_value == 19
+            try:
+                reader.seek(cpu.cycle + 1)
+            except KeyError:
+                pass
+            else:
+                raise AssertionError("ciclo fora do trace deveria falhar")
+
+
+def test_seek_depois_do_restore():
+    ref = make_cpu()
+    expected = ref.enable_tracing(TraceRecorder(capacity=4096))
+    ref.run(max_cycles=10000)
+    expected = {r.cycle: r for r in expected.records()}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.trace")
+        cpu = make_cpu()
+        with TraceRecorder(path, capacity=4096) as rec:
+            cpu.enable_tracing(rec)
+            cpu.run_for(30)
+            cp = cpu.checkpoint()
+            cpu.run_for(20)
+            cpu.restore(cp)   # ciclos 31..50 são gravados de novo
+            cpu.run(max_cycles=10000)
+            cpu.disable_tracing()
+        assert cpu.cycle == ref.cycle
+        with TraceReader(path) as reader:
+            assert len(reader) == cpu.cycle + 20 and len(reader.index) == 2
+            assert all(reader.seek(c) == expected[c] for c in range(1, cpu.cycle + 1))
+            cycles = [r.cycle for r in reader.records(25, 35)]
+            assert cycles == list(range(25, 35)) + list(range(31, 35))
+
+
+def test_buffer_circular_em_memoria_e_diagrama():
+    cpu = make_cpu(hazard="full")
+    rec = cpu.enable_tracing(TraceRecorder(capacity=16))
+    cpu.run(max_cycles=10000)
+    records = list(rec.records())
+    assert len(records) == 16
+    assert records[-1].cycle == cpu.cycle
+    assert records[-1].wb_ir == HALT_INSTRUCTION
+    assert records[0].cycle == cpu.cycle - 15
+    text = format_diagram(records)
+    assert len(text.splitlines()) == 17 and "--" in text
+
+
+def test_desligado_nao_altera_o_wb():
+    cpu = make_cpu()
+    cpu.enable_tracing(TraceRecorder(capacity=4))
+    cpu.disable_tracing()
+    assert "WB" not in cpu.__dict__ and cpu.tracer is None
+
+
+if __name__ == "__main__":
+    test_arquivo_em_blocos_comprimidos()
+    test_seek_depois_do_restore()
+    test_buffer_circular_em_memoria_e_diagrama()
+    test_desligado_nao_altera_o_wb()
+    print("OK")
@@ -0,0 +1,54 @@
+# src/simulador/testutil.py
+# Auxiliares comuns dos testes (test_*.py) e do bench.py: carga de programas,
+# estado arquitetural e o laço usado pelos testes de amostragem/stream/debugger.
+# As instruções são montadas com instruction.encode_fields/encode_jump.
+from src.simulador.memory import create_memory
+from src.simulador.cpu import CPU, HALT_INSTRUCTION
+from src.simulador.cache import Cache
+from src.simulador.instruction import encode_fields
+
+# Endereço de dados dos programas. Em LW/SW a constante de 16 bits inclui os
+# bits de rc (15:11): o LW com const16=DATA_ADDR sempre escreve em r5.
+DATA_ADDR = (5 << 11) | 200
+
+
+def load_program(words, memory=None, registers=None, **kwargs):
+    """CPU com words a partir do endereço 0 e registradores iniciais {índice: valor}.
+    kwargs vão para o construtor da CPU (hazard, predictor, icache, dcache)."""
+    mem = create_memory() if memory is None else memory
+    for i, w in enumerate(words):
+        mem[i] = w
+    cpu = CPU(mem, **kwargs)
+    for idx, value in (registers or {}).items():
+        cpu.registers[idx] = value
+    return cpu
+
+
+def arch_state(cpu, end=DATA_ADDR + 1):
+    """Registradores, flags, halted e memória [0, end): o que os modos devem concordar."""
+    return (list(cpu.registers), cpu.flag_neg, cpu.flag_zero, cpu.flag_carry,
+            cpu.flag_overflow, cpu.halted, list(cpu.memory[:end]))
+
+
+# Laço com load-use e desvio: 6 instruções por iteração
+ITERATIONS = 2000
+LOOP_PC = 0
+LOOP_PROGRAM = [
+    encode_fields(1, 3, 8, 3),                     # 0: ADD r3 = r3 + r8
+    encode_fields(23, 0, 3, const16=DATA_ADDR),    # 1: SW  MEM[DATA_ADDR] = r3
+    encode_fields(22, 0, 0, 5, DATA_ADDR),         # 2: LW  r5 = MEM[DATA_ADDR]
+    encode_fields(1, 5, 5, 6),                     # 3: ADD r6 = r5 + r5 (load-use)
+    encode_fields(2, 8, 7, 8),                     # 4: SUB r8 = r8 - r7
+    encode_fields(27, 0, 8, const16=LOOP_PC),      # 5: BNE r0, r8 -> 0
+    HALT_INSTRUCTION,                              # 6: HALT
+]
+TOTAL = 6 * ITERATIONS + 1
+
+
+def make_loop_cpu(hazard="full", caches=True):
+    """CPU com LOOP_PROGRAM, preditor de 2 bits e (opcionalmente) caches pequenas."""
+    kwargs = {}
+    if caches:
+        kwargs = {"icache": Cache(size=16, line_size=2), "dcache": Cache(size=16, line_size=2)}
+    return load_program(LOOP_PROGRAM, registers={7: 1, 8: ITERATIONS},
+                        hazard=hazard, predictor="2bit", **kwargs)
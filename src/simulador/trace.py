@@ -0,0 +1,358 @@
+# src/simulador/trace.py
+# Trace binário do pipeline (CPU.enable_tracing()) e leitor offline.
+#
+# Um registro de tamanho fixo por ciclo, com o que cada estágio processa no
+# ciclo: PC e IR de IF_ID/ID_EX/EX_MEM/MEM_WB, PC de busca, registrador/valor
+# escritos no WB e o acesso à memória feito no MEM. Para gastar pouco por ciclo,
+# os campos são copiados crus dos latches (inclusive de bolhas) junto com os bits
+# valid; decode_record() os aplica na leitura (PC -1 = bolha).
+#
+# Os registros vão para um buffer circular pré-alocado. Com path, cada vez que o
+# buffer enche ele é gravado no arquivo como um bloco (opcionalmente zlib); sem
+# path, o buffer guarda só os últimos `capacity` ciclos.
+#
+# Arquivo: cabeçalho | blocos (cabeçalho do bloco + dados) | índice | rodapé.
+# O índice (primeiro ciclo, offset e contagem de cada bloco) permite ir direto
+# a um ciclo lendo e descomprimindo um único bloco: cada bloco cobre ciclos
+# consecutivos. Um ciclo que não segue o anterior (cpu.restore(), fast-forward)
+# fecha o bloco atual e começa outro; depois de voltar no tempo o mesmo ciclo
+# pode estar em mais de um bloco, e seek() devolve o gravado por último.
+import bisect
+import sys
+import struct
+import zlib
+from collections import namedtuple
+
+from src.simulador.execute import LOAD, STORE
+
+MAGIC = b"URTR"
+VERSION = 1
+
+# cycle, pc de busca, valid de IF_ID/ID_EX/EX_MEM/MEM_WB, busca parada (HALT
+# buscado ou desvio para fora da memória; dois bits), WB com resultado,
+# pc x4, ir x4, reg do WB, valor do WB, classe da instrução no MEM, endereço,
+# valor lido/escrito
+RECORD = struct.Struct("<Qq7?4I4IBIBqI")
+RECORD_SIZE = RECORD.size
+HEADER = struct.Struct("<4sBBHI")       # magic, versão, comprimido, tamanho do registro, capacidade
+CHUNK = struct.Struct("<QII")           # primeiro ciclo, registros, bytes gravados
+INDEX_ENTRY = struct.Struct("<QQI")     # primeiro ciclo, offset do bloco, registros
+FOOTER = struct.Struct("<QI4s")         # offset do índice, blocos, magic
+
+MEM_NONE = 0
+MEM_LOAD = 1
+MEM_STORE = 2
+
+TraceRecord = namedtuple("TraceRecord", (
+    "cycle", "if_pc", "id_pc", "ex_pc", "mem_pc", "wb_pc",
+    "id_ir", "ex_ir", "mem_ir", "wb_ir",
+    "wb_reg", "wb_value", "mem_kind", "mem_addr", "mem_value",
+))
+
+
+def decode_record(raw):
+    """Converte a tupla crua do struct em TraceRecord (bolhas -> PC -1)."""
+    (cycle, if_pc, v_id, v_ex, v_mem, v_wb, fetch_stop, halt_pending, write,
+     id_pc, ex_pc, mem_pc, wb_pc, id_ir, ex_ir, mem_ir, wb_ir,
+     wb_reg, wb_value, kind, addr, value) = raw
+    if not v_id:
+        id_pc, id_ir = -1, 0
+    if not v_ex:
+        ex_pc, ex_ir = -1, 0
+    mem_kind = MEM_NONE
+    if v_mem:
+        if kind == LOAD:
+            mem_kind = MEM_LOAD
+        elif kind == STORE:
+            mem_kind = MEM_STORE
+    else:
+        mem_pc, mem_ir = -1, 0
+    if mem_kind == MEM_NONE:
+        addr, value = -1, 0
+    if not v_wb:
+        wb_pc, wb_ir = -1, 0
+    if not (v_wb and write):
+        wb_reg, wb_value = 0, 0
+    if fetch_stop or halt_pending:
+        if_pc = -1
+    return TraceRecord(cycle, if_pc, id_pc, ex_pc, mem_pc, wb_pc, id_ir, ex_ir, mem_ir,
+                       wb_ir, wb_reg, wb_value, mem_kind, addr, value)
+
+
+class TraceRecorder:
+    """Grava registros do pipeline em um buffer circular (e, com path, em disco)."""
+
+    def __init__(self, path=None, capacity=65536, compress=False, level=1):
+        if capacity <= 0:
+            raise ValueError(f"Capacidade do trace precisa ser positiva: {capacity}")
+        self.path = path
+        self.capacity = capacity
+        self.compress = compress
+        self.level = level
+        self.buffer = bytearray(capacity * RECORD_SIZE)
+        self._slot = 0         # próxima posição livre do buffer (ver slot)
+        self._slot_cell = None
+        self.wrapped = False   # modo só em memória: o buffer já deu a volta
+        self.total = 0         # registros gravados em disco (blocos completos)
+        self.index = []        # (primeiro ciclo, offset, registros) dos blocos em disco
+        self._file = None
+        if path is not None:
+            self._file = open(path, "wb")
+            self._file.write(HEADER.pack(MAGIC, VERSION, 1 if compress else 0,
+                                         RECORD_SIZE, capacity))
+
+    @property
+    def slot(self):
+        if self._slot_cell is not None:
+            return self._slot_cell[0]()
+        return self._slot
+
+    @slot.setter
+    def slot(self, value):
+        if self._slot_cell is not None:
+            self._slot_cell[1](value)
+        self._slot = value
+
+    def hook(self, cpu, wb):
+        """Função chamada no lugar de cpu.WB: registra o ciclo e chama wb().
+
+        Latches, buffer, pack e a posição no buffer ficam em variáveis locais da
+        closure para que o custo por ciclo seja só a cópia dos campos. Um
+        recorder atende uma CPU por vez.
+        """
+        id_ex, ex_mem, mem_wb = cpu.ID_EX, cpu.EX_MEM, cpu.MEM_WB
+        memory = cpu.memory
+        mem_size = cpu.mem_size
+        buf = self.buffer
+        pack = RECORD.pack_into
+        cap = self.capacity
+        size = RECORD_SIZE
+        load = LOAD
+        slot = self._slot
+        to_disk = self._file is not None
+        # Ciclo do último registro no buffer (um bloco só tem ciclos consecutivos)
+        last = RECORD.unpack_from(buf, (slot - 1) * size)[0] if slot else -1
+
+        def traced_wb():
+            nonlocal slot, last
+            cycle = cpu.cycle
+            if slot == cap:
+                self._buffer_full()  # zera slot via set_slot
+            elif to_disk and slot and cycle != last + 1:
+                self.flush()
+            last = cycle
+            a = cpu.IF_ID
+            res = mem_wb.exec_result
+            kind = ex_mem.kind
+            addr = ex_mem.address
+            if kind == load and 0 <= addr < mem_size:
+                value = memory[addr]
+            else:
+                value = ex_mem.store_value
+            pack(buf, slot * size, cycle, cpu.pc,
+                 a.valid, id_ex.valid, ex_mem.valid, mem_wb.valid,
+                 cpu.fetch_stop, cpu.halt_pending, res is not None,
+                 a.pc, id_ex.pc, ex_mem.pc, mem_wb.pc,
+                 a.ir, id_ex.ir, ex_mem.ir, mem_wb.ir,
+                 mem_wb.exec_rc, res or 0, kind or 0, addr, value)
+            slot += 1
+            wb()
+
+        def get_slot():
+            return slot
+
+        def set_slot(value):
+            nonlocal slot
+            slot = value
+
+        self._slot_cell = (get_slot, set_slot)
+        return traced_wb
+
+    def unhook(self):
+        """Desfaz hook(): a posição no buffer volta a ficar no recorder."""
+        if self._slot_cell is not None:
+            self._slot = self._slot_cell[0]()
+            self._slot_cell = None
+
+    def _buffer_full(self):
+        if self._file is not None:
+            self.flush()
+        else:
+            self.wrapped = True
+        self.slot = 0
+
+    def flush(self):
+        """Grava o buffer no arquivo como um bloco."""
+        count = self.slot
+        if self._file is None or count == 0:
+            return
+        first_cycle = RECORD.unpack_from(self.buffer, 0)[0]
+        data = memoryview(self.buffer)[:count * RECORD_SIZE]
+        if self.compress:
+            data = zlib.compress(data, self.level)
+        offset = self._file.tell()
+        self._file.write(CHUNK.pack(first_cycle, count, len(data)))
+        self._file.write(data)
+        self.index.append((first_cycle, offset, count))
+        self.total += count
+        self.slot = 0
+
+    def close(self):
+        """Grava o que falta, o índice e o rodapé."""
+        if self._file is None:
+            return
+        self.flush()
+        f = self._file
+        index_offset = f.tell()
+        for entry in self.index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.write(FOOTER.pack(index_offset, len(self.index), MAGIC))
+        f.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def records(self):
+        """Registros ainda no buffer, do mais antigo para o mais novo."""
+        buf = self.buffer
+        slots = range(self.slot)
+        if self.wrapped:
+            slots = list(range(self.slot, self.capacity)) + list(slots)
+        for slot in slots:
+            yield decode_record(RECORD.unpack_from(buf, slot * RECORD_SIZE))
+
+
+class TraceReader:
+    """Leitor de arquivos de trace: acesso por ciclo sem decodificar o arquivo todo."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._read_layout()
+        except Exception:
+            self._file.close()
+            raise
+        self._cached = (None, None)  # (número do bloco, bytes descomprimidos)
+
+    def _read_layout(self):
+        f = self._file
+        magic, version, compressed, record_size, capacity = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"Arquivo de trace inválido: {self.path}")
+        self.compressed = bool(compressed)
+        self.capacity = capacity
+        f.seek(-FOOTER.size, 2)
+        index_offset, chunks, magic = FOOTER.unpack(f.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Trace sem rodapé (recorder não foi fechado?): {self.path}")
+        f.seek(index_offset)
+        raw = f.read(chunks * INDEX_ENTRY.size)
+        self.index = [INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size) for i in range(chunks)]
+        self._starts = [entry[0] for entry in self.index]
+        # Sem volta no tempo os blocos estão em ordem e sem sobreposição (busca binária)
+        self._ordered = all(a[0] + a[2] <= b[0] for a, b in zip(self.index, self.index[1:]))
+
+    def __len__(self):
+        return sum(entry[2] for entry in self.index)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _chunk(self, number):
+        if self._cached[0] == number:
+            return self._cached[1]
+        _, offset, _ = self.index[number]
+        f = self._file
+        f.seek(offset)
+        _, count, nbytes = CHUNK.unpack(f.read(CHUNK.size))
+        data = f.read(nbytes)
+        if self.compressed:
+            data = zlib.decompress(data)
+        self._cached = (number, data)
+        return data
+
+    def seek(self, cycle):
+        """Registro do ciclo pedido (KeyError se não estiver no trace). Se o
+        ciclo foi gravado mais de uma vez (restore()), o último."""
+        if self._ordered:
+            number = bisect.bisect_right(self._starts, cycle) - 1
+            candidates = (number,) if number >= 0 else ()
+        else:
+            candidates = range(len(self.index) - 1, -1, -1)
+        for number in candidates:
+            first, _, count = self.index[number]
+            i = cycle - first  # os ciclos de um bloco são consecutivos
+            if 0 <= i < count:
+                raw = RECORD.unpack_from(self._chunk(number), i * RECORD_SIZE)
+                if raw[0] == cycle:
+                    return decode_record(raw)
+        raise KeyError(cycle)
+
+    def records(self, start=None, stop=None):
+        """Registros com start <= ciclo < stop na ordem de gravação, lendo só os
+        blocos necessários."""
+        for number, (first, _, count) in enumerate(self.index):
+            if start is not None and first + count <= start:
+                continue
+            if stop is not None and first >= stop:
+                if self._ordered:
+                    break
+                continue
+            for raw in RECORD.iter_unpack(self._chunk(number)):
+                cycle = raw[0]
+                if start is not None and cycle < start:
+                    continue
+                if stop is not None and cycle >= stop:
+                    break
+                yield decode_record(raw)
+
+    def diagram(self, start=None, stop=None):
+        """Diagrama do pipeline por ciclo (PC em cada estágio, escrita e memória)."""
+        return format_diagram(self.records(start, stop))
+
+
+def format_diagram(records):
+    """Tabela ciclo x estágio a partir de TraceRecords."""
+    def pc(value):
+        return f"{value:>6}" if value >= 0 else f"{'--':>6}"
+
+    lines = [f"{'ciclo':>8} {'IF':>6} {'ID':>6} {'EX':>6} {'MEM':>6} {'WB':>6}  eventos"]
+    for r in records:
+        events = []
+        if r.wb_reg:
+            events.append(f"r{r.wb_reg}={r.wb_value}")
+        if r.mem_kind == MEM_LOAD:
+            events.append(f"LW [{r.mem_addr}]={r.mem_value}")
+        elif r.mem_kind == MEM_STORE:
+            events.append(f"SW [{r.mem_addr}]={r.mem_value}")
+        lines.append(f"{r.cycle:>8} {pc(r.if_pc)} {pc(r.id_pc)} {pc(r.ex_pc)} "
+                     f"{pc(r.mem_pc)} {pc(r.wb_pc)}  {' '.join(events)}")
+    return "\n".join(lines)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python -m src.simulador.trace arquivo.trace [ciclo_inicial [ciclo_final]]")
+        return 1
+    start = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    stop = int(sys.argv[3]) if len(sys.argv) > 3 else (start + 50 if start is not None else 50)
+    with TraceReader(sys.argv[1]) as reader:
+        print(f"{len(reader):,} ciclos em {len(reader.index)} blocos"
+              f"{' (zlib)' if reader.compressed else ''}")
+        print(reader.diagram(start, stop))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+# src/simulador/translator.py
+# Tradução de blocos básicos para funções Python compiladas (modo "translated").
+#
+# Um bloco é uma sequência de palavras a partir de um endereço que termina em
+# JAL/JR/BEQ/BNE/J/HALT (ou em MAX_BLOCK_LEN instruções). Para cada bloco é gerado
+# código Python especializado: registradores viram variáveis locais, os campos
+# das instruções (ra, rb, rc, constantes, alvos) entram como literais e os
+# registros das flags (src/simulador/flags.py) só são gravados quando ainda
+# estiverem vivos na saída do bloco.
+# O código é compilado uma vez e guardado pelo endereço inicial; um SW que
+# escreva em um intervalo traduzido descarta os blocos afetados.
+from src.simulador import execute as ex
+from src.simulador.execute import EXEC_TABLE, LOAD, STORE, CONTROL
+from src.simulador.flags import FLAG_ADD, FLAG_SUB, FLAG_SHL
+from src.simulador.instruction import HALT_INSTRUCTION, WORD_MASK
+
+MAX_BLOCK_LEN = 64
+
+MASK = f"0x{WORD_MASK:X}"   # literal usado no código gerado
+
+# Handlers com template próprio; opcodes substituídos via register_opcode()
+# (ou novos) são traduzidos como chamada genérica ao handler da tabela.
+_TEMPLATED = {
+    1: ex.op_add, 2: ex.op_sub, 3: ex.op_zero, 4: ex.op_xor, 5: ex.op_or,
+    7: ex.op_and, 16: ex.op_asl, 17: ex.op_asr, 18: ex.op_lsl, 19: ex.op_lsr,
+    20: ex.op_lclh, 21: ex.op_lcll, 22: ex.op_mem_address, 23: ex.op_mem_address,
+    24: ex.op_jal, 25: ex.op_jr, 26: ex.op_beq, 27: ex.op_bne, 28: ex.op_j,
+}
+
+# Flags definidas por cada opcode com template ("nz" = N e Z a partir do resultado)
+_FLAGS_SET = {
+    1: ("nz", "c", "v"), 2: ("nz", "c", "v"), 3: ("nz",), 4: ("nz",), 5: ("nz",),
+    7: ("nz",), 16: ("nz", "c"), 17: ("nz",), 18: ("nz", "c"), 19: ("nz",),
+    20: ("nz",), 21: ("nz",), 22: ("nz",),
+}
+
+_ALL_FLAGS = frozenset(("nz", "c", "v"))
+
+
+def _templated(opcode):
+    op = EXEC_TABLE[opcode]
+    return op is not None and _TEMPLATED.get(opcode) is op.handler
+
+
+class Block:
+    """Bloco traduzido: função compilada e encadeamento com os sucessores."""
+    __slots__ = ("start", "end", "count", "fn", "source", "valid",
+                 "next_a", "link_a", "next_b", "link_b")
+
+    def __init__(self, start, end, count, fn, source, successors):
+        self.start = start
+        self.end = end          # último endereço coberto (inclusive)
+        self.count = count      # instruções executadas quando o bloco vai até o fim
+        self.fn = fn
+        self.source = source
+        self.valid = True
+        # Sucessores conhecidos estaticamente (alvo / fall-through) e seus blocos
+        self.next_a, self.next_b = (list(successors) + [None, None])[:2]
+        self.link_a = None
+        self.link_b = None
+
+    def __repr__(self):
+        return f"Block({self.start}..{self.end}, {self.count} instr)"
+
+
+class Translator:
+    """Cache de blocos traduzidos de uma CPU."""
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.size = len(cpu.memory)
+        self.blocks = {}                        # endereço inicial -> Block
+        self.covered = {}                       # endereço -> nº de blocos que o cobrem
+        self.blocks_translated = 0
+        self.invalidations = 0
+        self.hits = 0
+        self.misses = 0
+
+    # Consulta / tradução
+    def lookup(self, pc):
+        blk = self.blocks.get(pc)
+        if blk is None:
+            self.misses += 1
+            blk = self.translate(pc)
+        else:
+            self.hits += 1
+        return blk
+
+    def translate(self, start):
+        memory = self.cpu.memory
+        words = []
+        addr = start
+        while addr < self.size and len(words) < MAX_BLOCK_LEN:
+            ir = memory[addr]
+            words.append(ir)
+            addr += 1
+            opcode = (ir >> 26) & 0x3F
+            if ir == HALT_INSTRUCTION:
+                break
+            op = EXEC_TABLE[opcode]
+            if op is not None and op.kind == CONTROL:
+                break
+        source, successors = _generate(start, words, self.size)
+        namespace = {"HANDLERS": _generic_handlers(self.cpu, start, words)}
+        exec(compile(source, f"<bloco {start}>", "exec"), namespace)
+        blk = Block(start, start + len(words) - 1, len(words),
+                    namespace["block"], source, successors)
+        self.blocks[start] = blk
+        covered = self.covered
+        for a in range(blk.start, blk.end + 1):
+            covered[a] = covered.get(a, 0) + 1
+        self.blocks_translated += 1
+        return blk
+
+    # Invalidação (SW em código traduzido)
+    def invalidate(self, addr):
+        """Descarta todos os blocos que cobrem addr."""
+        if addr not in self.covered:
+            return
+        stale = [b for b in self.blocks.values() if b.start <= addr <= b.end]
+        for blk in stale:
+            self._drop(blk)
+
+    def invalidate_all(self):
+        for blk in list(self.blocks.values()):
+            self._drop(blk)
+
+    def _drop(self, blk):
+        blk.valid = False
+        del self.blocks[blk.start]
+        covered = self.covered
+        for a in range(blk.start, blk.end + 1):
+            if covered[a] == 1:
+                del covered[a]
+            else:
+                covered[a] -= 1
+        self.invalidations += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "blocks": len(self.blocks),
+            "blocks_translated": self.blocks_translated,
+            "invalidations": self.invalidations,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    # Laço de execução
+    def run(self, limit):
+        """Executa blocos até HALT ou até limit instruções (-1 = sem limite)."""
+        cpu = self.cpu
+        regs = cpu.registers
+        memory = cpu.memory
+        cache = cpu.decode_cache
+        covered = self.covered
+        n = 0
+        pc = cpu.pc
+        blk = None
+        while n != limit and not cpu.halted:
+            if blk is None:
+                if not (0 <= pc < self.size):
+                    cpu.halted = True
+                    break
+                blk = self.lookup(pc)
+            if limit >= 0 and limit - n < blk.count:
+                # Orçamento menor que o bloco: termina no interpretador funcional
+                cpu.pc = pc
+                cpu.instret += n
+                return n + cpu._run_functional(limit - n)
+
+            nxt, k = blk.fn(cpu, regs, memory, cache, covered, self)
+            n += k
+            pc = nxt
+            # Encadeamento direto com o sucessor conhecido
+            if nxt == blk.next_a:
+                succ = blk.link_a
+                if succ is None or not succ.valid:
+                    succ = blk.link_a = self._successor(nxt)
+                else:
+                    self.hits += 1
+            elif nxt == blk.next_b:
+                succ = blk.link_b
+                if succ is None or not succ.valid:
+                    succ = blk.link_b = self._successor(nxt)
+                else:
+                    self.hits += 1
+            else:
+                succ = None
+            blk = succ
+        cpu.pc = pc
+        cpu.instret += n
+        return n
+
+    def _successor(self, pc):
+        if not (0 <= pc < self.size) or self.cpu.halted:
+            return None
+        return self.lookup(pc)
+
+
+def _generic_handlers(cpu, start, words):
+    """Instruções decodificadas usadas pelas chamadas genéricas ao handler."""
+    handlers = {}
+    for i, ir in enumerate(words):
+        opcode = (ir >> 26) & 0x3F
+        if ir != HALT_INSTRUCTION and EXEC_TABLE[opcode] is not None and not _templated(opcode):
+            dec = cpu.decode_ir(ir)
+            dec.pc = start + i
+            handlers[start + i] = (EXEC_TABLE[opcode], dec)
+    return handlers
+
+
+def _flag_liveness(words):
+    """Para cada instrução, quais flags que ela define ainda são lidas depois
+    (em alguma saída do bloco). Toda saída observa as três flags."""
+    need = [()] * len(words)
+    live = set(_ALL_FLAGS)  # fim do bloco
+    for i in range(len(words) - 1, -1, -1):
+        ir = words[i]
+        opcode = (ir >> 26) & 0x3F
+        if ir == HALT_INSTRUCTION or not _templated(opcode):
+            live = set(_ALL_FLAGS)
+            continue
+        sets = _FLAGS_SET.get(opcode, ())
+        need[i] = tuple(f for f in sets if f in live)
+        live.difference_update(sets)
+        if opcode in (22, 23):  # LW/SW podem sair do bloco (endereço inválido / SW em código)
+            live = set(_ALL_FLAGS)
+    return need
+
+
+def _flag_records(flags, op, a, b):
+    """Registros de C/V (src/simulador/flags.py) que o bloco ainda precisa."""
+    lines = []
+    if "c" in flags and "v" in flags:
+        lines.append(f"    fc = fv = ({op}, {a}, {b})")
+    elif "c" in flags:
+        lines.append(f"    fc = ({op}, {a}, {b})")
+    elif "v" in flags:
+        lines.append(f"    fv = ({op}, {a}, {b})")
+    return lines
+
+
+def _generate(start, words, size):
+    """Gera o código-fonte do bloco. Retorna (fonte, sucessores estáticos)."""
+    body = []
+    used = set()
+    written = set()
+    dirty = set()       # flags com valor pendente em variável local
+    successors = []
+
+    def r(idx):
+        used.add(idx)
+        return f"r{idx}"
+
+    def assign(dest, expr):
+        # dest 0 (R0) é descartado, mas a expressão é avaliada (flags)
+        if dest != 0:
+            used.add(dest)
+            written.add(dest)
+            body.append(f"    r{dest} = {expr}")
+
+    def exit_code(next_pc, count, halt=False, indent="    "):
+        lines = [f"{indent}regs[{d}] = r{d}" for d in sorted(written)]
+        if "nz" in dirty:
+            lines.append(f"{indent}cpu._nz = nz")
+        if "c" in dirty:
+            lines.append(f"{indent}cpu._c = fc")
+        if "v" in dirty:
+            lines.append(f"{indent}cpu._v = fv")
+        if halt:
+            lines.append(f"{indent}cpu.halted = True")
+        lines.append(f"{indent}return {next_pc}, {count}")
+        return lines
+
+    need = _flag_liveness(words)
+    ended = False
+    for i, ir in enumerate(words):
+        pc = start + i
+        count = i + 1
+        opcode = (ir >> 26) & 0x3F
+        ra, rb, rc = (ir >> 21) & 0x1F, (ir >> 16) & 0x1F, (ir >> 11) & 0x1F
+        const16 = ir & 0xFFFF
+        jump_addr = ir & 0x03FFFFFF
+        flags = need[i]
+        body.append(f"    # {pc}: 0x{ir:08X}")
+
+        if ir == HALT_INSTRUCTION:
+            body.extend(exit_code(pc + 1, count, halt=True))
+            ended = True
+            break
+
+        op = EXEC_TABLE[opcode]
+        if op is None:  # NOP
+            continue
+
+        if not _templated(opcode):
+            # Chamada genérica ao handler da tabela (opcodes registrados externamente)
+            body.extend(f"    regs[{d}] = r{d}" for d in sorted(written))
+            if "nz" in dirty:
+                body.append("    cpu._nz = nz")
+            if "c" in dirty:
+                body.append("    cpu._c = fc")
+            if "v" in dirty:
+                body.append("    cpu._v = fv")
+            dirty.clear()
+            body.append(f"    op, dec = HANDLERS[{pc}]")
+            body.append(f"    cpu.pc = {pc + 1}")
+            body.append(f"    b = regs[{rb}]")
+            body.append(f"    t = op.handler(cpu, dec, regs[{ra}], b)")
+            if op.kind == LOAD or op.kind == STORE:
+                body.append(f"    if not 0 <= t < {size}:")
+                body.extend(exit_code(pc + 1, count, halt=True, indent="        "))
+                if op.kind == LOAD:
+                    body.append("    t = cpu.update_flags(mem[t] & 0xFFFFFFFF)")
+                    if rc != 0:
+                        body.append(f"    r{rc} = regs[{rc}] = t")
+                        used.add(rc)
+                        written.add(rc)
+                else:
+                    body.append("    mem[t] = b & 0xFFFFFFFF")
+                    body.append("    cache.pop(t, None)")
+                    body.append("    if t in covered:")
+                    body.append("        tr.invalidate(t)")
+                    body.extend(exit_code(pc + 1, count, indent="        "))
+            elif op.kind == CONTROL:
+                body.append("    if cpu.halted:")
+                body.append(f"        return {pc + 1}, {count}")
+                dest = rc if op.dest is None else op.dest
+                if dest & 0x1F:
+                    body.append(f"    if t is not None:")
+                    body.append(f"        regs[{dest & 0x1F}] = t & 0xFFFFFFFF")
+                body.append(f"    return cpu.pc, {count}")
+                ended = True
+                break
+            elif rc != 0:
+                body.append("    if t is not None:")
+                body.append(f"        r{rc} = t & 0xFFFFFFFF")
+                body.append(f"        regs[{rc}] = r{rc}")
+                used.add(rc)
+                written.add(rc)
+            # Recarrega os locais: o handler pode ter lido/escrito registradores
+            body.extend(f"    r{d} = regs[{d}]" for d in sorted(used))
+            continue
+
+        a, b = r(ra), r(rb)
+        # 1. ALU
+        if opcode == 1:  # ADD
+            body.extend(_flag_records(flags, FLAG_ADD, a, b))
+            body.append(f"    t = ({a} + {b}) & {MASK}")
+        elif opcode == 2:  # SUB
+            body.extend(_flag_records(flags, FLAG_SUB, a, b))
+            body.append(f"    t = ({a} - {b}) & {MASK}")
+        elif opcode == 3:  # ZERO
+            body.append("    t = 0")
+        elif opcode == 4:  # XOR
+            body.append(f"    t = ({a} ^ {b}) & {MASK}")
+        elif opcode == 5:  # OR
+            body.append(f"    t = ({a} | {b}) & {MASK}")
+        elif opcode == 7:  # AND
+            body.append(f"    t = ({a} & {b}) & {MASK}")
+
+        # 2. Shifts
+        elif opcode in (16, 18):  # ASL / LSL
+            body.append(f"    s = {b} & 31")
+            body.extend(_flag_records(flags, FLAG_SHL, a, "s"))
+            body.append(f"    t = ({a} << s) & {MASK}")
+        elif opcode == 17:  # ASR
+            body.append(f"    s = {b} & 31")
+            body.append(f"    t = ((({a} - (1 << 32)) >> s) if {a} & 0x80000000 else ({a} >> s)) & {MASK}")
+        elif opcode == 19:  # LSR
+            body.append(f"    t = ({a} >> ({b} & 31)) & {MASK}")
+
+        # 3. CONSTS (constantes dobradas em tempo de tradução)
+        elif opcode == 20:  # LCLH
+            body.append(f"    t = {(const16 & 0xFFFF) << 16} | ({r(rc)} & 0xFFFF)")
+        elif opcode == 21:  # LCLL
+            body.append(f"    t = {((const16 << 8) | const16) & 0xFFFFFFFF}")
+
+        # 4. LOAD / STORE
+        elif opcode == 22:  # LW
+            body.append(f"    t = {a} + {const16}")
+            body.append(f"    if not 0 <= t < {size}:")
+            body.extend(exit_code(pc + 1, count, halt=True, indent="        "))
+            body.append(f"    t = mem[t] & {MASK}")
+        elif opcode == 23:  # SW
+            body.append(f"    t = {a} + {const16}")
+            body.append(f"    if not 0 <= t < {size}:")
+            body.extend(exit_code(pc + 1, count, halt=True, indent="        "))
+            body.append(f"    mem[t] = {b} & {MASK}")
+            body.append("    cache.pop(t, None)")
+            body.append("    if t in covered:")
+            body.append("        tr.invalidate(t)")
+            body.extend(exit_code(pc + 1, count, indent="        "))
+            continue
+
+        # 5. Branches / Jumps (sempre terminam o bloco)
+        elif opcode == 24:  # JAL
+            dest = jump_addr & 0xFFFFFF
+            if dest < size:
+                assign(31, str(pc + 1))
+                body.extend(exit_code(dest, count))
+                successors.append(dest)
+            else:
+                body.extend(exit_code(pc + 1, count, halt=True))
+            ended = True
+            break
+        elif opcode == 25:  # JR
+            body.append(f"    t = {a}")
+            body.append(f"    if not 0 <= t < {size}:")
+            body.extend(exit_code(pc + 1, count, halt=True, indent="        "))
+            body.extend(exit_code("t", count))
+            ended = True
+            break
+        elif opcode in (26, 27, 28):  # BEQ / BNE / J
+            if opcode == 28:
+                cond = None
+                target = jump_addr
+            else:
+                cond = f"{a} == {b}" if opcode == 26 else f"{a} != {b}"
+                target = const16  # alvo de 16 bits (ver op_beq)
+            if target < size:
+                taken = exit_code(target, count, indent="        " if cond else "    ")
+                successors.append(target)
+            else:
+                taken = exit_code(pc + 1, count, halt=True, indent="        " if cond else "    ")
+            if cond:
+                body.append(f"    if {cond}:")
+                body.extend(taken)
+                body.extend(exit_code(pc + 1, count))
+                successors.append(pc + 1)
+            else:
+                body.extend(taken)
+            ended = True
+            break
+
+        # Resultado (ALU / shift / const / LW) -> rc e flags N/Z
+        assign(rc, "t")
+        if "nz" in flags:
+            body.append("    nz = t")
+        dirty.update(_FLAGS_SET.get(opcode, ()))
+
+    if not ended:
+        end = start + len(words)
+        body.extend(exit_code(end, len(words)))
+        successors.append(end)
+
+    header = ["def block(cpu, regs, mem, cache, covered, tr):"]
+    header.extend(f"    r{d} = regs[{d}]" for d in sorted(used))
+    return "\n".join(header + body) + "\n", successors